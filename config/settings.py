@@ -1,3 +1,4 @@
+from os import cpu_count
 from os import getenv
 from os import path
 from pathlib import Path
@@ -138,6 +139,100 @@ except ImportError:
     # Celery
     CELERY_BROKER_URL = f'{REDIS_URI}/0'
     CELERY_RESULT_BACKEND = f'{REDIS_URI}/0'
+    CELERY_WORKER_CONCURRENCY = int(getenv('CELERY_WORKER_CONCURRENCY', cpu_count() or 1))
+    CELERY_BEAT_SCHEDULE = {
+        'cleanup-chunked-uploads': {
+            'task': 'poster.tasks.cleanup_chunked_uploads_task',
+            'schedule': 60 * 60,
+        },
+        'maintain-task-partitions': {
+            'task': 'poster.tasks.maintain_task_partitions_task',
+            'schedule': 24 * 60 * 60,
+        },
+        'flush-task-audit': {
+            'task': 'poster.tasks.flush_task_audit_task',
+            'schedule': float(getenv('TASK_AUDIT_FLUSH_INTERVAL', 5)),
+        },
+        'refresh-channels': {
+            'task': 'poster.tasks.refresh_channels_task',
+            'schedule': float(getenv('CHANNEL_REFRESH_INTERVAL', 60 * 60)),
+        },
+    }
+
+    # Task log
+    TASK_PARTITIONS_AHEAD = int(getenv('TASK_PARTITIONS_AHEAD', 2))
+    TASK_RETENTION_MONTHS = int(getenv('TASK_RETENTION_MONTHS', 12))
+    TASK_ARCHIVE = getenv('TASK_ARCHIVE', '').lower() in ('1', 'true', 'yes')
+    TASK_ARCHIVE_DIRECTORY = getenv('TASK_ARCHIVE_DIRECTORY', 'archive/tasks')
+    TASK_AUDIT_URL = getenv('TASK_AUDIT_URL', f'{REDIS_URI}/2')
+    TASK_AUDIT_STREAM = getenv('TASK_AUDIT_STREAM', 'poster:tasks')
+    TASK_AUDIT_MAX_PENDING = int(getenv('TASK_AUDIT_MAX_PENDING', 100000))
+    TASK_AUDIT_BATCH_SIZE = int(getenv('TASK_AUDIT_BATCH_SIZE', 500))
+    TASK_AUDIT_CLAIM_IDLE = int(getenv('TASK_AUDIT_CLAIM_IDLE', 60))
+
+    # Channels
+    CHANNEL_REFRESH_AGE = int(getenv('CHANNEL_REFRESH_AGE', 24 * 60 * 60))
+    CHANNEL_REFRESH_LIMIT = int(getenv('CHANNEL_REFRESH_LIMIT', 5000))
+    CHANNEL_REFRESH_BATCH_SIZE = int(getenv('CHANNEL_REFRESH_BATCH_SIZE', 100))
+    CHANNEL_REFRESH_RATE = float(getenv('CHANNEL_REFRESH_RATE', 10))
+    CHANNEL_IMPORT_RATE = float(getenv('CHANNEL_IMPORT_RATE', 20))
+    CHANNEL_IMPORT_WORKERS = int(getenv('CHANNEL_IMPORT_WORKERS', 8))
+    CHANNEL_IMPORT_DIRECTORY = getenv('CHANNEL_IMPORT_DIRECTORY', 'imports/channels')
+
+    # Cache
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': f'{REDIS_URI}/1',
+        },
+    }
+    FRAGMENT_CACHE_TIMEOUT = int(getenv('FRAGMENT_CACHE_TIMEOUT', 30 * 60))
+    CHANNEL_INFO_TIMEOUT = int(getenv('CHANNEL_INFO_TIMEOUT', 5 * 60))
+    POST_SEND_QUEUE_TIMEOUT = int(getenv('POST_SEND_QUEUE_TIMEOUT', 60))
+
+    # Media
+    # Shared by the worker processes of one host, see poster.budget.get_process_budget
+    MEDIA_MEMORY_BUDGET = int(getenv('MEDIA_MEMORY_BUDGET', 256 * 1024 * 1024))
+    DISCORD_BOOST_TIER = int(getenv('DISCORD_BOOST_TIER', 0))
+    FFMPEG_BINARY = getenv('FFMPEG_BINARY', 'ffmpeg')
+    FFMPEG_TIMEOUT = int(getenv('FFMPEG_TIMEOUT', 600))
+    MEDIA_LINK_MODE = getenv('MEDIA_LINK_MODE', 'hardlink')
+
+    STORAGES = {
+        'default': {
+            'BACKEND': 'poster.storage.ContentAddressedStorage',
+        },
+        'staticfiles': {
+            'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+        },
+    }
+
+    MEDIA_CACHE_ROOT = getenv('MEDIA_CACHE_ROOT', path.join(BASE_DIR, 'cache', 'media'))
+    MEDIA_CACHE_SIZE = int(getenv('MEDIA_CACHE_SIZE', 2 * 1024 * 1024 * 1024))
+    FILE_UPLOAD_HANDLERS = [
+        'django.core.files.uploadhandler.MemoryFileUploadHandler',
+        'poster.uploads.MediaUploadHandler',
+    ]
+    MEDIA_ACCEL = getenv('MEDIA_ACCEL', '')
+    MEDIA_ACCEL_PREFIX = getenv('MEDIA_ACCEL_PREFIX', '/protected-media/')
+    CHUNKED_UPLOAD_ROOT = getenv('CHUNKED_UPLOAD_ROOT', path.join(BASE_DIR, 'cache', 'uploads'))
+    CHUNKED_UPLOAD_CHUNK_SIZE = int(getenv('CHUNKED_UPLOAD_CHUNK_SIZE', 4 * 1024 * 1024))
+    CHUNKED_UPLOAD_EXPIRY = int(getenv('CHUNKED_UPLOAD_EXPIRY', 24 * 60 * 60))
+    MEDIA_S3_BUCKET = getenv('MEDIA_S3_BUCKET')
+
+    if MEDIA_S3_BUCKET:
+        STORAGES['default'] = {
+            'BACKEND': 'storages.backends.s3.S3Storage',
+            'OPTIONS': {
+                'bucket_name': MEDIA_S3_BUCKET,
+                'endpoint_url': getenv('MEDIA_S3_ENDPOINT_URL') or None,
+                'access_key': getenv('MEDIA_S3_ACCESS_KEY'),
+                'secret_key': getenv('MEDIA_S3_SECRET_KEY'),
+                'region_name': getenv('MEDIA_S3_REGION') or None,
+                'addressing_style': 'path',
+                'file_overwrite': False,
+            },
+        }
 
     JAZZMIN_SETTINGS = {
         'navigation_expanded': False,
@@ -1,18 +1,17 @@
 from django.conf import settings
 from django.conf.urls.i18n import i18n_patterns
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path
 from django.urls import include
 
+from poster.views import serve_media
+
 
 urlpatterns = [
-    path('i18n/', include('django.conf.urls.i18n'))
+    path('i18n/', include('django.conf.urls.i18n')),
+    path(f'{settings.MEDIA_URL.strip("/")}/<path:name>', serve_media, name='media'),
 ]
 
 urlpatterns += i18n_patterns(
     path('admin/', admin.site.urls),
 )
-
-if settings.DEBUG:
-    urlpatterns += [] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
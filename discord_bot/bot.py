@@ -13,13 +13,13 @@ from .types import User
 
 class DiscordBot:
 
-    def __init__(self, token: str) -> None:
+    def __init__(self, token: str, session: Session | None = None) -> None:
         self.token = token
 
         if not self.token:
             raise Exception('Token must be not empty')
 
-        self.session = Session()
+        self.session = session or Session()
 
     def _api(self, path: str, method: str = 'GET', **kwargs) -> dict:
         path = path if path.startswith('/') else '/' + path
@@ -39,7 +39,7 @@ class DiscordBot:
         )
 
         if response.status_code not in range(200, 300):
-            raise ApiDiscordException(response.text)
+            raise ApiDiscordException(response.text, response.status_code)
 
         if response.status_code != 204:
             return response.json()
@@ -97,6 +97,9 @@ class DiscordBot:
     def get_channel_info(self, channel_id: int) -> Channel:
         return Channel(self._api(f'/channels/{channel_id}'))
 
+    def get_guild_channels(self, guild_id: int) -> list[Channel]:
+        return [Channel(raw_data) for raw_data in self._api(f'/guilds/{guild_id}/channels')]
+
     def is_channel_with_id_exists(self, channel_id: int) -> bool:
         try:
             return self.get_channel_info(channel_id) is not None
@@ -1,4 +1,7 @@
 
 
 class ApiDiscordException(Exception):
-    pass
+    def __init__(self, description: str, error_code: int | None = None) -> None:
+        super().__init__(description)
+        self.description = description
+        self.error_code = error_code
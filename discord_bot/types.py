@@ -1,6 +1,12 @@
 
 
+GUILD_TEXT = 0
+GUILD_ANNOUNCEMENT = 5
+
+
 class Channel:
+    channel_id: int | None
+    channel_type: int | None
     title: str | None
     description: str | None
     photo: None
@@ -8,10 +14,16 @@ class Channel:
     guild_id: int | None
 
     def __init__(self, raw_data: dict) -> None:
+        self.channel_id = raw_data.get('id')
+        self.channel_type = raw_data.get('type')
         self.title = raw_data.get('name')
         self.description = raw_data.get('topic')
         self.guild_id = raw_data.get('guild_id')
 
+    @property
+    def is_postable(self) -> bool:
+        return self.channel_type in (GUILD_TEXT, GUILD_ANNOUNCEMENT)
+
 
 class Message:
     message_id: int | None
@@ -1,36 +1,76 @@
+from os import path as os_path
+from uuid import uuid4
+
+from django.contrib import messages
+from django.contrib.admin import action
 from django.contrib.admin import register
+from django.contrib.admin import SimpleListFilter
 from django.contrib.admin import ModelAdmin
 from django.contrib.admin import TabularInline
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.core.files.storage import default_storage
+from django.http import HttpResponseRedirect
+from django.http import JsonResponse
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
+from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 
+from .channels import sync_guild
+from .chunked import ChunkedUpload
+from .exceptions import UploadNotFound
+from .exceptions import UploadOffsetMismatch
 from .forms import BotAdminForm
 from .forms import ChannelAdminForm
+from .forms import ChannelImportForm
 from .forms import GalleryDocumentInlineForm
 from .forms import GalleryPhotoInlineForm
 from .forms import PostAdminForm
+from .forms import bind_upload_user
+from .enums import DeliveryStatusEnum
+from .enums import MessengerEnum
 from .enums import PostTypeEnum
+from .enums import TaskStatusEnum
 from .enums import TaskTypeEnum
+from .fragments import get_fragment
+from .fragments import prefetch_fragments
 from .mixins import AdminImageMixin
 from .models import Bot
 from .models import Channel
+from .models import ChannelGroup
+from .models import Delivery
 from .models import GalleryDocument
 from .models import GalleryPhoto
 from .models import Post
 from .models import Task
+from .pagination import KeysetChangeList
+from .uploads import get_upload_limits
 from .signals import edit_post_signal
 from .signals import publish_post_signal
 from .signals import unpublish_post_signal
+from .tasks import import_channels_task
 from .utils import prepare_markup
 
+import logging
+logger = logging.getLogger(__name__)
+
+
+class ChunkedUploadInline(TabularInline):
+    def get_formset(self, request, obj=None, **kwargs):
+        kwargs['form'] = bind_upload_user(kwargs.get('form', self.form), request.user)
+        return super().get_formset(request, obj, **kwargs)
 
-class GalleryDocumentInline(TabularInline):
+
+class GalleryDocumentInline(ChunkedUploadInline):
     model = GalleryDocument
     extra = 1
     form = GalleryDocumentInlineForm
 
 
-class GalleryPhotoInline(TabularInline):
+class GalleryPhotoInline(ChunkedUploadInline):
     model = GalleryPhoto
     extra = 1
     form = GalleryPhotoInlineForm
@@ -47,6 +87,8 @@ class BotAdmin(ModelAdmin):
         'token_preview',
     )
 
+    search_fields = ('username',)
+
     def get_user_fields(self, request, obj=None):
         return ['bot_type', 'token']
 
@@ -103,10 +145,83 @@ class ChannelAdmin(AdminImageMixin, ModelAdmin):
         'is_completed',
     )
 
+    search_fields = ('title', 'username')
+    autocomplete_fields = ('bot',)
+    actions = ('sync_guild',)
+
+    @action(description=_('Sync channels of the selected Discord servers'))
+    def sync_guild(self, request, queryset):
+        guilds = queryset.filter(
+            channel_type=MessengerEnum.DISCORD,
+            bot__isnull=False,
+            server_id__isnull=False,
+        ).order_by().values_list('bot', 'server_id').distinct()
+
+        if not guilds:
+            self.message_user(request, _('Select at least one completed Discord channel'), messages.WARNING)
+            return
+
+        bots = Bot.objects.in_bulk({bot_pk for bot_pk, _server_id in guilds})
+        for bot_pk, server_id in guilds:
+            try:
+                created, updated = sync_guild(bots[bot_pk], server_id)
+            except Exception as e:
+                logger.exception(e)
+                self.message_user(request, _('Server {} sync failed: {}').format(server_id, e), messages.ERROR)
+                continue
+
+            self.message_user(
+                request,
+                _('Server {}: {} channels added, {} updated').format(server_id, created, updated),
+                messages.SUCCESS,
+            )
+
+    def get_urls(self):
+        return [
+            path(
+                'import/',
+                self.admin_site.admin_view(self.import_view),
+                name='poster_channel_import',
+            ),
+            *super().get_urls(),
+        ]
+
+    def import_view(self, request):
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+
+        form = ChannelImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            file = form.cleaned_data['file']
+            bot = form.cleaned_data['bot']
+            token = uuid4().hex
+            directory = settings.CHANNEL_IMPORT_DIRECTORY
+            name = default_storage.save(f'{directory}/{token}{os_path.splitext(file.name)[1].lower()}', file)
+            report = f'{directory}/{token}-failures.csv'
+
+            import_channels_task.delay(name, report, bot.pk if bot else None)
+            self.message_user(
+                request,
+                format_html(
+                    _('Channel import started, failures will be reported in <a href="{}">{}</a>'),
+                    default_storage.url(report),
+                    os_path.basename(report),
+                ),
+                messages.SUCCESS,
+            )
+            return HttpResponseRedirect(reverse('admin:poster_channel_changelist'))
+
+        return TemplateResponse(request, 'admin/poster/channel/import.html', {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'form': form,
+            'title': _('Import channels'),
+        })
+
     def get_user_fields(self, request, obj=None):
         fields = ['channel_type']
         if obj:
-            fields.extend(['channel_id', 'bot'])
+            fields.extend(['channel_id', 'bot', 'tags'])
 
             if obj.is_completed and obj.server_id:
                 fields.append('server_id')
@@ -159,11 +274,9 @@ class ChannelAdmin(AdminImageMixin, ModelAdmin):
         return super().add_view(request, form_url, extra_context=extra_context)
 
     def change_view(self, request, object_id, form_url='', extra_context=None):
-        model = self.get_object(request, object_id)
         extra_context = extra_context or {}
         extra_context['show_save_and_add_another'] = False
         extra_context['show_save_and_continue'] = False
-        extra_context['show_save'] = not model.is_completed
         return super().change_view(request, object_id, form_url, extra_context=extra_context)
 
     def get_form(self, request, obj=None, **kwargs):
@@ -172,12 +285,50 @@ class ChannelAdmin(AdminImageMixin, ModelAdmin):
             form.base_fields['bot'].queryset = Bot.objects.filter(bot_type=obj.channel_type)
         return form
 
+    def get_search_results(self, request, queryset, search_term):
+        queryset, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if request.GET.get('field_name'):
+            queryset = queryset.filter(is_completed=True)
+        return queryset, may_have_duplicates
+
+
+@register(ChannelGroup)
+class ChannelGroupAdmin(ModelAdmin):
+    model = ChannelGroup
+
+    list_display = (
+        'name',
+        'messenger',
+        'bot',
+        'tag',
+    )
+
+    search_fields = ('name',)
+
+    fields = (
+        'name',
+        'messenger',
+        'bot',
+        'tag',
+        'channels',
+    )
+
+    autocomplete_fields = ('bot', 'channels')
+
+    def get_form(self, request, obj=None, **kwargs):
+        form = super().get_form(request, obj, **kwargs)
+        if form and form.base_fields.get('channels'):
+            form.base_fields['channels'].queryset = Channel.objects.filter(is_completed=True)
+        return form
+
 
 @register(Post)
 class PostAdmin(ModelAdmin):
     model = Post
     form = PostAdminForm
 
+    autocomplete_fields = ('channels', 'channel_groups')
+
     list_display = (
         'post_type',
         'post_content',
@@ -211,6 +362,7 @@ class PostAdmin(ModelAdmin):
             return ['post_type']
         return [
             'channels',
+            'channel_groups',
             'is_published',
             'created_at',
             'updated_at',
@@ -245,6 +397,7 @@ class PostAdmin(ModelAdmin):
             readonly_files.extend([
                 'post_type',
                 'channels',
+                'channel_groups',
                 'audio',
                 'document',
                 'photo',
@@ -290,24 +443,132 @@ class PostAdmin(ModelAdmin):
             edit_post_signal.send(sender=request, instance=obj)
         super().save_model(request, obj, form, change)
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+
+        for upload_form in (form, *(inline for formset in formsets for inline in formset.forms)):
+            upload_form.close_uploads()
+
+        for key, token in request.POST.items():
+            if key.endswith('_upload_token') and token:
+                try:
+                    upload = ChunkedUpload(token)
+                except UploadNotFound:
+                    continue
+
+                if upload.user_id == request.user.pk:
+                    upload.delete()
+
+    def get_urls(self):
+        return [
+            path(
+                'upload/',
+                self.admin_site.admin_view(self.upload_create_view),
+                name='poster_post_upload',
+            ),
+            path(
+                'upload/<str:token>/',
+                self.admin_site.admin_view(self.upload_view),
+                name='poster_post_upload_chunk',
+            ),
+            *super().get_urls(),
+        ]
+
+    def upload_create_view(self, request):
+        if request.method != 'POST':
+            return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+        name = request.POST.get('name', '')
+        field_name = request.POST.get('field_name', '')
+        size = request.POST.get('size', '')
+        size = int(size) if size.isdigit() else 0
+        limits = get_upload_limits(field_name)
+
+        if not name or not limits or size <= 0:
+            return JsonResponse({'error': str(_('Invalid upload'))}, status=400)
+
+        if size > limits.max_bytes:
+            return JsonResponse({'error': str(_('File is too large'))}, status=413)
+
+        upload = ChunkedUpload.create(name, size, field_name, request.user.pk)
+        return JsonResponse({
+            'token': upload.token,
+            'offset': upload.offset,
+            'chunk_size': settings.CHUNKED_UPLOAD_CHUNK_SIZE,
+        })
+
+    def upload_view(self, request, token):
+        try:
+            upload = ChunkedUpload(token)
+        except UploadNotFound:
+            upload = None
+
+        if not upload or upload.user_id != request.user.pk:
+            return JsonResponse({'error': str(_('Upload not found'))}, status=404)
+
+        if request.method == 'PUT':
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+            if length > settings.CHUNKED_UPLOAD_CHUNK_SIZE:
+                return JsonResponse({'error': str(_('Chunk is too large'))}, status=413)
+
+            offset = request.headers.get('Upload-Offset', '')
+            if not offset.isdigit():
+                return JsonResponse({'error': str(_('Upload offset required'))}, status=400)
+
+            try:
+                upload.append(int(offset), request, length)
+            except UploadOffsetMismatch:
+                return JsonResponse({'token': upload.token, 'offset': upload.offset}, status=409)
+
+        elif request.method != 'GET':
+            return JsonResponse({'error': 'Method not allowed'}, status=405)
+
+        return JsonResponse({
+            'token': upload.token,
+            'offset': upload.offset,
+            'size': upload.size,
+            'chunk_size': settings.CHUNKED_UPLOAD_CHUNK_SIZE,
+        })
+
     def messages_links(self, obj):
         template = '''
         <a class="list-group-item list-group-item-action" href="{href}">
-            View message in channel {channel}
+            View message in {messenger} channel <strong>{channel}</strong>
         </a>
         '''
 
+        deliveries = Delivery.objects.filter(post=obj).exclude(permalink='').only(
+            'messenger',
+            'chat_title',
+            'permalink',
+        )
         return mark_safe('<ul class="list-group">{}</ul>'.format(
             ''.join([
-                template.format(href=message.href, channel=message.channel_name)
-                for message in obj.messages.all() if message.channel and message.message_id
+                format_html(
+                    template,
+                    href=delivery.permalink,
+                    messenger=delivery.messenger,
+                    channel=delivery.chat_title,
+                )
+                for delivery in deliveries
             ])
         ))
 
     messages_links.allow_tags = True
     messages_links.short_description = _('Messages links')
 
+    def get_changelist_instance(self, request):
+        changelist = super().get_changelist_instance(request)
+        prefetch_fragments(changelist.result_list)
+        return changelist
+
     def post_content(self, obj):
+        return get_fragment(obj, 'post_content', lambda: self.render_post_content(obj))
+
+    post_content.allow_tags = True
+    post_content.short_description = _('Post content')
+
+    def render_post_content(self, obj):
         if obj.post_type == PostTypeEnum.AUDIO:
             return prepare_markup(message=obj.caption, files=[obj.audio])
         elif obj.post_type == PostTypeEnum.DOCUMENT:
@@ -325,16 +586,20 @@ class PostAdmin(ModelAdmin):
         elif obj.post_type == PostTypeEnum.VOICE:
             return prepare_markup(message=obj.caption, files=[obj.voice])
 
-    post_content.allow_tags = True
-    post_content.short_description = _('Post content')
-
     def post_channels(self, obj):
-        return mark_safe('<br>'.join([str(channel) for channel in obj.channels.all()]))
+        return get_fragment(obj, 'post_channels', lambda: self.render_post_channels(obj))
 
     post_channels.allow_tags = True
     post_channels.short_description = _('Post channels')
 
+    def render_post_channels(self, obj):
+        return '<br>'.join([
+            *[str(channel) for channel in obj.channels.all()],
+            *[f'{_("Channel group")}: {group}' for group in obj.channel_groups.all()],
+        ])
+
     def get_form(self, request, obj=None, **kwargs):
+        kwargs['form'] = bind_upload_user(kwargs.get('form', self.form), request.user)
         form = super().get_form(request, obj, **kwargs)
         if form and form.base_fields.get('channels'):
             form.base_fields['channels'].queryset = Channel.objects.filter(is_completed=True)
@@ -344,6 +609,40 @@ class PostAdmin(ModelAdmin):
         css = {
             'all': ('assets/dist/bundle.css',),
         }
+        js = (
+            'assets/js/admin/upload.js',
+        )
+
+
+class TaskStatusFilter(SimpleListFilter):
+    title = _('Action status')
+    parameter_name = 'status'
+
+    def lookups(self, request, model_admin):
+        return TaskStatusEnum.choices
+
+    def queryset(self, request, queryset):
+        if self.value() in TaskStatusEnum.values:
+            return queryset.filter(result__status=self.value())
+        return queryset
+
+
+class TaskChannelFilter(SimpleListFilter):
+    title = _('Channel id')
+    parameter_name = 'channel'
+    template = 'admin/poster/task/channel_filter.html'
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        value = (self.value() or '').strip()
+        if value.isdigit():
+            return queryset.filter(channel_id=int(value))
+        return queryset
 
 
 @register(Task)
@@ -354,15 +653,35 @@ class TaskAdmin(ModelAdmin):
         'task_id',
         'action_type',
         'action_status',
+        'action_latency',
         'channel',
         'created_at',
     )
 
+    list_filter = (
+        'task_type',
+        TaskStatusFilter,
+        TaskChannelFilter,
+    )
+
+    list_select_related = ('channel',)
+    ordering = ('-created_at', '-id')
+    sortable_by = ()
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
     def action_status(self, obj):
+        is_success = (obj.result or {}).get('status') == TaskStatusEnum.SUCCESS
         return mark_safe(
-            f'<strong class="text-{"success" if obj.response else "danger"}">{_("SUCCESS") if obj.response else _("FAIL")}</strong>' # NOQA
+            f'<strong class="text-{"success" if is_success else "danger"}">{_("SUCCESS") if is_success else _("FAIL")}</strong>' # NOQA
         )
 
+    def action_latency(self, obj):
+        latency = (obj.result or {}).get('latency_ms')
+        return f'{latency} ms' if latency is not None else '-'
+
     def action_type(self, obj):
         color = {
             TaskTypeEnum.CREATE: 'text-green',
@@ -374,6 +693,7 @@ class TaskAdmin(ModelAdmin):
         )
 
     action_status.short_description = _('Action status')
+    action_latency.short_description = _('Latency')
 
     def has_add_permission(self, request):
         return False
@@ -383,3 +703,54 @@ class TaskAdmin(ModelAdmin):
 
     def has_delete_permission(self, request, obj=None):
         return request.user.is_superuser
+
+
+@register(Delivery)
+class DeliveryAdmin(ModelAdmin):
+    model = Delivery
+
+    list_display = (
+        'post',
+        'messenger',
+        'chat_title',
+        'delivery_status',
+        'revision',
+        'sent_at',
+        'delivery_link',
+    )
+
+    list_filter = (
+        'status',
+        'messenger',
+    )
+
+    ordering = ('-sent_at', '-id')
+
+    def delivery_status(self, obj):
+        color = {
+            DeliveryStatusEnum.SENT: 'text-success',
+            DeliveryStatusEnum.PARTIAL: 'text-warning',
+            DeliveryStatusEnum.DELETED: 'text-muted',
+        }
+        return format_html(
+            '<strong class="{}">{}</strong>',
+            color.get(obj.status, 'text-danger'),
+            obj.get_status_display(),
+        )
+
+    def delivery_link(self, obj):
+        if not obj.permalink:
+            return '-'
+        return format_html('<a href="{}" target="_blank">{}</a>', obj.permalink, _('View message'))
+
+    delivery_status.short_description = _('Delivery status')
+    delivery_link.short_description = _('Permalink')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,166 @@
+from json import dumps
+from json import loads
+from os import getpid
+from socket import gethostname
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DataError
+from django.db import IntegrityError
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import now
+from redis import Redis
+from redis.exceptions import RedisError
+from redis.exceptions import ResponseError
+
+from .models import Channel
+from .models import Post
+from .models import Task
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+AUDIT_FIELDS = ('created_at', 'task_id', 'task_type', 'channel_id', 'post_id', 'result')
+AUDIT_GROUP = 'poster'
+
+
+def serialize_task(task: Task) -> str:
+    return dumps({field: getattr(task, field) for field in AUDIT_FIELDS}, cls=DjangoJSONEncoder)
+
+
+def deserialize_task(data: bytes | str) -> Task:
+    values = loads(data)
+    values['created_at'] = parse_datetime(values['created_at'])
+    return Task(**values)
+
+
+class TaskAuditLog:
+    def __init__(self, url: str, stream: str, max_pending: int, batch_size: int, claim_idle: int) -> None:
+        self.url = url
+        self.stream = stream
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.claim_idle = claim_idle
+        self._client: Redis | None = None
+
+    @property
+    def client(self) -> Redis:
+        if self._client is None:
+            self._client = Redis.from_url(self.url)
+        return self._client
+
+    @property
+    def consumer(self) -> str:
+        return f'{gethostname()}-{getpid()}'
+
+    def _is_full(self) -> bool:
+        return bool(self.max_pending) and self.client.xlen(self.stream) >= self.max_pending
+
+    def push(self, task: Task) -> None:
+        if task.created_at is None:
+            task.created_at = now()
+
+        if self.url:
+            try:
+                if not self._is_full():
+                    self.client.xadd(self.stream, {'task': serialize_task(task)})
+                    return
+                logger.warning(f'Task audit stream {self.stream} is full, saving task synchronously')
+            except RedisError as e:
+                logger.exception(e)
+
+        task.save()
+
+    def _ensure_group(self) -> None:
+        try:
+            self.client.xgroup_create(self.stream, AUDIT_GROUP, id='0', mkstream=True)
+        except ResponseError as e:
+            if 'BUSYGROUP' not in str(e):
+                raise
+
+    def _deserialize(self, entries: list) -> list[Task]:
+        tasks = []
+        for entry_id, fields in entries:
+            if not fields:
+                continue
+            try:
+                tasks.append(deserialize_task(fields[b'task']))
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error(f'Dropping malformed task audit entry {entry_id!r}: {e}')
+        return tasks
+
+    def _write_each(self, tasks: list[Task]) -> int:
+        posts = set(Post.objects.filter(pk__in={task.post_id for task in tasks}).values_list('pk', flat=True))
+        channels = set(Channel.objects.filter(
+            pk__in={task.channel_id for task in tasks},
+        ).values_list('pk', flat=True))
+
+        written = 0
+        for task in tasks:
+            if task.post_id not in posts:
+                task.post_id = None
+            if task.channel_id not in channels:
+                task.channel_id = None
+
+            try:
+                with transaction.atomic():
+                    task.save(force_insert=True)
+                written += 1
+            except (DataError, IntegrityError) as e:
+                logger.error(f'Dropping task audit record {serialize_task(task)}: {e}')
+        return written
+
+    def _write(self, entries: list) -> int:
+        if not entries:
+            return 0
+
+        tasks = self._deserialize(entries)
+        try:
+            with transaction.atomic():
+                Task.objects.bulk_create(tasks, batch_size=self.batch_size)
+            written = len(tasks)
+        except (DataError, IntegrityError) as e:
+            logger.warning(f'Task audit batch rejected, writing records one by one: {e}')
+            written = self._write_each(tasks)
+
+        ids = [entry_id for entry_id, _ in entries]
+        self.client.xack(self.stream, AUDIT_GROUP, *ids)
+        self.client.xdel(self.stream, *ids)
+        return written
+
+    def flush(self) -> int:
+        if not self.url:
+            return 0
+
+        self._ensure_group()
+        claimed = self.client.xautoclaim(
+            self.stream,
+            AUDIT_GROUP,
+            self.consumer,
+            self.claim_idle,
+            count=self.batch_size,
+        )
+        written = self._write(claimed[1])
+
+        while True:
+            response = self.client.xreadgroup(
+                AUDIT_GROUP,
+                self.consumer,
+                {self.stream: '>'},
+                count=self.batch_size,
+            )
+            entries = response[0][1] if response else []
+            written += self._write(entries)
+            if len(entries) < self.batch_size:
+                return written
+
+
+audit_log = TaskAuditLog(
+    settings.TASK_AUDIT_URL,
+    settings.TASK_AUDIT_STREAM,
+    settings.TASK_AUDIT_MAX_PENDING,
+    settings.TASK_AUDIT_BATCH_SIZE,
+    settings.TASK_AUDIT_CLAIM_IDLE * 1000,
+)
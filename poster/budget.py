@@ -0,0 +1,49 @@
+from collections import deque
+from contextlib import contextmanager
+from threading import Condition
+from typing import Iterator
+
+from django.conf import settings
+
+
+class MemoryBudget:
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.used = 0
+        self.queue: deque = deque()
+        self.condition = Condition()
+
+    def _can_acquire(self, ticket: object, size: int) -> bool:
+        return self.queue[0] is ticket and self.used + size <= self.capacity
+
+    @contextmanager
+    def reserve(self, size: int) -> Iterator[int]:
+        if self.capacity <= 0:
+            yield size
+            return
+
+        size = min(size, self.capacity)
+        ticket = object()
+
+        with self.condition:
+            self.queue.append(ticket)
+            self.condition.wait_for(lambda: self._can_acquire(ticket, size))
+            self.queue.popleft()
+            self.used += size
+            self.condition.notify_all()
+
+        try:
+            yield size
+        finally:
+            with self.condition:
+                self.used -= size
+                self.condition.notify_all()
+
+
+def get_process_budget() -> int:
+    if settings.MEDIA_MEMORY_BUDGET <= 0:
+        return settings.MEDIA_MEMORY_BUDGET
+    return max(1, settings.MEDIA_MEMORY_BUDGET // max(1, settings.CELERY_WORKER_CONCURRENCY))
+
+
+media_budget = MemoryBudget(get_process_budget())
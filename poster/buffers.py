@@ -0,0 +1,193 @@
+from io import RawIOBase
+from io import SEEK_CUR
+from io import SEEK_END
+from io import SEEK_SET
+from mmap import ACCESS_READ
+from mmap import mmap
+from os import fstat
+from os import path
+from uuid import uuid4
+
+from requests import Session
+from requests.models import RequestEncodingMixin
+from requests.utils import guess_filename
+from requests.utils import to_key_val_list
+
+
+class MediaStream(RawIOBase):
+    def __init__(self, view: memoryview, name: str) -> None:
+        super().__init__()
+        self.view = view
+        self.name = name
+        self.position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def read(self, size: int | None = -1) -> bytes:
+        end = len(self.view) if size is None or size < 0 else min(len(self.view), self.position + size)
+        data = bytes(self.view[self.position:end])
+        self.position = max(self.position, end)
+        return data
+
+    def readall(self) -> bytes:
+        return self.read()
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def seek(self, offset: int, whence: int = SEEK_SET) -> int:
+        if whence == SEEK_CUR:
+            offset += self.position
+        elif whence == SEEK_END:
+            offset += len(self.view)
+        self.position = max(0, offset)
+        return self.position
+
+    def tell(self) -> int:
+        return self.position
+
+    def getbuffer(self) -> memoryview:
+        return self.view
+
+    def close(self) -> None:
+        if not self.closed:
+            self.view.release()
+        super().close()
+
+
+class MediaBuffers:
+    def __init__(self) -> None:
+        self.maps: dict = {}
+        self.views: dict = {}
+
+    def _load(self, filename: str) -> memoryview:
+        if filename not in self.views:
+            with open(filename, mode='rb') as file:
+                if fstat(file.fileno()).st_size:
+                    self.maps[filename] = mmap(file.fileno(), 0, access=ACCESS_READ)
+                    self.views[filename] = memoryview(self.maps[filename])
+                else:
+                    self.views[filename] = memoryview(b'')
+        return self.views[filename]
+
+    def open(self, filename: str) -> MediaStream:
+        return MediaStream(self._load(filename)[:], path.basename(filename))
+
+    def close(self) -> None:
+        for view in self.views.values():
+            view.release()
+        for mapped in self.maps.values():
+            try:
+                mapped.close()
+            except BufferError:
+                pass
+        self.maps = {}
+        self.views = {}
+
+    def __enter__(self) -> 'MediaBuffers':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class MultipartBody(RawIOBase):
+    def __init__(self, parts: list, content_type: str) -> None:
+        super().__init__()
+        self.parts = [memoryview(part).cast('B') for part in parts]
+        self.content_type = content_type
+        self.position = 0
+
+    @classmethod
+    def encode(cls, files, data=None) -> 'MultipartBody | None':
+        streams = []
+        fields = []
+        for name, value in to_key_val_list(files or {}):
+            value = tuple(value) if isinstance(value, (tuple, list)) else (guess_filename(value) or name, value)
+            stream = getattr(value[1], 'file', value[1])
+            if isinstance(stream, MediaStream):
+                placeholder = uuid4().hex.encode()
+                streams.append((placeholder, stream.getbuffer()[stream.tell():]))
+                value = (value[0], placeholder, *value[2:])
+            fields.append((name, value))
+
+        if not streams:
+            return None
+
+        body, content_type = RequestEncodingMixin._encode_files(fields, data)
+        parts = []
+        for placeholder, view in streams:
+            head, _, body = body.partition(placeholder)
+            parts += [head, view]
+        parts.append(body)
+        return cls(parts, content_type)
+
+    def __len__(self) -> int:
+        return sum(part.nbytes for part in self.parts)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        target = memoryview(buffer).cast('B')
+        offset = self.position
+        written = 0
+        for part in self.parts:
+            if written == target.nbytes:
+                break
+            if offset >= part.nbytes:
+                offset -= part.nbytes
+                continue
+            chunk = part[offset:offset + target.nbytes - written]
+            target[written:written + chunk.nbytes] = chunk
+            written += chunk.nbytes
+            offset = 0
+        self.position += written
+        return written
+
+    def seek(self, offset: int, whence: int = SEEK_SET) -> int:
+        if whence == SEEK_CUR:
+            offset += self.position
+        elif whence == SEEK_END:
+            offset += len(self)
+        self.position = max(0, offset)
+        return self.position
+
+    def tell(self) -> int:
+        return self.position
+
+    def close(self) -> None:
+        if not self.closed:
+            for part in self.parts:
+                part.release()
+        super().close()
+
+
+class StreamingSession(Session):
+    def request(self, method, url, params=None, data=None, headers=None, cookies=None, files=None, **kwargs):
+        body = MultipartBody.encode(files, data) if files else None
+
+        if body is None:
+            return super().request(
+                method, url, params=params, data=data, headers=headers, cookies=cookies, files=files, **kwargs,
+            )
+
+        with body:
+            return super().request(
+                method,
+                url,
+                params=params,
+                data=body,
+                headers={**(headers or {}), 'Content-Type': body.content_type},
+                cookies=cookies,
+                **kwargs,
+            )
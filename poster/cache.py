@@ -0,0 +1,119 @@
+from hashlib import sha256
+from os import getpid
+from os import makedirs
+from os import path
+from os import remove
+from os import replace
+from os import scandir
+from os import utime
+from threading import Lock
+from time import time
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files import locks
+from django.core.files.storage import FileSystemStorage
+from django.core.files.storage import Storage
+from django.core.files.storage import default_storage
+
+
+CACHE_LOCK = '.lock'
+EVICTION_GRACE = 60
+
+
+class MediaCache:
+    def __init__(self, root: str, capacity: int, storage: Storage | None = None) -> None:
+        self.root = root
+        self.capacity = capacity
+        self._storage = storage
+        self._lock = Lock()
+
+    @property
+    def storage(self) -> Storage:
+        return self._storage or default_storage
+
+    @property
+    def is_local(self) -> bool:
+        return isinstance(self.storage, FileSystemStorage)
+
+    def _get_cached_path(self, name: str) -> str:
+        key = sha256(name.encode()).hexdigest()
+        return path.join(self.root, key[:2], f'{key}{path.splitext(name)[1]}')
+
+    def _download(self, name: str, cached: str) -> None:
+        makedirs(path.dirname(cached), exist_ok=True)
+        temporary = f'{cached}.{getpid()}.tmp'
+
+        try:
+            with self.storage.open(name, mode='rb') as source, open(temporary, mode='wb') as file:
+                for chunk in source.chunks():
+                    file.write(chunk)
+            replace(temporary, cached)
+        finally:
+            if path.exists(temporary):
+                remove(temporary)
+
+    def _iter_entries(self) -> list:
+        entries = []
+        for directory in scandir(self.root):
+            if not directory.is_dir():
+                continue
+            for entry in scandir(directory.path):
+                if entry.is_file() and not entry.name.endswith('.tmp'):
+                    entries.append(entry)
+        return entries
+
+    def evict(self, keep: str | None = None) -> None:
+        if self.capacity <= 0 or not path.isdir(self.root):
+            return
+
+        with self._lock, open(path.join(self.root, CACHE_LOCK), mode='a') as lock:
+            locks.lock(lock, locks.LOCK_EX)
+            entries = sorted(
+                [(entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in self._iter_entries()]
+            )
+            total = sum(size for _, size, _ in entries)
+            recent = time() - EVICTION_GRACE
+
+            for used_at, size, filename in entries:
+                if total <= self.capacity:
+                    break
+                if filename == keep or used_at > recent:
+                    continue
+                try:
+                    remove(filename)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def get_path(self, name: str) -> str:
+        if self.is_local:
+            return self.storage.path(name)
+
+        cached = self._get_cached_path(name)
+        if path.exists(cached):
+            utime(cached)
+            return cached
+
+        self._download(name, cached)
+        self.evict(keep=cached)
+        return cached
+
+    def find(self, name: str) -> str | None:
+        if self.is_local:
+            filename = self.storage.path(name)
+            return filename if path.exists(filename) else None
+
+        if not path.exists(self._get_cached_path(name)) and not self.storage.exists(name):
+            return None
+        return self.get_path(name)
+
+    def publish(self, filename: str, name: str) -> None:
+        if self.is_local or self.storage.exists(name):
+            return
+
+        with open(filename, mode='rb') as file:
+            self.storage.save(name, File(file))
+
+
+media_cache = MediaCache(settings.MEDIA_CACHE_ROOT, settings.MEDIA_CACHE_SIZE)
@@ -0,0 +1,178 @@
+from datetime import timedelta
+from time import sleep
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.db.models import Q
+from django.db.models import QuerySet
+from django.utils.timezone import now
+
+from discord_bot import DiscordBot
+
+from .enums import MessengerEnum
+from .fragments import invalidate_fragments
+from .models import Bot
+from .models import Channel
+from .sender import Sender
+from .targets import get_posts_for_channels
+from .utils import get_default_channel_image
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+CHANNEL_INFO_FIELDS = ('title', 'description', 'username', 'server_id', 'is_completed')
+
+
+def get_channel_info_key(bot: Bot, channel_id: int) -> str:
+    return f'poster:channel-info:{bot.pk}:{channel_id}'
+
+
+def make_channel_info(messenger: str, info) -> dict:
+    if messenger == MessengerEnum.TELEGRAM:
+        return {
+            'title': info.title,
+            'description': info.description,
+            'username': info.username,
+            'server_id': None,
+            'photo_file_id': info.photo.small_file_id if info.photo else None,
+            'photo_unique_id': info.photo.small_file_unique_id if info.photo else None,
+        }
+
+    return {
+        'title': info.title,
+        'description': info.description,
+        'username': None,
+        'server_id': int(info.guild_id) if info.guild_id else None,
+        'photo_file_id': None,
+        'photo_unique_id': None,
+    }
+
+
+def request_channel_info(bot: Bot, channel_id: int, sender: Sender | None = None) -> dict | None:
+    info = (sender or Sender(bot)).get_channel_info(channel_id)
+    return make_channel_info(bot.bot_type, info) if info else None
+
+
+def fetch_channel_info(bot: Bot, channel_id: int, sender: Sender | None = None) -> dict | None:
+    try:
+        return request_channel_info(bot, channel_id, sender)
+    except Exception as e:
+        logger.exception(e)
+        return None
+
+
+def get_channel_info(bot: Bot, channel_id: int) -> dict | None:
+    key = get_channel_info_key(bot, channel_id)
+    info = cache.get(key)
+
+    if info is None:
+        info = fetch_channel_info(bot, channel_id)
+        if info is not None:
+            cache.set(key, info, settings.CHANNEL_INFO_TIMEOUT)
+
+    return info
+
+
+def apply_channel_info(channel: Channel, info: dict) -> None:
+    channel.title = info['title']
+    channel.description = info['description']
+    channel.is_completed = True
+
+    if channel.channel_type == MessengerEnum.TELEGRAM:
+        channel.username = info['username']
+    else:
+        channel.server_id = info['server_id']
+
+
+def get_stale_channels(bot_pk: int) -> QuerySet:
+    stale = now() - timedelta(seconds=settings.CHANNEL_REFRESH_AGE)
+    return Channel.objects.filter(
+        Q(refreshed_at__isnull=True) | Q(refreshed_at__lt=stale),
+        bot_id=bot_pk,
+        channel_id__isnull=False,
+    ).order_by(F('refreshed_at').asc(nulls_first=True))
+
+
+def refresh_channels(bot: Bot, channel_pks: list[int]) -> list[tuple[int, str, str]]:
+    channels = list(Channel.objects.filter(bot=bot, pk__in=channel_pks).only(
+        'pk', 'channel_type', 'channel_id', 'bot_id', 'tags', 'image_unique_id', *CHANNEL_INFO_FIELDS,
+    ))
+    sender = Sender(bot)
+    interval = 1 / settings.CHANNEL_REFRESH_RATE
+
+    changed, fields, photos = [], set(), []
+    for index, channel in enumerate(channels):
+        if index:
+            sleep(interval)
+
+        info = fetch_channel_info(bot, channel.channel_id, sender)
+        if not info:
+            continue
+
+        cache.set(get_channel_info_key(bot, channel.channel_id), info, settings.CHANNEL_INFO_TIMEOUT)
+        previous = {field: getattr(channel, field) for field in CHANNEL_INFO_FIELDS}
+        apply_channel_info(channel, info)
+
+        updated = [field for field in CHANNEL_INFO_FIELDS if getattr(channel, field) != previous[field]]
+        if updated:
+            changed.append(channel)
+            fields.update(updated)
+
+        if info['photo_unique_id'] and info['photo_unique_id'] != channel.image_unique_id:
+            photos.append((channel.pk, info['photo_file_id'], info['photo_unique_id']))
+
+    timestamp = now()
+    with transaction.atomic():
+        if changed:
+            for channel in changed:
+                channel.updated_at = timestamp
+            Channel.objects.bulk_update(changed, [*sorted(fields), 'updated_at'])
+        Channel.objects.filter(pk__in=[channel.pk for channel in channels]).update(refreshed_at=timestamp)
+
+    if changed:
+        invalidate_fragments(*get_posts_for_channels(changed).values_list('pk', flat=True))
+
+    return photos
+
+
+def sync_guild(bot: Bot, guild_id: int) -> tuple[int, int]:
+    channels = {
+        int(info.channel_id): info
+        for info in DiscordBot(bot.token).get_guild_channels(guild_id)
+        if info.is_postable
+    }
+    existing = {
+        channel.channel_id: channel
+        for channel in Channel.objects.filter(channel_type=MessengerEnum.DISCORD, channel_id__in=channels)
+    }
+
+    timestamp = now()
+    created, updated = [], []
+    for channel_id, data in channels.items():
+        info = make_channel_info(MessengerEnum.DISCORD, data)
+        cache.set(get_channel_info_key(bot, channel_id), info, settings.CHANNEL_INFO_TIMEOUT)
+
+        channel = existing.get(channel_id)
+        if not channel:
+            channel = Channel(channel_type=MessengerEnum.DISCORD, channel_id=channel_id)
+            channel.image.name = get_default_channel_image(MessengerEnum.DISCORD)
+            created.append(channel)
+        else:
+            updated.append(channel)
+
+        apply_channel_info(channel, info)
+        channel.bot = bot
+        channel.refreshed_at = timestamp
+        channel.updated_at = timestamp
+
+    with transaction.atomic():
+        Channel.objects.bulk_create(created, ignore_conflicts=True)
+        Channel.objects.bulk_update(updated, ['bot', 'refreshed_at', 'updated_at', *CHANNEL_INFO_FIELDS])
+
+    if created or updated:
+        invalidate_fragments(*get_posts_for_channels([*created, *updated]).values_list('pk', flat=True))
+
+    return len(created), len(updated)
@@ -0,0 +1,123 @@
+from io import SEEK_END
+from json import dump
+from json import load
+from mimetypes import guess_type
+from os import makedirs
+from os import path
+from os import scandir
+from shutil import rmtree
+from time import time
+from uuid import UUID
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.files import locks
+from django.core.files.uploadedfile import UploadedFile
+
+from .exceptions import UploadNotFound
+from .exceptions import UploadOffsetMismatch
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class ChunkedUploadedFile(UploadedFile):
+    def __init__(self, filename: str, name: str, size: int) -> None:
+        content_type, _ = guess_type(name)
+        super().__init__(
+            open(filename, mode='rb'),
+            name,
+            content_type or 'application/octet-stream',
+            size,
+            None,
+        )
+        self.filename = filename
+
+    def temporary_file_path(self) -> str:
+        return self.filename
+
+
+class ChunkedUpload:
+    def __init__(self, token: str) -> None:
+        try:
+            self.token = UUID(str(token)).hex
+        except ValueError:
+            raise UploadNotFound(f'Upload {token} not found')
+
+        self.directory = path.join(settings.CHUNKED_UPLOAD_ROOT, self.token)
+        self.filename = path.join(self.directory, 'data')
+
+        try:
+            with open(path.join(self.directory, 'meta.json')) as file:
+                meta = load(file)
+        except FileNotFoundError:
+            raise UploadNotFound(f'Upload {token} not found')
+
+        self.name = meta['name']
+        self.size = meta['size']
+        self.field_name = meta['field_name']
+        self.user_id = meta['user_id']
+
+    @classmethod
+    def create(cls, name: str, size: int, field_name: str, user_id: int) -> 'ChunkedUpload':
+        token = uuid4().hex
+        directory = path.join(settings.CHUNKED_UPLOAD_ROOT, token)
+        makedirs(directory)
+
+        open(path.join(directory, 'data'), mode='wb').close()
+        with open(path.join(directory, 'meta.json'), mode='w') as file:
+            dump({
+                'name': path.basename(name),
+                'size': size,
+                'field_name': field_name,
+                'user_id': user_id,
+            }, file)
+
+        return cls(token)
+
+    @property
+    def offset(self) -> int:
+        return path.getsize(self.filename)
+
+    @property
+    def is_complete(self) -> bool:
+        return self.offset == self.size
+
+    def append(self, offset: int, stream, length: int) -> int:
+        with open(self.filename, mode='ab') as file:
+            locks.lock(file, locks.LOCK_EX)
+            file.seek(0, SEEK_END)
+            if offset != file.tell() or offset + length > self.size:
+                raise UploadOffsetMismatch(f'Upload {self.token} expects offset {file.tell()}')
+
+            while length > 0:
+                chunk = stream.read(min(length, STREAM_CHUNK_SIZE))
+                if not chunk:
+                    break
+                file.write(chunk)
+                length -= len(chunk)
+
+            return file.tell()
+
+    def as_uploaded_file(self) -> ChunkedUploadedFile:
+        return ChunkedUploadedFile(self.filename, self.name, self.size)
+
+    def delete(self) -> None:
+        rmtree(self.directory, ignore_errors=True)
+
+
+def cleanup_chunked_uploads() -> None:
+    if not path.isdir(settings.CHUNKED_UPLOAD_ROOT):
+        return
+
+    expired = time() - settings.CHUNKED_UPLOAD_EXPIRY
+    for entry in scandir(settings.CHUNKED_UPLOAD_ROOT):
+        if not entry.is_dir():
+            continue
+        data = path.join(entry.path, 'data')
+        if (path.getmtime(data) if path.exists(data) else entry.stat().st_mtime) < expired:
+            logger.info(f'Removing expired upload {entry.name}')
+            rmtree(entry.path, ignore_errors=True)
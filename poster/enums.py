@@ -18,6 +18,33 @@ class PostTypeEnum(TextChoices):
     VOICE = 'voice', _('Voice message')
 
 
+class TranscodeProfileEnum(TextChoices):
+    VOICE = 'voice', _('Voice message')
+    VIDEO_NOTE = 'video_note', _('Video note')
+
+
+class StorageLinkEnum(TextChoices):
+    HARDLINK = 'hardlink', _('Hard link')
+    SYMLINK = 'symlink', _('Symbolic link')
+
+
+class MediaAccelEnum(TextChoices):
+    X_ACCEL_REDIRECT = 'x-accel-redirect', _('Nginx X-Accel-Redirect')
+    X_SENDFILE = 'x-sendfile', _('X-Sendfile')
+
+
+class DeliveryStatusEnum(TextChoices):
+    SENT = 'sent', _('Sent')
+    PARTIAL = 'partial', _('Partially sent')
+    FAILED = 'failed', _('Failed')
+    DELETED = 'deleted', _('Deleted')
+
+
+class TaskStatusEnum(TextChoices):
+    SUCCESS = 'success', _('SUCCESS')
+    FAIL = 'fail', _('FAIL')
+
+
 class TaskTypeEnum(TextChoices):
     CREATE = 'create', _('CREATE')
     UPDATE = 'update', _('UPDATE')
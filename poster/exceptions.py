@@ -10,3 +10,33 @@ class UnknownPostType(Exception):
 
 class SenderNotFound(Exception):
     pass
+
+
+class MediaNotReady(Exception):
+    pass
+
+
+class TranscodeFailed(Exception):
+    pass
+
+
+class ChannelNotResolved(Exception):
+    pass
+
+
+class PayloadTooLarge(Exception):
+    pass
+
+
+class UploadNotFound(Exception):
+    pass
+
+
+class UploadOffsetMismatch(Exception):
+    pass
+
+
+class PartialDelivery(Exception):
+    def __init__(self, messages: list) -> None:
+        super().__init__(f'Delivery interrupted after {len(messages)} messages')
+        self.messages = messages
@@ -1,25 +1,37 @@
 from json import dumps
-from magic import Magic
 
 from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
 from django.forms import CharField
+from django.forms import ClearableFileInput
+from django.forms import FileField
+from django.forms import Form
 from django.forms import HiddenInput
+from django.forms import ModelChoiceField
 from django.forms import ModelForm
 from django.forms import ValidationError
+from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
 
 from froala_editor.widgets import FroalaEditor
 from munch import munchify
 from telebot.apihelper import ApiTelegramException
 
+from .channels import get_channel_info
+from .chunked import ChunkedUpload
 from .enums import MessengerEnum
 from .enums import PostTypeEnum
+from .exceptions import UploadNotFound
+from .media import MB
 from .mixins import MediaGalleryMixin
 from .models import Bot
 from .models import Channel
 from .models import GalleryDocument
 from .models import GalleryPhoto
 from .models import Post
+from .uploads import UPLOAD_LIMITS
+from .uploads import is_mime_allowed
+from .uploads import is_too_large
 
 from discord_bot import ApiDiscordException
 from discord_bot import DiscordBot
@@ -29,6 +41,9 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+PUBLISH_ACTIONS = ('_save_and_publish', '_save_and_publish_silently')
+
+
 class InlineFroalaEditor(FroalaEditor):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -38,6 +53,54 @@ class InlineFroalaEditor(FroalaEditor):
         })
 
 
+class ChunkedFileInput(ClearableFileInput):
+    user_id: int | None = None
+
+    def __init__(self, attrs: dict | None = None) -> None:
+        super().__init__(attrs)
+        self.uploads: dict = {}
+
+    def __deepcopy__(self, memo: dict) -> 'ChunkedFileInput':
+        obj = super().__deepcopy__(memo)
+        obj.uploads = {}
+        return obj
+
+    def get_upload(self, data: dict, name: str) -> ChunkedUpload | None:
+        token = data.get(f'{name}_upload_token')
+        if not token or self.user_id is None:
+            return None
+
+        try:
+            upload = ChunkedUpload(token)
+        except UploadNotFound:
+            return None
+
+        if upload.user_id != self.user_id or upload.field_name != name:
+            return None
+        return upload if upload.is_complete else None
+
+    def value_from_datadict(self, data: dict, files: dict, name: str):
+        upload = self.get_upload(data, name)
+        if upload:
+            if name not in self.uploads:
+                self.uploads[name] = upload.as_uploaded_file()
+            return self.uploads[name]
+        return super().value_from_datadict(data, files, name)
+
+    def close_uploads(self) -> None:
+        for file in self.uploads.values():
+            file.close()
+        self.uploads.clear()
+
+    def value_omitted_from_data(self, data: dict, files: dict, name: str) -> bool:
+        return not self.get_upload(data, name) and super().value_omitted_from_data(data, files, name)
+
+    def get_context(self, name: str, value, attrs: dict | None) -> dict:
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-chunked-upload-url'] = reverse('admin:poster_post_upload')
+        return context
+
+
 class BotAdminForm(ModelForm):
     messages = munchify({
         'discord_token_error': _('Unable to retrieve bot telegram data for this token'),
@@ -90,12 +153,8 @@ class ChannelAdminForm(ModelForm):
         model = Channel
         fields = '__all__'
 
-    def _validate_discord_fields(self) -> None:
-        if not DiscordBot(self.bot.token).is_channel_with_id_exists(self.channel_id):
-            raise ValidationError(self.messages.channel_id_error)
-
-    def _validate_telegram_fields(self) -> None:
-        if not TelegramBot(self.bot.token).is_channel_with_id_exists(self.channel_id):
+    def _validate_channel_fields(self) -> None:
+        if not get_channel_info(self.bot, self.channel_id):
             raise ValidationError(self.messages.channel_id_error)
 
     def clean(self) -> None:
@@ -106,13 +165,62 @@ class ChannelAdminForm(ModelForm):
         if self.bot:
             if not self.channel_id:
                 raise ValidationError(self.messages.channel_id_required)
-            elif self.bot.bot_type == MessengerEnum.DISCORD:
-                self._validate_discord_fields()
-            elif self.bot.bot_type == MessengerEnum.TELEGRAM:
-                self._validate_telegram_fields()
+            elif self.bot.bot_type in MessengerEnum.values:
+                self._validate_channel_fields()
+
+
+class ChannelImportForm(Form):
+    file = FileField(
+        label=_('File'),
+        help_text=_('CSV or JSON with channel_id and optional bot (id or username) and tags columns'),
+    )
+    bot = ModelChoiceField(
+        queryset=Bot.objects.all(),
+        required=False,
+        label=_('Bot'),
+        help_text=_('Used for rows without a bot'),
+    )
+
+    def clean_file(self) -> UploadedFile:
+        file = self.cleaned_data['file']
+        if not file.name.lower().endswith(('.csv', '.json')):
+            raise ValidationError(_('Only CSV and JSON files are supported'))
+        return file
+
+
+def validate_upload(kind: str, file: UploadedFile, message: str | None = None) -> None:
+    limits = UPLOAD_LIMITS[kind]
+    if is_too_large(file, limits):
+        raise ValidationError(
+            _('File is too large, the maximum size is %(size)s MB'),
+            params={'size': limits.max_bytes // MB},
+        )
 
+    if not is_mime_allowed(file, limits):
+        raise ValidationError(message)
 
-class PostAdminForm(ModelForm):
+
+class ChunkedUploadFormMixin:
+    upload_user_id: int | None = None
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+
+        for field in self.fields.values():
+            if isinstance(field.widget, ChunkedFileInput):
+                field.widget.user_id = self.upload_user_id
+
+    def close_uploads(self) -> None:
+        for field in self.fields.values():
+            if isinstance(field.widget, ChunkedFileInput):
+                field.widget.close_uploads()
+
+
+def bind_upload_user(form: type, user) -> type:
+    return type(form.__name__, (form,), {'upload_user_id': user.pk})
+
+
+class PostAdminForm(ChunkedUploadFormMixin, ModelForm):
 
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
@@ -127,66 +235,94 @@ class PostAdminForm(ModelForm):
         fields = '__all__'
 
         widgets = {
+            'audio': ChunkedFileInput(),
             'caption': FroalaEditor(),
+            'document': ChunkedFileInput(),
             'message': FroalaEditor(),
+            'photo': ChunkedFileInput(),
+            'video': ChunkedFileInput(),
+            'voice': ChunkedFileInput(),
         }
 
+    def _validate_upload(self, kind: str, file: UploadedFile | None, message: str | None = None) -> None:
+        if isinstance(file, UploadedFile):
+            validate_upload(kind, file, message)
+
+    def is_publishing(self) -> bool:
+        return self.instance.is_published or any(self.data.get(action) for action in PUBLISH_ACTIONS)
+
     def clean(self) -> None:
         cleaned_data = super().clean()
-        mime = Magic(mime=True)
+
+        if (
+            self.is_publishing()
+            and 'channels' in self.fields
+            and not (cleaned_data.get('channels') or cleaned_data.get('channel_groups'))
+        ):
+            raise ValidationError(_('Select channels or channel groups'))
 
         if self.instance.post_type == PostTypeEnum.AUDIO:
             audio = cleaned_data.get('audio')
             if not (self.instance.audio or audio):
                 raise ValidationError(_('Audio file required'))
 
-            if audio:
-                if not mime.from_buffer(audio.read()).startswith('audio/'):
-                    raise ValidationError(_('Select audio file'))
-                audio.seek(0)
+            self._validate_upload('audio', audio, _('Select audio file'))
 
         elif self.instance.post_type == PostTypeEnum.DOCUMENT:
-            if not (self.instance.document or cleaned_data.get('document')):
+            document = cleaned_data.get('document')
+            if not (self.instance.document or document):
                 raise ValidationError(_('Document file required'))
 
+            self._validate_upload('document', document)
+
         elif self.instance.post_type == PostTypeEnum.TEXT and not cleaned_data.get('message'):
             raise ValidationError(_('Text message required'))
 
         elif self.instance.post_type == PostTypeEnum.PHOTO:
-            if not (self.instance.photo or cleaned_data.get('photo')):
+            photo = cleaned_data.get('photo')
+            if not (self.instance.photo or photo):
                 raise ValidationError(_('Photo file required'))
 
+            self._validate_upload('photo', photo)
+
         elif self.instance.post_type == PostTypeEnum.VIDEO:
             video = cleaned_data.get('video')
             if not (self.instance.video or video):
                 raise ValidationError(_('Video file required'))
 
-            if video:
-                if not mime.from_buffer(video.read()).startswith('video/'):
-                    raise ValidationError(_('Select video file'))
-                video.seek(0)
+            self._validate_upload('video', video, _('Select video file'))
 
         elif self.instance.post_type == PostTypeEnum.VOICE:
             voice = cleaned_data.get('voice')
             if not (self.instance.voice or voice):
                 raise ValidationError(_('Voice file required'))
 
-            if voice:
-                if not mime.from_buffer(voice.read()).startswith('audio/'):
-                    raise ValidationError(_('Select audio file'))
-                voice.seek(0)
+            self._validate_upload('voice', voice, _('Select audio file'))
 
 
-class BaseGalleryInlineForm(ModelForm, MediaGalleryMixin):
+class BaseGalleryInlineForm(ChunkedUploadFormMixin, ModelForm, MediaGalleryMixin):
+    upload_kind: str
+
     froala_editor_options = CharField(widget=HiddenInput, initial=dumps(settings.FROALA_EDITOR_OPTIONS))
 
+    def clean_file(self) -> UploadedFile | None:
+        file = self.cleaned_data.get('file')
+        if isinstance(file, UploadedFile):
+            validate_upload(self.upload_kind, file)
+        return file
+
 
 class GalleryDocumentInlineForm(BaseGalleryInlineForm):
+    upload_kind = 'document'
 
     class Meta:
         model = GalleryDocument
         fields = '__all__'
 
+        widgets = {
+            'file': ChunkedFileInput(),
+        }
+
     caption = CharField(
         widget=InlineFroalaEditor(attrs={'rows': 1, 'cols': 80}),
         label=_('Document caption'),
@@ -195,11 +331,16 @@ class GalleryDocumentInlineForm(BaseGalleryInlineForm):
 
 
 class GalleryPhotoInlineForm(BaseGalleryInlineForm):
+    upload_kind = 'photo'
 
     class Meta:
         model = GalleryPhoto
         fields = '__all__'
 
+        widgets = {
+            'file': ChunkedFileInput(),
+        }
+
     caption = CharField(
         widget=InlineFroalaEditor(attrs={'class': 'form-control', 'rows': 1, 'cols': 80}),
         label=_('Photo caption'),
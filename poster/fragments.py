@@ -0,0 +1,49 @@
+from typing import Callable
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.safestring import SafeString
+from django.utils.safestring import mark_safe
+
+from .models import Post
+
+
+POST_FRAGMENTS = ('post_content', 'post_channels')
+
+
+def get_fragment_key(name: str, pk: int, updated_at) -> str:
+    return f'poster:fragment:{name}:{pk}:{updated_at.timestamp() if updated_at else 0}'
+
+
+def prefetch_fragments(posts: Iterable[Post], names: Iterable[str] = POST_FRAGMENTS) -> None:
+    keys = {
+        (post, name): get_fragment_key(name, post.pk, post.updated_at)
+        for post in posts for name in names
+    }
+    cached = cache.get_many(keys.values())
+
+    for (post, name), key in keys.items():
+        if not hasattr(post, '_fragments'):
+            post._fragments = {}
+        post._fragments[name] = cached.get(key)
+
+
+def get_fragment(post: Post, name: str, render: Callable[[], str]) -> SafeString:
+    fragments = getattr(post, '_fragments', None)
+    key = get_fragment_key(name, post.pk, post.updated_at)
+    value = fragments.get(name) if fragments is not None else cache.get(key)
+
+    if value is None:
+        value = str(render() or '')
+        cache.set(key, value, settings.FRAGMENT_CACHE_TIMEOUT)
+
+    return mark_safe(value)
+
+
+def invalidate_fragments(*pks: int) -> None:
+    posts = Post.objects.filter(pk__in=[pk for pk in pks if pk]).values_list('pk', 'updated_at')
+    cache.delete_many([
+        get_fragment_key(name, pk, updated_at)
+        for pk, updated_at in posts for name in POST_FRAGMENTS
+    ])
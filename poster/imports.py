@@ -0,0 +1,233 @@
+from concurrent.futures import ThreadPoolExecutor
+from csv import DictReader
+from csv import Error as CSVError
+from csv import writer
+from io import StringIO
+from json import loads
+from threading import Lock
+from time import monotonic
+from time import sleep
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.utils.timezone import now
+
+from .channels import apply_channel_info
+from .channels import get_channel_info_key
+from .channels import request_channel_info
+from .models import Bot
+from .models import Channel
+from .results import get_error_code
+from .results import get_error_message
+from .utils import get_default_channel_image
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+IMPORT_BATCH_SIZE = 500
+IMPORT_RETRIES = 3
+PARSE_ERRORS = (CSVError, KeyError, TypeError, ValueError)
+
+
+class ChannelRow(NamedTuple):
+    row: int
+    channel_id: str
+    bot: str
+    tags: list
+
+
+class ImportFailure(NamedTuple):
+    row: int
+    channel_id: str
+    error: str
+
+
+class ImportReport(NamedTuple):
+    created: list
+    skipped: int
+    failures: list
+    photos: list
+
+
+class RateLimiter:
+    def __init__(self, rate: float) -> None:
+        self.interval = 1 / rate
+        self._next = 0.0
+        self._lock = Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            start = max(monotonic(), self._next)
+            self._next = start + self.interval
+
+        delay = start - monotonic()
+        if delay > 0:
+            sleep(delay)
+
+    def pause(self, delay: float) -> None:
+        with self._lock:
+            self._next = max(self._next, monotonic() + delay)
+
+
+def get_retry_after(exception: BaseException) -> float | None:
+    if get_error_code(exception) != 429:
+        return None
+
+    parameters = (getattr(exception, 'result_json', None) or {}).get('parameters') or {}
+    retry_after = parameters.get('retry_after')
+    if retry_after is None:
+        try:
+            retry_after = loads(getattr(exception, 'description', None) or '{}').get('retry_after')
+        except (AttributeError, ValueError):
+            retry_after = None
+
+    return float(retry_after or 1)
+
+
+def parse_channels(content: str, name: str) -> list[ChannelRow]:
+    if name.lower().endswith('.json'):
+        items = [item if isinstance(item, dict) else {'channel_id': item} for item in loads(content)]
+    else:
+        items = list(DictReader(StringIO(content)))
+
+    rows = []
+    for row, item in enumerate(items, start=1):
+        tags = item.get('tags') or []
+        if isinstance(tags, str):
+            tags = [tag.strip() for tag in tags.split(',') if tag.strip()]
+
+        rows.append(ChannelRow(
+            row=row,
+            channel_id=str(item.get('channel_id') or '').strip(),
+            bot=str(item.get('bot') or '').strip(),
+            tags=tags,
+        ))
+
+    return rows
+
+
+def get_bots(rows: list[ChannelRow]) -> dict[str, Bot]:
+    names = {row.bot for row in rows if row.bot}
+    if not names:
+        return {}
+
+    bots = {}
+    for bot in Bot.objects.filter(Q(username__in=names) | Q(pk__in=[name for name in names if name.isdigit()])):
+        bots[str(bot.pk)] = bot
+        if bot.username:
+            bots[bot.username] = bot
+    return bots
+
+
+def import_channels(rows: list[ChannelRow], default_bot: Bot | None = None) -> ImportReport:
+    bots = get_bots(rows)
+    failures, candidates, seen = [], [], set()
+
+    for row in rows:
+        bot = bots.get(row.bot) if row.bot else default_bot
+        if not bot:
+            error = f'Bot {row.bot} not found' if row.bot else 'Bot not set'
+            failures.append(ImportFailure(row.row, row.channel_id, error))
+            continue
+
+        try:
+            channel_id = int(row.channel_id)
+        except ValueError:
+            failures.append(ImportFailure(row.row, row.channel_id, 'Invalid channel id'))
+            continue
+
+        if (bot.bot_type, channel_id) not in seen:
+            seen.add((bot.bot_type, channel_id))
+            candidates.append((row, bot, channel_id))
+
+    existing = set(Channel.objects.filter(
+        channel_id__in=[channel_id for _row, _bot, channel_id in candidates],
+    ).values_list('channel_type', 'channel_id'))
+    pending = [item for item in candidates if (item[1].bot_type, item[2]) not in existing]
+
+    limiters = {bot.pk: RateLimiter(settings.CHANNEL_IMPORT_RATE) for _row, bot, _channel_id in pending}
+
+    def validate(item: tuple) -> tuple[dict | None, str | None]:
+        _row, bot, channel_id = item
+        key = get_channel_info_key(bot, channel_id)
+        info = cache.get(key)
+        if info is not None:
+            return info, None
+
+        for attempt in range(IMPORT_RETRIES + 1):
+            limiters[bot.pk].wait()
+            try:
+                info = request_channel_info(bot, channel_id)
+            except Exception as e:
+                retry_after = get_retry_after(e)
+                if retry_after is None or attempt == IMPORT_RETRIES:
+                    return None, get_error_message(e)
+                limiters[bot.pk].pause(retry_after)
+                continue
+
+            if not info:
+                return None, 'Channel not found or bot has no access'
+            cache.set(key, info, settings.CHANNEL_INFO_TIMEOUT)
+            return info, None
+
+    with ThreadPoolExecutor(max_workers=settings.CHANNEL_IMPORT_WORKERS) as executor:
+        results = list(executor.map(validate, pending))
+
+    timestamp = now()
+    imported = []
+    for (row, bot, channel_id), (info, error) in zip(pending, results):
+        if not info:
+            failures.append(ImportFailure(row.row, row.channel_id, error))
+            continue
+
+        channel = Channel(bot=bot, channel_type=bot.bot_type, channel_id=channel_id, tags=row.tags)
+        channel.image.name = get_default_channel_image(bot.bot_type)
+        channel.refreshed_at = timestamp
+        apply_channel_info(channel, info)
+        imported.append((row, channel, info))
+
+    created, photos = [], []
+    if imported:
+        channels = [channel for _row, channel, _info in imported]
+        Channel.objects.bulk_create(channels, batch_size=IMPORT_BATCH_SIZE, ignore_conflicts=True)
+        inserted = {
+            (channel_type, channel_id): pk
+            for channel_type, channel_id, pk in Channel.objects.filter(
+                channel_id__in=[channel.channel_id for channel in channels],
+                refreshed_at=timestamp,
+            ).values_list('channel_type', 'channel_id', 'pk')
+        }
+
+        for row, channel, info in imported:
+            channel.pk = inserted.get((channel.channel_type, channel.channel_id))
+            if not channel.pk:
+                failures.append(ImportFailure(row.row, row.channel_id, 'Channel was added while importing'))
+                continue
+
+            created.append(channel)
+            if info['photo_file_id']:
+                photos.append((channel.pk, info['photo_file_id'], info['photo_unique_id']))
+
+    return ImportReport(
+        created=created,
+        skipped=len(rows) - len(created) - len(failures),
+        failures=sorted(failures),
+        photos=photos,
+    )
+
+
+def write_report(failures: list[ImportFailure]) -> str:
+    content = StringIO()
+    report = writer(content)
+    report.writerow(ImportFailure._fields)
+    report.writerows(failures)
+    return content.getvalue()
+
+
+def save_report(name: str, failures: list[ImportFailure]) -> str:
+    return default_storage.save(name, ContentFile(write_report(failures).encode()))
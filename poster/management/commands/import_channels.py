@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from poster.imports import PARSE_ERRORS
+from poster.imports import import_channels
+from poster.imports import parse_channels
+from poster.imports import write_report
+from poster.models import Bot
+from poster.tasks import download_channel_photo_task
+
+
+class Command(BaseCommand):
+    help = 'Import channels from a CSV or JSON file with channel_id, bot and tags columns'
+
+    def add_arguments(self, parser) -> None:
+        parser.add_argument('path', help='CSV or JSON file with the channels to import')
+        parser.add_argument('--bot', help='Id or username of the bot used for rows without a bot')
+        parser.add_argument('--report', help='Write the failure report to this CSV file instead of stdout')
+
+    def handle(self, *args, **options) -> None:
+        bot = None
+        if options['bot']:
+            value = options['bot']
+            bot = Bot.objects.filter(pk=value).first() if value.isdigit() else None
+            bot = bot or Bot.objects.filter(username=value).first()
+            if not bot:
+                raise CommandError(f'Bot {value} not found')
+
+        try:
+            with open(options['path'], encoding='utf-8-sig') as file:
+                rows = parse_channels(file.read(), options['path'])
+        except (OSError, *PARSE_ERRORS) as e:
+            raise CommandError(f'Unable to read {options["path"]}: {e}')
+
+        result = import_channels(rows, bot)
+        for channel_pk, file_id, unique_id in result.photos:
+            download_channel_photo_task.delay(channel_pk, file_id, unique_id)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(result.created)} created, {result.skipped} skipped, {len(result.failures)} failed'
+        ))
+
+        if not result.failures:
+            return
+
+        if options['report']:
+            with open(options['report'], mode='w', newline='') as file:
+                file.write(write_report(result.failures))
+        else:
+            self.stdout.write(write_report(result.failures), ending='')
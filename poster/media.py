@@ -0,0 +1,312 @@
+from functools import lru_cache
+from hashlib import sha256
+from io import BytesIO
+from subprocess import CalledProcessError
+from subprocess import TimeoutExpired
+from subprocess import run
+from os import makedirs
+from os import getpid
+from os import path
+from os import remove
+from os import replace
+from os import stat
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+from PIL import ImageOps
+
+from .cache import media_cache
+from .enums import MessengerEnum
+from .enums import TranscodeProfileEnum
+from .exceptions import TranscodeFailed
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+MB = 1024 * 1024
+
+DISCORD_FILE_SIZE_TIERS = {
+    0: 25 * MB,
+    1: 25 * MB,
+    2: 50 * MB,
+    3: 100 * MB,
+}
+
+
+class PhotoLimits(NamedTuple):
+    max_bytes: int
+    max_side: int | None = None
+    max_dimensions_sum: int | None = None
+
+
+PHOTO_LIMITS = {
+    MessengerEnum.DISCORD: PhotoLimits(
+        max_bytes=DISCORD_FILE_SIZE_TIERS.get(settings.DISCORD_BOOST_TIER, DISCORD_FILE_SIZE_TIERS[0]),
+    ),
+    MessengerEnum.TELEGRAM: PhotoLimits(
+        max_bytes=10 * MB,
+        max_side=2560,
+        max_dimensions_sum=10000,
+    ),
+}
+
+JPEG_QUALITIES = (85, 75, 65, 55)
+
+THUMBNAIL_SIZE = 152
+THUMBNAIL_QUALITY = 80
+
+TRANSCODE_PROFILES = {
+    TranscodeProfileEnum.VOICE: ('ogg', [
+        '-vn',
+        '-ac', '1',
+        '-c:a', 'libopus',
+        '-b:a', '48k',
+        '-f', 'ogg',
+    ]),
+    TranscodeProfileEnum.VIDEO_NOTE: ('mp4', [
+        '-t', '60',
+        '-vf', "crop='2*trunc(min(iw,ih)/2)':'2*trunc(min(iw,ih)/2)',scale='min(640,iw)':'min(640,ih)'",
+        '-c:v', 'libx264',
+        '-preset', 'veryfast',
+        '-crf', '26',
+        '-pix_fmt', 'yuv420p',
+        '-c:a', 'aac',
+        '-b:a', '96k',
+        '-movflags', '+faststart',
+        '-f', 'mp4',
+    ]),
+}
+
+
+def get_derivatives_root() -> str:
+    return path.join(settings.MEDIA_ROOT, 'derivatives')
+
+
+@lru_cache(maxsize=1024)
+def _get_file_hash(filename: str, size: int, mtime: float) -> str:
+    digest = sha256()
+    with open(filename, mode='rb') as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_file_hash(filename: str) -> str:
+    info = stat(filename)
+    return _get_file_hash(filename, info.st_size, info.st_mtime)
+
+
+def _get_scale(width: int, height: int, limits: PhotoLimits) -> float:
+    scale = 1.0
+    if limits.max_side:
+        scale = min(scale, limits.max_side / max(width, height))
+    if limits.max_dimensions_sum:
+        scale = min(scale, limits.max_dimensions_sum / (width + height))
+    return scale
+
+
+def is_photo_compliant(filename: str, limits: PhotoLimits) -> bool:
+    if path.getsize(filename) > limits.max_bytes:
+        return False
+
+    with Image.open(filename) as image:
+        return _get_scale(*image.size, limits) >= 1
+
+
+def _has_alpha(image: Image.Image) -> bool:
+    return image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+
+
+def _encode(image: Image.Image, quality: int) -> bytes:
+    buffer = BytesIO()
+    if _has_alpha(image):
+        image.save(buffer, format='PNG', optimize=True)
+    else:
+        image.convert('RGB').save(buffer, format='JPEG', quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def render_photo(filename: str, limits: PhotoLimits) -> tuple[bytes, str]:
+    with Image.open(filename) as source:
+        image = ImageOps.exif_transpose(source)
+        scale = _get_scale(*image.size, limits)
+
+        while True:
+            size = (max(1, int(image.width * scale)), max(1, int(image.height * scale)))
+            resized = image.resize(size, Image.LANCZOS) if scale < 1 else image
+
+            for quality in JPEG_QUALITIES:
+                content = _encode(resized, quality)
+                if len(content) <= limits.max_bytes or _has_alpha(resized):
+                    break
+
+            if len(content) <= limits.max_bytes:
+                return content, 'png' if _has_alpha(resized) else 'jpg'
+
+            scale *= 0.75
+
+
+def get_thumbnail_name(name: str, size: int) -> str:
+    key = sha256(name.encode()).hexdigest()
+    return f'thumbnails/{key[:2]}/{key}.{size}.jpg'
+
+
+def render_thumbnail(filename: str, size: int) -> bytes:
+    with Image.open(filename) as source:
+        image = ImageOps.fit(ImageOps.exif_transpose(source).convert('RGB'), (size, size), Image.LANCZOS)
+
+    buffer = BytesIO()
+    image.save(buffer, format='JPEG', quality=THUMBNAIL_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def make_thumbnail(name: str, size: int = THUMBNAIL_SIZE) -> str:
+    thumbnail = get_thumbnail_name(name, size)
+    if default_storage.exists(thumbnail):
+        return thumbnail
+    return default_storage.save(thumbnail, ContentFile(render_thumbnail(media_cache.get_path(name), size)))
+
+
+@lru_cache(maxsize=4096)
+def _get_thumbnail(name: str, size: int) -> str:
+    return make_thumbnail(name, size)
+
+
+def get_thumbnail_url(name: str, size: int = THUMBNAIL_SIZE) -> str | None:
+    try:
+        thumbnail = _get_thumbnail(name, size)
+    except (OSError, Image.DecompressionBombError) as e:
+        logger.exception(e)
+        return None
+    return default_storage.url(thumbnail)
+
+
+def get_derivative_path(file_hash: str, messenger: str, ext: str) -> str:
+    return path.join(get_derivatives_root(), file_hash[:2], f'{file_hash}.{messenger}.{ext}')
+
+
+def get_derivative_storage_name(derivative: str) -> str:
+    return path.relpath(derivative, settings.MEDIA_ROOT).replace(path.sep, '/')
+
+
+def find_derivative(derivative: str) -> str | None:
+    if path.exists(derivative):
+        return derivative
+    return media_cache.find(get_derivative_storage_name(derivative))
+
+
+def find_photo_derivative(file_hash: str, messenger: str) -> str | None:
+    for ext in ('jpg', 'png'):
+        derivative = find_derivative(get_derivative_path(file_hash, messenger, ext))
+        if derivative:
+            return derivative
+    return None
+
+
+def make_photo_derivative(filename: str, messenger: str) -> str:
+    limits = PHOTO_LIMITS[messenger]
+
+    if is_photo_compliant(filename, limits):
+        return filename
+
+    file_hash = get_file_hash(filename)
+    derivative = find_photo_derivative(file_hash, messenger)
+    if derivative:
+        return derivative
+
+    content, ext = render_photo(filename, limits)
+    derivative = get_derivative_path(file_hash, messenger, ext)
+
+    makedirs(path.dirname(derivative), exist_ok=True)
+    temporary = f'{derivative}.{getpid()}.tmp'
+    with open(temporary, mode='wb') as file:
+        file.write(content)
+    replace(temporary, derivative)
+    media_cache.publish(derivative, get_derivative_storage_name(derivative))
+
+    return derivative
+
+
+def get_photo_for_messenger(filename: str, messenger: str) -> str:
+    try:
+        return make_photo_derivative(filename, messenger)
+    except (OSError, Image.DecompressionBombError) as e:
+        logger.exception(e)
+        return filename
+
+
+def make_photo_derivatives(filename: str) -> None:
+    for messenger in PHOTO_LIMITS:
+        get_photo_for_messenger(filename, messenger)
+
+
+def get_transcoded_path(filename: str, profile: str) -> str:
+    ext, _ = TRANSCODE_PROFILES[profile]
+    return get_derivative_path(get_file_hash(filename), profile, ext)
+
+
+def find_transcoded(filename: str, profile: str) -> str | None:
+    return find_derivative(get_transcoded_path(filename, profile))
+
+
+def get_transcode_failure_path(filename: str, profile: str) -> str:
+    return f'{get_transcoded_path(filename, profile)}.failed'
+
+
+def find_transcode_failure(filename: str, profile: str) -> str | None:
+    failure = find_derivative(get_transcode_failure_path(filename, profile))
+    if not failure:
+        return None
+
+    with open(failure) as file:
+        return file.read() or f'Transcode to {profile} failed'
+
+
+def mark_transcode_failure(filename: str, profile: str, error: str) -> None:
+    failure = get_transcode_failure_path(filename, profile)
+    with open(failure, mode='w') as file:
+        file.write(error)
+    media_cache.publish(failure, get_derivative_storage_name(failure))
+
+
+def transcode(filename: str, profile: str) -> str:
+    transcoded = find_transcoded(filename, profile)
+    if transcoded:
+        return transcoded
+
+    error = find_transcode_failure(filename, profile)
+    if error:
+        raise TranscodeFailed(error)
+
+    transcoded = get_transcoded_path(filename, profile)
+    temporary = f'{transcoded}.{getpid()}.tmp'
+    _, args = TRANSCODE_PROFILES[profile]
+
+    makedirs(path.dirname(transcoded), exist_ok=True)
+    try:
+        run(
+            [settings.FFMPEG_BINARY, '-y', '-loglevel', 'error', '-i', filename, *args, temporary],
+            check=True,
+            capture_output=True,
+            timeout=settings.FFMPEG_TIMEOUT,
+        )
+        replace(temporary, transcoded)
+        media_cache.publish(transcoded, get_derivative_storage_name(transcoded))
+    except (CalledProcessError, TimeoutExpired) as e:
+        stderr = e.stderr.decode(errors='replace').strip() if e.stderr else ''
+        error = f'Transcode of {path.basename(filename)} to {profile} failed: {stderr or e}'
+        mark_transcode_failure(filename, profile, error)
+        raise TranscodeFailed(error) from e
+    finally:
+        if path.exists(temporary):
+            remove(temporary)
+
+    return transcoded
+
+
+def get_derivative_name(name: str, filename: str) -> str:
+    return f'{path.splitext(path.basename(name))[0]}{path.splitext(filename)[1]}'
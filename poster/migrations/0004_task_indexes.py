@@ -0,0 +1,36 @@
+# Generated by Django 4.2.4 on 2026-10-19 19:53
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('poster', '0003_post_is_silent_alter_channel_server_id'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='task',
+            options={'ordering': ['-created_at', '-id'], 'verbose_name': 'Task', 'verbose_name_plural': 'Tasks'},
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(fields=['-created_at', '-id'], name='poster_task_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(fields=['task_type', '-created_at', '-id'], name='poster_task_type_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(fields=['channel', '-created_at', '-id'], name='poster_task_chan_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='task',
+            index=models.Index(condition=models.Q(('response__isnull', True)), fields=['-created_at', '-id'], name='poster_task_failed_created_idx'),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 4.2.4 on 2026-10-19 20:30
+
+from django.db import migrations, models
+
+
+INDEXES_SQL = '''
+CREATE INDEX poster_task_created_idx ON poster_task (created_at DESC, id DESC);
+CREATE INDEX poster_task_type_created_idx ON poster_task (task_type, created_at DESC, id DESC);
+CREATE INDEX poster_task_chan_created_idx ON poster_task (channel_id, created_at DESC, id DESC);
+CREATE INDEX poster_task_failed_created_idx ON poster_task (created_at DESC, id DESC) WHERE response IS NULL;
+CREATE INDEX poster_task_post_id_idx ON poster_task (post_id);
+ALTER TABLE poster_task ADD CONSTRAINT poster_task_channel_id_fk_poster_channel_id
+    FOREIGN KEY (channel_id) REFERENCES poster_channel (id) DEFERRABLE INITIALLY DEFERRED;
+ALTER TABLE poster_task ADD CONSTRAINT poster_task_post_id_fk_poster_post_id
+    FOREIGN KEY (post_id) REFERENCES poster_post (id) DEFERRABLE INITIALLY DEFERRED;
+SELECT setval(pg_get_serial_sequence('poster_task', 'id'), COALESCE((SELECT max(id) FROM poster_task), 0) + 1, false);
+'''
+
+PARTITION_SQL = '''
+UPDATE poster_task SET created_at = COALESCE(updated_at, now()) WHERE created_at IS NULL;
+ALTER TABLE poster_task RENAME TO poster_task_legacy;
+ALTER TABLE poster_task_legacy RENAME CONSTRAINT poster_task_pkey TO poster_task_legacy_pkey;
+
+CREATE TABLE poster_task (LIKE poster_task_legacy) PARTITION BY RANGE (created_at);
+ALTER TABLE poster_task ALTER COLUMN created_at SET NOT NULL;
+ALTER TABLE poster_task ADD PRIMARY KEY (id, created_at);
+CREATE TABLE poster_task_default PARTITION OF poster_task DEFAULT;
+
+DO $$
+DECLARE
+    month timestamptz;
+BEGIN
+    FOR month IN SELECT generate_series(
+        date_trunc('month', COALESCE((SELECT min(created_at) FROM poster_task_legacy), now())),
+        date_trunc('month', now()) + interval '2 months',
+        interval '1 month'
+    ) LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF poster_task FOR VALUES FROM (%L) TO (%L)',
+            'poster_task_y' || to_char(month, 'YYYY') || 'm' || to_char(month, 'MM'),
+            month,
+            month + interval '1 month'
+        );
+    END LOOP;
+END $$;
+
+INSERT INTO poster_task SELECT * FROM poster_task_legacy;
+DROP TABLE poster_task_legacy;
+
+CREATE SEQUENCE poster_task_id_seq OWNED BY poster_task.id;
+ALTER TABLE poster_task ALTER COLUMN id SET DEFAULT nextval('poster_task_id_seq');
+''' + INDEXES_SQL
+
+UNPARTITION_SQL = '''
+CREATE TABLE poster_task_plain (LIKE poster_task);
+INSERT INTO poster_task_plain SELECT * FROM poster_task;
+DROP TABLE poster_task;
+ALTER TABLE poster_task_plain RENAME TO poster_task;
+ALTER TABLE poster_task ALTER COLUMN created_at DROP NOT NULL;
+ALTER TABLE poster_task ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY;
+ALTER TABLE poster_task ADD PRIMARY KEY (id);
+''' + INDEXES_SQL
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poster', '0004_task_indexes'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(PARTITION_SQL, UNPARTITION_SQL),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='task',
+                    name='created_at',
+                    field=models.DateTimeField(auto_now_add=True, verbose_name='Date of creation'),
+                ),
+            ],
+        ),
+    ]
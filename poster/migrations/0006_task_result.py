@@ -0,0 +1,60 @@
+# Generated by Django 4.2.4 on 2026-10-19 21:12
+
+import django.core.serializers.json
+import django.db.models.fields.json
+from django.db import migrations, models
+
+
+RESULT_SQL = '''
+UPDATE poster_task SET result = jsonb_build_object(
+    'status', CASE WHEN response IS NULL THEN 'fail' ELSE 'success' END,
+    'error_code', NULL,
+    'error', left(exception, 255),
+    'message_ids', '[]'::jsonb,
+    'latency_ms', NULL,
+    'bytes_sent', NULL
+) WHERE result IS NULL;
+'''
+
+UNRESULT_SQL = '''
+UPDATE poster_task SET
+    response = CASE WHEN result->>'status' = 'success' THEN result->>'message_ids' END,
+    exception = result->>'error'
+WHERE result IS NOT NULL;
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poster', '0005_task_partitions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='result',
+            field=models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Status, error code, message ids, latency and sent bytes of the action', null=True, verbose_name='Result'),
+        ),
+        migrations.RunSQL(RESULT_SQL, UNRESULT_SQL),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='poster_task_failed_created_idx',
+        ),
+        migrations.RemoveField(
+            model_name='task',
+            name='exception',
+        ),
+        migrations.RemoveField(
+            model_name='task',
+            name='response',
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(django.db.models.fields.json.KeyTextTransform('status', 'result'), models.OrderBy(models.F('created_at'), descending=True), name='poster_task_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('result__status', 'fail')), fields=['-created_at', '-id'], name='poster_task_failed_created_idx'),
+        ),
+    ]
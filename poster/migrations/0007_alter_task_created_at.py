@@ -0,0 +1,19 @@
+# Generated by Django 4.2.4 on 2026-10-19 21:48
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poster', '0006_task_result'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='task',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Date of creation'),
+        ),
+    ]
@@ -0,0 +1,120 @@
+# Generated by Django 4.2.4 on 2026-10-19 22:05
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def get_chat_title(channel) -> str:
+    if channel.channel_type == 'telegram' and channel.username:
+        return f'@{channel.username}'
+    return channel.title or ''
+
+
+def get_message_link(channel, message_id: int) -> str:
+    if channel.channel_type == 'discord':
+        return f'https://discord.com/channels/{channel.server_id}/{channel.channel_id}/{message_id}'
+    elif channel.channel_type == 'telegram' and channel.username:
+        return f'https://t.me/{channel.username}/{message_id}'
+    return ''
+
+
+def copy_messages(apps, schema_editor):
+    Post = apps.get_model('poster', 'Post')
+    Delivery = apps.get_model('poster', 'Delivery')
+
+    rows = Post.messages.through.objects.select_related('postmessage__channel').order_by(
+        'postmessage__created_at',
+        'postmessage_id',
+    )
+
+    deliveries = {}
+    for row in rows.iterator():
+        message, channel = row.postmessage, row.postmessage.channel
+        if not channel or channel.channel_id is None:
+            continue
+
+        delivery = deliveries.setdefault((row.post_id, channel.pk), Delivery(
+            post_id=row.post_id,
+            channel_id=channel.pk,
+            messenger=channel.channel_type,
+            chat_id=channel.channel_id,
+            chat_title=get_chat_title(channel),
+            message_ids=[],
+            status='sent',
+            sent_at=message.created_at,
+            permalink=get_message_link(channel, message.message_id),
+        ))
+        delivery.message_ids.append(message.message_id)
+
+    Delivery.objects.bulk_create(deliveries.values(), batch_size=500)
+
+
+def restore_messages(apps, schema_editor):
+    Delivery = apps.get_model('poster', 'Delivery')
+    Post = apps.get_model('poster', 'Post')
+    PostMessage = apps.get_model('poster', 'PostMessage')
+
+    deliveries = Delivery.objects.exclude(post=None).exclude(message_ids=[])
+    for delivery in deliveries.iterator():
+        messages = PostMessage.objects.bulk_create([
+            PostMessage(channel_id=delivery.channel_id, message_id=message_id)
+            for message_id in delivery.message_ids
+        ])
+        Post.messages.through.objects.bulk_create([
+            Post.messages.through(post_id=delivery.post_id, postmessage_id=message.pk)
+            for message in messages
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poster', '0007_alter_task_created_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Delivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, null=True, verbose_name='Date of creation')),
+                ('updated_at', models.DateTimeField(auto_now=True, null=True, verbose_name='Date of update')),
+                ('messenger', models.CharField(choices=[('discord', 'Discord'), ('telegram', 'Telegram')], max_length=32, verbose_name='Messenger')),
+                ('chat_id', models.BigIntegerField(help_text='Channel id on the messenger side at the moment of sending', verbose_name='Chat id')),
+                ('chat_title', models.CharField(blank=True, default='', max_length=255, verbose_name='Chat title')),
+                ('message_ids', django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), default=list, size=None, verbose_name='Message ids')),
+                ('status', models.CharField(choices=[('sent', 'Sent'), ('partial', 'Partially sent'), ('failed', 'Failed'), ('deleted', 'Deleted')], max_length=32, verbose_name='Delivery status')),
+                ('revision', models.PositiveIntegerField(default=0, help_text='Number of edits applied to the delivered messages', verbose_name='Revision')),
+                ('sent_at', models.DateTimeField(null=True, verbose_name='Date of sending')),
+                ('permalink', models.CharField(blank=True, default='', max_length=255, verbose_name='Permalink')),
+                ('channel', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deliveries', to='poster.channel', verbose_name='Channel')),
+                ('post', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deliveries', to='poster.post', verbose_name='Post')),
+            ],
+            options={
+                'verbose_name': 'Delivery',
+                'verbose_name_plural': 'Deliveries',
+                'ordering': ['-sent_at', '-id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='delivery',
+            index=models.Index(fields=['channel', '-sent_at'], name='poster_deliv_chan_sent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='delivery',
+            index=models.Index(fields=['status', '-sent_at'], name='poster_deliv_status_sent_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='delivery',
+            constraint=models.UniqueConstraint(fields=('post', 'channel'), name='poster_delivery_post_channel_uniq'),
+        ),
+        migrations.RunPython(copy_messages, restore_messages),
+        migrations.RemoveField(
+            model_name='post',
+            name='messages',
+        ),
+        migrations.DeleteModel(
+            name='PostMessage',
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 4.2.4 on 2026-10-19 22:31
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+TASK_INDEX = 'poster_task_post_type_idx'
+TASK_INDEX_COLUMNS = '(post_id, task_type, created_at DESC)'
+
+
+def create_task_partition_indexes(apps, schema_editor):
+    quote_name = schema_editor.quote_name
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT child.relname FROM pg_inherits '
+            'JOIN pg_class parent ON pg_inherits.inhparent = parent.oid '
+            'JOIN pg_class child ON pg_inherits.inhrelid = child.oid '
+            "WHERE parent.relname = 'poster_task'"
+        )
+        partitions = [row[0] for row in cursor.fetchall()]
+
+        for partition in partitions:
+            index = f'{partition}_post_type_idx'
+            cursor.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {quote_name(index)} '
+                f'ON {quote_name(partition)} {TASK_INDEX_COLUMNS}'
+            )
+            cursor.execute(f'ALTER INDEX {quote_name(TASK_INDEX)} ATTACH PARTITION {quote_name(index)}')
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('poster', '0008_delivery'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='gallerydocument',
+            options={'ordering': ['id'], 'verbose_name': 'Document', 'verbose_name_plural': 'Documents'},
+        ),
+        migrations.AlterModelOptions(
+            name='galleryphoto',
+            options={'ordering': ['id'], 'verbose_name': 'Photo', 'verbose_name_plural': 'Photos'},
+        ),
+        AddIndexConcurrently(
+            model_name='bot',
+            index=models.Index(fields=['bot_type', '-created_at'], name='poster_bot_type_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='channel',
+            index=models.Index(condition=models.Q(('is_completed', True)), fields=['-created_at'], name='poster_channel_completed_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='delivery',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['message_ids'], name='poster_deliv_message_ids_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='gallerydocument',
+            index=models.Index(fields=['post', 'id'], name='poster_gallerydoc_post_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='galleryphoto',
+            index=models.Index(fields=['post', 'id'], name='poster_galleryphoto_post_idx'),
+        ),
+        # CREATE INDEX CONCURRENTLY is not supported on the partitioned task table, so the index is
+        # created empty on the parent only, built concurrently on every partition and attached.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    f'CREATE INDEX IF NOT EXISTS {TASK_INDEX} ON ONLY poster_task {TASK_INDEX_COLUMNS}',
+                    f'DROP INDEX IF EXISTS {TASK_INDEX}',
+                ),
+                migrations.RunPython(create_task_partition_indexes, migrations.RunPython.noop, atomic=False),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='task',
+                    index=models.Index(fields=['post', 'task_type', '-created_at'], name=TASK_INDEX),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.4 on 2026-10-19 22:58
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poster', '0009_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChannelGroup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, null=True, verbose_name='Date of creation')),
+                ('updated_at', models.DateTimeField(auto_now=True, null=True, verbose_name='Date of update')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Group name')),
+                ('messenger', models.CharField(blank=True, choices=[('discord', 'Discord'), ('telegram', 'Telegram')], help_text='Include every channel of this messenger', max_length=32, null=True, verbose_name='Messenger')),
+                ('tag', models.CharField(blank=True, default='', help_text='Include every channel with this tag', max_length=64, verbose_name='Tag')),
+                ('bot', models.ForeignKey(blank=True, help_text='Include every channel served by this bot', null=True, on_delete=django.db.models.deletion.CASCADE, to='poster.bot', verbose_name='Bot')),
+                ('channels', models.ManyToManyField(blank=True, help_text='Channels included regardless of the rules above', related_name='channel_groups', to='poster.channel', verbose_name='Channels')),
+            ],
+            options={
+                'verbose_name': 'Channel group',
+                'verbose_name_plural': 'Channel groups',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='channel',
+            name='tags',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=64), blank=True, default=list, help_text='Comma separated tags used to target the channel through channel groups', size=None, verbose_name='Tags'),
+        ),
+        migrations.AddIndex(
+            model_name='channel',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tags'], name='poster_channel_tags_idx'),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='channels',
+            field=models.ManyToManyField(blank=True, to='poster.channel', verbose_name='Channels'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='channel_groups',
+            field=models.ManyToManyField(blank=True, to='poster.channelgroup', verbose_name='Channel groups'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.4 on 2026-10-19 20:09
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('poster', '0011_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='channel',
+            name='image_unique_id',
+            field=models.CharField(blank=True, editable=False, help_text='Telegram file unique id of the downloaded channel photo', max_length=255, null=True, verbose_name='Image unique id'),
+        ),
+        migrations.AddField(
+            model_name='channel',
+            name='refreshed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Refreshed at'),
+        ),
+        AddIndexConcurrently(
+            model_name='channel',
+            index=models.Index(models.F('bot'), models.OrderBy(models.F('refreshed_at'), nulls_first=True), name='poster_channel_refresh_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.4 on 2026-10-19 21:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('poster', '0012_channel_refresh'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='channel',
+            constraint=models.UniqueConstraint(fields=('channel_type', 'channel_id'), name='poster_channel_type_id_uniq'),
+        ),
+    ]
@@ -31,9 +31,16 @@ class BaseMixin(Model):
 class ChannelsMixin(Model):
     channels: ManyToManyField = ManyToManyField(
         'Channel',
+        blank=True,
         verbose_name=_('Channels'),
     )
 
+    channel_groups: ManyToManyField = ManyToManyField(
+        'ChannelGroup',
+        blank=True,
+        verbose_name=_('Channel groups'),
+    )
+
     class Meta:
         abstract = True
 
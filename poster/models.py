@@ -1,23 +1,39 @@
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.indexes import OpClass
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db.models import BooleanField
 from django.db.models import BigIntegerField
 from django.db.models import CharField
 from django.db.models import DateTimeField
+from django.db.models import F
 from django.db.models import FileField
 from django.db.models import ForeignKey
-from django.db.models import ManyToManyField
 from django.db.models import ImageField
+from django.db.models import Index
+from django.db.models import JSONField
+from django.db.models import ManyToManyField
+from django.db.models import PositiveIntegerField
+from django.db.models import Q
 from django.db.models import QuerySet
 from django.db.models import TextField
+from django.db.models import UniqueConstraint
 from django.db.models import UUIDField
 from django.db.models import SET_NULL
 from django.db.models import CASCADE
+from django.db.models.fields.json import KT
+from django.db.models.functions import Upper
+from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 
 from froala_editor.fields import FroalaField
 
+from .enums import DeliveryStatusEnum
 from .enums import MessengerEnum
 from .enums import PostTypeEnum
+from .enums import TaskStatusEnum
 from .enums import TaskTypeEnum
+from .enums import TranscodeProfileEnum
 from .mixins import BaseMixin
 from .mixins import ChannelsMixin
 from .mixins import ImageMixin
@@ -56,6 +72,11 @@ class Bot(BaseMixin):
     class Meta:
         ordering = ['-created_at']
 
+        indexes = [
+            Index(fields=['bot_type', '-created_at'], name='poster_bot_type_created_idx'),
+            GinIndex(OpClass(Upper('username'), name='gin_trgm_ops'), name='poster_bot_username_trgm_idx'),
+        ]
+
         verbose_name = _('Bot')
         verbose_name_plural = _('Bots')
 
@@ -117,16 +138,143 @@ class Channel(BaseMixin, ImageMixin):
         verbose_name=_('Is completed')
     )
 
+    image_unique_id: CharField = CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_('Image unique id'),
+        help_text=_('Telegram file unique id of the downloaded channel photo'),
+    )
+
+    refreshed_at: DateTimeField = DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_('Refreshed at'),
+    )
+
+    tags: ArrayField = ArrayField(
+        CharField(max_length=64),
+        blank=True,
+        default=list,
+        verbose_name=_('Tags'),
+        help_text=_('Comma separated tags used to target the channel through channel groups'),
+    )
+
+    @property
+    def chat_title(self) -> str:
+        if self.channel_type == MessengerEnum.TELEGRAM and self.username:
+            return f'@{self.username}'
+        return self.title or ''
+
+    def get_message_link(self, message_id: int) -> str:
+        if self.channel_type == MessengerEnum.DISCORD:
+            return f'https://discord.com/channels/{self.server_id}/{self.channel_id}/{message_id}'
+        elif self.channel_type == MessengerEnum.TELEGRAM and self.username:
+            return f'https://t.me/{self.username}/{message_id}'
+        return ''
+
     def __str__(self) -> str:
         return f'{self.get_channel_type_display()} channel: {self.title}'  # type: ignore
 
     class Meta:
         ordering = ['-created_at']
 
+        indexes = [
+            Index(
+                fields=['-created_at'],
+                condition=Q(is_completed=True),
+                name='poster_channel_completed_idx',
+            ),
+            Index(
+                F('bot'),
+                F('refreshed_at').asc(nulls_first=True),
+                name='poster_channel_refresh_idx',
+            ),
+            GinIndex(fields=['tags'], name='poster_channel_tags_idx'),
+            GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='poster_channel_title_trgm_idx'),
+            GinIndex(OpClass(Upper('username'), name='gin_trgm_ops'), name='poster_channel_user_trgm_idx'),
+        ]
+
+        constraints = [
+            UniqueConstraint(fields=['channel_type', 'channel_id'], name='poster_channel_type_id_uniq'),
+        ]
+
         verbose_name = _('Channel')
         verbose_name_plural = _('Channels')
 
 
+class ChannelGroup(BaseMixin):
+    name: CharField = CharField(
+        max_length=255,
+        unique=True,
+        verbose_name=_('Group name'),
+    )
+
+    messenger: CharField = CharField(
+        max_length=32,
+        null=True,
+        blank=True,
+        choices=MessengerEnum.choices,
+        verbose_name=_('Messenger'),
+        help_text=_('Include every channel of this messenger'),
+    )
+
+    bot: ForeignKey = ForeignKey(
+        'Bot',
+        null=True,
+        blank=True,
+        on_delete=CASCADE,
+        verbose_name=_('Bot'),
+        help_text=_('Include every channel served by this bot'),
+    )
+
+    tag: CharField = CharField(
+        max_length=64,
+        blank=True,
+        default='',
+        verbose_name=_('Tag'),
+        help_text=_('Include every channel with this tag'),
+    )
+
+    channels: ManyToManyField = ManyToManyField(
+        'Channel',
+        blank=True,
+        related_name='channel_groups',
+        verbose_name=_('Channels'),
+        help_text=_('Channels included regardless of the rules above'),
+    )
+
+    def get_channel_filter(self) -> Q | None:
+        rules = Q()
+        if self.messenger:
+            rules &= Q(channel_type=self.messenger)
+        if self.bot_id:
+            rules &= Q(bot_id=self.bot_id)
+        if self.tag:
+            rules &= Q(tags__contains=[self.tag])
+        return rules or None
+
+    def matches_rules(self, channel: 'Channel') -> bool:
+        if not self.get_channel_filter():
+            return False
+        return (
+            (not self.messenger or self.messenger == channel.channel_type)
+            and (not self.bot_id or self.bot_id == channel.bot_id)
+            and (not self.tag or self.tag in (channel.tags or []))
+        )
+
+    def __str__(self) -> str:
+        return self.name
+
+    class Meta:
+        ordering = ['name']
+
+        verbose_name = _('Channel group')
+        verbose_name_plural = _('Channel groups')
+
+
 class GalleryDocument(BaseMixin):
     post: ForeignKey = ForeignKey(
         'Post',
@@ -146,6 +294,12 @@ class GalleryDocument(BaseMixin):
     )
 
     class Meta:
+        ordering = ['id']
+
+        indexes = [
+            Index(fields=['post', 'id'], name='poster_gallerydoc_post_idx'),
+        ]
+
         verbose_name = _('Document')
         verbose_name_plural = _('Documents')
 
@@ -169,6 +323,12 @@ class GalleryPhoto(BaseMixin):
     )
 
     class Meta:
+        ordering = ['id']
+
+        indexes = [
+            Index(fields=['post', 'id'], name='poster_galleryphoto_post_idx'),
+        ]
+
         verbose_name = _('Photo')
         verbose_name_plural = _('Photos')
 
@@ -240,12 +400,6 @@ class Post(BaseMixin, ChannelsMixin):
         verbose_name=_('Is silent')
     )
 
-    messages: ManyToManyField = ManyToManyField(
-        'PostMessage',
-        verbose_name=_('Messages'),
-        related_name='messages',
-    )
-
     @property
     def gallery_documents(self) -> QuerySet:
         return GalleryDocument.objects.filter(post_id=self.pk)
@@ -266,6 +420,15 @@ class Post(BaseMixin, ChannelsMixin):
     def is_media_gallery(self) -> bool:
         return self.is_documents_media_gallery or self.is_photos_media_gallery
 
+    @property
+    def transcode_sources(self) -> list:
+        sources = []
+        if self.voice:
+            sources.append((self.voice.name, TranscodeProfileEnum.VOICE))
+        if self.video:
+            sources.append((self.video.name, TranscodeProfileEnum.VIDEO_NOTE))
+        return sources
+
     def __str__(self) -> str:
         return f'{self.post_type} post with id {self.pk}'
 
@@ -276,50 +439,96 @@ class Post(BaseMixin, ChannelsMixin):
         verbose_name_plural = _('Posts')
 
 
-class PostMessage(BaseMixin):
+class Delivery(BaseMixin):
+    post: ForeignKey = ForeignKey(
+        'Post',
+        null=True,
+        on_delete=SET_NULL,
+        related_name='deliveries',
+        verbose_name=_('Post'),
+    )
+
     channel: ForeignKey = ForeignKey(
         'Channel',
         null=True,
         on_delete=SET_NULL,
+        related_name='deliveries',
         verbose_name=_('Channel'),
     )
 
-    message_id: BigIntegerField = BigIntegerField(
-        verbose_name=_('Message id'),
+    messenger: CharField = CharField(
+        max_length=32,
+        choices=MessengerEnum.choices,
+        verbose_name=_('Messenger'),
     )
 
-    @property
-    def href(self) -> str:
-        if not self.channel:
-            return '#'
-        elif self.channel.channel_type == MessengerEnum.DISCORD:
-            return f'https://discord.com/channels/{self.channel.server_id}/{self.channel.channel_id}/{self.message_id}'  # NOQA: E501
-        elif self.channel.channel_type == MessengerEnum.TELEGRAM:
-            return f'https://t.me/{self.channel.username}/{self.message_id}'
-        else:
-            return '#'
+    chat_id: BigIntegerField = BigIntegerField(
+        verbose_name=_('Chat id'),
+        help_text=_('Channel id on the messenger side at the moment of sending'),
+    )
 
-    @property
-    def channel_name(self) -> str:
-        if not self.channel:
-            return '-/-'
-        elif self.channel.channel_type == MessengerEnum.DISCORD:
-            return f'<strong>discord</strong> {_("channel")} <strong>{self.channel.title}</strong>'
-        elif self.channel.channel_type == MessengerEnum.TELEGRAM:
-            return f'<strong>telegram</strong> {_("channel")} <strong>@{self.channel.username}</strong>'
-        else:
-            return '-/-'
+    chat_title: CharField = CharField(
+        max_length=255,
+        blank=True,
+        default='',
+        verbose_name=_('Chat title'),
+    )
+
+    message_ids: ArrayField = ArrayField(
+        BigIntegerField(),
+        default=list,
+        verbose_name=_('Message ids'),
+    )
+
+    status: CharField = CharField(
+        max_length=32,
+        choices=DeliveryStatusEnum.choices,
+        verbose_name=_('Delivery status'),
+    )
+
+    revision: PositiveIntegerField = PositiveIntegerField(
+        default=0,
+        verbose_name=_('Revision'),
+        help_text=_('Number of edits applied to the delivered messages'),
+    )
+
+    sent_at: DateTimeField = DateTimeField(
+        null=True,
+        verbose_name=_('Date of sending'),
+    )
+
+    permalink: CharField = CharField(
+        max_length=255,
+        blank=True,
+        default='',
+        verbose_name=_('Permalink'),
+    )
 
     def __str__(self) -> str:
-        return f'Channel message id: {self.message_id}'
+        return f'Delivery of post {self.post_id} to {self.chat_title or self.chat_id}'
+
+    class Meta:
+        ordering = ['-sent_at', '-id']
+
+        constraints = [
+            UniqueConstraint(fields=['post', 'channel'], name='poster_delivery_post_channel_uniq'),
+        ]
+
+        indexes = [
+            Index(fields=['channel', '-sent_at'], name='poster_deliv_chan_sent_idx'),
+            Index(fields=['status', '-sent_at'], name='poster_deliv_status_sent_idx'),
+            GinIndex(fields=['message_ids'], name='poster_deliv_message_ids_idx'),
+        ]
+
+        verbose_name = _('Delivery')
+        verbose_name_plural = _('Deliveries')
 
 
 class Task(BaseMixin):
 
     created_at: DateTimeField = DateTimeField(
         verbose_name=_('Date of creation'),
-        auto_now_add=True,
-        null=True,
+        default=now,
     )
 
     task_id: UUIDField = UUIDField(
@@ -341,16 +550,11 @@ class Task(BaseMixin):
         help_text=_('Type of action at which the record was created'),
     )
 
-    response: TextField = TextField(
+    result: JSONField = JSONField(
         null=True,
-        verbose_name=_('Response data'),
-        help_text=_('Automatically recorded result of sending a message'),
-    )
-
-    exception: TextField = TextField(
-        null=True,
-        verbose_name=_('Exception data'),
-        help_text=_('Automatically detected exception to sending a message'),
+        encoder=DjangoJSONEncoder,
+        verbose_name=_('Result'),
+        help_text=_('Status, error code, message ids, latency and sent bytes of the action'),
     )
 
     post: ForeignKey = ForeignKey(
@@ -365,7 +569,20 @@ class Task(BaseMixin):
         return f'{self.channel and self.channel.title}'
 
     class Meta:
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
+
+        indexes = [
+            Index(fields=['-created_at', '-id'], name='poster_task_created_idx'),
+            Index(fields=['task_type', '-created_at', '-id'], name='poster_task_type_created_idx'),
+            Index(fields=['channel', '-created_at', '-id'], name='poster_task_chan_created_idx'),
+            Index(fields=['post', 'task_type', '-created_at'], name='poster_task_post_type_idx'),
+            Index(KT('result__status'), F('created_at').desc(), name='poster_task_status_created_idx'),
+            Index(
+                fields=['-created_at', '-id'],
+                condition=Q(result__status=TaskStatusEnum.FAIL),
+                name='poster_task_failed_created_idx',
+            ),
+        ]
 
         verbose_name = _('Task')
         verbose_name_plural = _('Tasks')
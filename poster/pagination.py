@@ -0,0 +1,99 @@
+from base64 import urlsafe_b64decode
+from base64 import urlsafe_b64encode
+from datetime import datetime
+from json import loads
+
+from django.contrib.admin.views.main import ChangeList
+from django.db import connection
+from django.db.models import Q
+from django.db.models import QuerySet
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+CURSOR_VAR = 'cursor'
+
+
+def encode_cursor(created_at: datetime, pk: int) -> str:
+    return urlsafe_b64encode(f'{created_at.isoformat()}|{pk}'.encode()).decode()
+
+
+def decode_cursor(cursor: str | None) -> tuple[datetime, int] | None:
+    if not cursor:
+        return None
+
+    try:
+        created_at, pk = urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except ValueError:
+        return None
+
+
+def get_table_estimate(table: str) -> int | None:
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+        row = cursor.fetchone()
+    return row[0] if row and row[0] >= 0 else None
+
+
+def get_query_estimate(queryset: QuerySet) -> int | None:
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    plan = loads(plan) if isinstance(plan, str) else plan
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def estimate_count(queryset: QuerySet, is_filtered: bool = True) -> int:
+    if connection.vendor == 'postgresql':
+        try:
+            if is_filtered:
+                estimate = get_query_estimate(queryset)
+            else:
+                estimate = get_table_estimate(queryset.model._meta.db_table)
+        except Exception as e:
+            logger.exception(e)
+            estimate = None
+
+        if estimate is not None:
+            return estimate
+
+    return queryset.count()
+
+
+class KeysetChangeList(ChangeList):
+    def get_filters_params(self, params: dict | None = None) -> dict:
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_query_string(self, new_params: dict | None = None, remove: list | None = None) -> str:
+        if not new_params or CURSOR_VAR not in new_params:
+            remove = [*(remove or []), CURSOR_VAR]
+        return super().get_query_string(new_params, remove)
+
+    def get_results(self, request) -> None:
+        queryset = self.queryset.order_by('-created_at', '-pk')
+        cursor = decode_cursor(self.params.get(CURSOR_VAR))
+        if cursor:
+            created_at, pk = cursor
+            queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+
+        rows = list(queryset[:self.list_per_page + 1])
+        is_filtered = self.queryset.query.has_filters()
+
+        self.result_list = rows[:self.list_per_page]
+        self.result_count = estimate_count(self.queryset, is_filtered)
+        self.full_result_count = self.result_count if not is_filtered else None
+        self.show_full_result_count = False
+        self.show_admin_actions = bool(self.result_list)
+        self.can_show_all = False
+        self.multi_page = False
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.first_page_url = self.get_query_string(remove=[CURSOR_VAR]) if cursor else None
+        self.next_page_url = None
+        if len(rows) > self.list_per_page:
+            last = self.result_list[-1]
+            self.next_page_url = self.get_query_string({CURSOR_VAR: encode_cursor(last.created_at, last.pk)})
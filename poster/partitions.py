@@ -0,0 +1,138 @@
+from datetime import date
+from datetime import datetime
+from datetime import timezone
+from gzip import GzipFile
+from re import compile as re_compile
+from tempfile import TemporaryFile
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.db import transaction
+
+from .models import Task
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+PARTITION_PATTERN = re_compile(r'_y(\d{4})m(\d{2})$')
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def get_partition_name(month: date) -> str:
+    return f'{Task._meta.db_table}_y{month.year:04d}m{month.month:02d}'
+
+
+def get_partition_month(name: str) -> date | None:
+    match = PARTITION_PATTERN.search(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def get_partitions() -> dict[date, str]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT child.relname FROM pg_inherits '
+            'JOIN pg_class parent ON pg_inherits.inhparent = parent.oid '
+            'JOIN pg_class child ON pg_inherits.inhrelid = child.oid '
+            'WHERE parent.relname = %s',
+            [Task._meta.db_table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    return {month: name for name in names if (month := get_partition_month(name))}
+
+
+def get_detached_partitions() -> dict[date, str]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT relname FROM pg_class '
+            "WHERE relkind = 'r' AND NOT relispartition AND pg_table_is_visible(oid) AND relname LIKE %s",
+            [f'{Task._meta.db_table}_y%'],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    return {month: name for name in names if (month := get_partition_month(name))}
+
+
+def create_partition(month: date) -> None:
+    start = datetime.combine(month, datetime.min.time(), timezone.utc)
+    end = datetime.combine(add_months(month, 1), datetime.min.time(), timezone.utc)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {connection.ops.quote_name(get_partition_name(month))} '
+            f'PARTITION OF {connection.ops.quote_name(Task._meta.db_table)} '
+            'FOR VALUES FROM (%s) TO (%s)',
+            [start, end],
+        )
+
+
+def ensure_partitions(months_ahead: int | None = None) -> None:
+    months_ahead = settings.TASK_PARTITIONS_AHEAD if months_ahead is None else months_ahead
+    current = date.today().replace(day=1)
+    existing = get_partitions()
+
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if month not in existing:
+            create_partition(month)
+
+
+def archive_partition(name: str) -> str:
+    with TemporaryFile() as temporary:
+        with GzipFile(fileobj=temporary, mode='wb') as archive, connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY (SELECT * FROM {connection.ops.quote_name(name)}) TO STDOUT WITH CSV HEADER',
+                archive,
+            )
+
+        temporary.seek(0)
+        return default_storage.save(f'{settings.TASK_ARCHIVE_DIRECTORY}/{name}.csv.gz', File(temporary))
+
+
+def drop_partition(name: str, archive: bool = False, attached: bool = True) -> None:
+    table = connection.ops.quote_name(Task._meta.db_table)
+    partition = connection.ops.quote_name(name)
+
+    if archive:
+        logger.info(f'Task partition {name} archived to {archive_partition(name)}')
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        if attached:
+            cursor.execute(f'ALTER TABLE {table} DETACH PARTITION {partition}')
+        cursor.execute(f'DROP TABLE {partition}')
+
+
+def drop_expired_partitions(retention_months: int | None = None, archive: bool | None = None) -> list[str]:
+    retention_months = settings.TASK_RETENTION_MONTHS if retention_months is None else retention_months
+    archive = settings.TASK_ARCHIVE if archive is None else archive
+
+    if retention_months <= 0:
+        return []
+
+    cutoff = add_months(date.today().replace(day=1), -retention_months)
+    dropped = []
+
+    partitions = [(month, name, True) for month, name in get_partitions().items()]
+    partitions += [(month, name, False) for month, name in get_detached_partitions().items()]
+
+    for month, name, attached in sorted(partitions):
+        if month < cutoff:
+            drop_partition(name, archive, attached)
+            dropped.append(name)
+
+    return dropped
+
+
+def maintain_partitions() -> list[str]:
+    if connection.vendor != 'postgresql':
+        return []
+
+    ensure_partitions()
+    return drop_expired_partitions()
@@ -0,0 +1,72 @@
+from typing import Any
+from typing import NamedTuple
+
+from .enums import MessengerEnum
+from .enums import PostTypeEnum
+from .exceptions import PayloadTooLarge
+from .media import MB
+from .media import PHOTO_LIMITS
+
+
+class PayloadLimits(NamedTuple):
+    max_items: int
+    max_item_bytes: int
+    max_batch_bytes: int | None = None
+    min_items: int = 1
+
+
+DISCORD_PAYLOAD_LIMITS = PayloadLimits(
+    max_items=10,
+    max_item_bytes=PHOTO_LIMITS[MessengerEnum.DISCORD].max_bytes,
+    max_batch_bytes=PHOTO_LIMITS[MessengerEnum.DISCORD].max_bytes,
+)
+
+PAYLOAD_LIMITS = {
+    (MessengerEnum.DISCORD, PostTypeEnum.GALLERY_DOCUMENTS): DISCORD_PAYLOAD_LIMITS,
+    (MessengerEnum.DISCORD, PostTypeEnum.GALLERY_PHOTOS): DISCORD_PAYLOAD_LIMITS,
+    (MessengerEnum.DISCORD, None): DISCORD_PAYLOAD_LIMITS,
+    (MessengerEnum.TELEGRAM, PostTypeEnum.GALLERY_DOCUMENTS): PayloadLimits(
+        max_items=10,
+        max_item_bytes=50 * MB,
+        min_items=2,
+    ),
+    (MessengerEnum.TELEGRAM, PostTypeEnum.GALLERY_PHOTOS): PayloadLimits(
+        max_items=10,
+        max_item_bytes=PHOTO_LIMITS[MessengerEnum.TELEGRAM].max_bytes,
+        min_items=2,
+    ),
+    (MessengerEnum.TELEGRAM, None): PayloadLimits(
+        max_items=1,
+        max_item_bytes=50 * MB,
+    ),
+}
+
+
+def get_payload_limits(messenger: str, post_type: str | None = None) -> PayloadLimits:
+    return PAYLOAD_LIMITS.get((messenger, post_type)) or PAYLOAD_LIMITS[(messenger, None)]
+
+
+def plan_batches(items: list, sizes: list[int], limits: PayloadLimits) -> list[list[Any]]:
+    for item, size in zip(items, sizes):
+        if size > limits.max_item_bytes:
+            raise PayloadTooLarge(f'File {item} has {size} bytes, limit is {limits.max_item_bytes} bytes')
+
+    batches: list = []
+    batch_sizes: list = []
+
+    for item, size in zip(items, sizes):
+        if (
+            not batches
+            or len(batches[-1]) >= limits.max_items
+            or (limits.max_batch_bytes and batch_sizes[-1] + size > limits.max_batch_bytes)
+        ):
+            batches.append([])
+            batch_sizes.append(0)
+
+        batches[-1].append(item)
+        batch_sizes[-1] += size
+
+    if len(batches) > 1 and len(batches[-1]) < limits.min_items and len(batches[-2]) > limits.min_items:
+        batches[-1].insert(0, batches[-2].pop())
+
+    return batches
@@ -1,27 +1,60 @@
 from django.core.handlers.wsgi import WSGIRequest
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_init
 from django.db.models.signals import pre_delete
 from django.db.models.signals import post_save
 from django.db.models.signals import m2m_changed
 from django.dispatch import receiver
 
+from .enums import DeliveryStatusEnum
 from .exceptions import BotNotSetException
+from .fragments import invalidate_fragments
 from .models import Bot
 from .models import Channel
+from .models import ChannelGroup
+from .models import GalleryDocument
+from .models import GalleryPhoto
 from .models import Post
 from .sender import Sender
 from .signals import publish_post_signal
 from .signals import unpublish_post_signal
 from .signals import edit_post_signal
-from .tasks import delete_message_task
+from .tasks import delete_delivery_task
 from .tasks import delete_post_task
 from .tasks import edit_post_task
-from .tasks import send_post_task
-from .utils import download_channel_photo
+from .tasks import make_photo_derivatives_task
+from .tasks import queue_send_post
+from .tasks import resolve_channel_task
+from .tasks import transcode_media_task
+from .targets import get_posts_for_channels
+from .targets import resolve_channels
 
 import logging
 logger = logging.getLogger(__name__)
 
 
+MEDIA_FIELDS = {
+    Post: ('photo', 'voice', 'video'),
+    GalleryPhoto: ('file',),
+}
+
+
+def get_file_names(instance: Post | GalleryPhoto) -> dict[str, str]:
+    return {
+        field: getattr(instance.__dict__[field], 'name', instance.__dict__[field])
+        for field in MEDIA_FIELDS[type(instance)]
+        if field in instance.__dict__
+    }
+
+
+def get_changed_files(instance: Post | GalleryPhoto) -> dict[str, str]:
+    names = get_file_names(instance)
+    changed = {field: name for field, name in names.items() if name and name != instance._file_names.get(field)}
+    instance._file_names = names
+    return changed
+
+
 @receiver(post_save, sender=Bot)
 def bot_post_save(sender: Bot, instance: Bot, created: bool, **kwargs) -> None:
     if not created:
@@ -50,40 +83,103 @@ def channel_post_save(sender: Channel, instance: Channel, created: bool, **kwarg
     if not instance.bot:
         raise BotNotSetException(f'Bot not set from channel with id {instance.pk}')
 
-    sender_api = Sender(instance.bot)
-    info = sender_api.get_channel_info(instance.channel_id)
+    transaction.on_commit(lambda: resolve_channel_task.delay(instance.pk))
+
+
+@receiver(post_init, sender=Post)
+@receiver(post_init, sender=GalleryPhoto)
+def media_model_post_init(sender, instance: Post | GalleryPhoto, **kwargs) -> None:
+    instance._file_names = get_file_names(instance)
+
+
+@receiver(post_save, sender=Post)
+def post_model_post_save(sender: Post, instance: Post, created: bool, **kwargs) -> None:
+    changed = get_changed_files(instance)
+
+    if 'photo' in changed:
+        transaction.on_commit(lambda name=changed['photo']: make_photo_derivatives_task.delay(name))
+
+    for name, profile in instance.transcode_sources:
+        if name in changed.values():
+            transaction.on_commit(lambda name=name, profile=profile: transcode_media_task.delay(name, profile))
+
+
+@receiver(post_save, sender=GalleryPhoto)
+def gallery_photo_post_save(sender: GalleryPhoto, instance: GalleryPhoto, created: bool, **kwargs) -> None:
+    changed = get_changed_files(instance)
+
+    if 'file' in changed:
+        transaction.on_commit(lambda name=changed['file']: make_photo_derivatives_task.delay(name))
 
-    if info:
-        instance.title = info.title
-        instance.description = info.description
-        instance.is_completed = True
 
-        if sender_api.is_telegram_sender:
-            instance.username = info.username
-            if info.photo:
-                download_channel_photo(instance, info.photo.small_file_id)
-        else:
-            instance.server_id = info.guild_id
-    instance.save()
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=GalleryDocument)
+@receiver(post_save, sender=GalleryPhoto)
+@receiver(post_delete, sender=GalleryDocument)
+@receiver(post_delete, sender=GalleryPhoto)
+def invalidate_post_fragments(sender, instance, **kwargs) -> None:
+    invalidate_fragments(instance.pk if isinstance(instance, Post) else instance.post_id)
+
+
+@receiver(post_save, sender=Channel)
+def invalidate_channel_fragments(sender: Channel, instance: Channel, **kwargs) -> None:
+    invalidate_fragments(*get_posts_for_channels([instance]).values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=ChannelGroup)
+def invalidate_channel_group_fragments(sender: ChannelGroup, instance: ChannelGroup, **kwargs) -> None:
+    invalidate_fragments(*Post.objects.filter(channel_groups=instance).values_list('pk', flat=True))
+
+
+@receiver(m2m_changed, sender=Post.channels.through)
+@receiver(m2m_changed, sender=Post.channel_groups.through)
+def invalidate_post_channels_fragments(sender, instance, action: str, reverse: bool, pk_set, **kwargs) -> None:
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if reverse:
+        invalidate_fragments(*(pk_set or []))
+    else:
+        invalidate_fragments(instance.pk)
+
+
+@receiver(m2m_changed, sender=ChannelGroup.channels.through)
+def invalidate_group_channels_fragments(sender, instance, action: str, reverse: bool, pk_set, **kwargs) -> None:
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not reverse:
+        groups = [instance.pk]
+    elif action == 'pre_clear':
+        groups = list(instance.channel_groups.values_list('pk', flat=True))
+    else:
+        groups = list(pk_set or [])
+    invalidate_fragments(*Post.objects.filter(channel_groups__in=groups).distinct().values_list('pk', flat=True))
 
 
 @receiver(pre_delete, sender=Post)
 def post_model_pre_delete(sender: Post, instance: Post, **kwargs) -> None:
-    for message in instance.messages.all():
-        delete_message_task.delay(message.pk)
+    instance.deliveries.filter(message_ids=[]).delete()
+    for pk in instance.deliveries.exclude(status=DeliveryStatusEnum.DELETED).values_list('pk', flat=True):
+        transaction.on_commit(lambda pk=pk: delete_delivery_task.delay(pk))
 
 
 @receiver(publish_post_signal)
 def publish_post_signal_handler(sender: WSGIRequest, instance: Post, **kwargs) -> None:
-    if not instance.channels.count():
+    if not resolve_channels(instance).exists():
         return
-    send_post_task.delay(instance.pk, disable_notification=instance.is_silent)
+    queue_send_post(instance)
 
 
 @receiver(m2m_changed, sender=Post.channels.through)
-def related_models_changed(sender, instance, action, **kwargs):
-    if action == 'post_add':
-        send_post_task.delay(instance.pk, disable_notification=instance.is_silent)
+@receiver(m2m_changed, sender=Post.channel_groups.through)
+def related_models_changed(sender, instance, action, reverse=False, pk_set=None, **kwargs):
+    if action != 'post_add':
+        return
+
+    posts = Post.objects.filter(pk__in=pk_set or []) if reverse else [instance]
+    for post in posts:
+        queue_send_post(post)
 
 
 @receiver(unpublish_post_signal)
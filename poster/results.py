@@ -0,0 +1,47 @@
+from time import monotonic
+
+from .enums import TaskStatusEnum
+
+
+ERROR_MESSAGE_LENGTH = 255
+
+
+def get_message_ids(messages) -> list:
+    if not messages or isinstance(messages, (bool, dict)):
+        return []
+
+    messages = messages if isinstance(messages, list) else [messages]
+    return [message.message_id for message in messages if getattr(message, 'message_id', None) is not None]
+
+
+def get_error_code(exception: BaseException | None) -> int | None:
+    error_code = getattr(exception, 'error_code', None)
+    return error_code if isinstance(error_code, int) else None
+
+
+def get_error_message(exception: BaseException | None) -> str | None:
+    if exception is None:
+        return None
+
+    message = str(getattr(exception, 'description', None) or exception or type(exception).__name__)
+    return message[:ERROR_MESSAGE_LENGTH]
+
+
+def make_result(
+        started: float,
+        messages=None,
+        exception: BaseException | None = None,
+        bytes_sent: int = 0,
+        status: str | None = None,
+) -> dict:
+    if status is None:
+        status = TaskStatusEnum.FAIL if exception else TaskStatusEnum.SUCCESS
+
+    return {
+        'status': str(status),
+        'error_code': get_error_code(exception),
+        'error': get_error_message(exception),
+        'message_ids': get_message_ids(messages),
+        'latency_ms': round((monotonic() - started) * 1000),
+        'bytes_sent': bytes_sent,
+    }
@@ -1,13 +1,18 @@
 from abc import abstractmethod
 from abc import ABC
+from contextlib import ExitStack
+from contextlib import contextmanager
+from typing import BinaryIO
+from typing import Callable
+from typing import Iterator
 from typing import List
-from io import BytesIO
 from os import path
-from os import getenv
 
+from django.core.files import File
 from django.db.models import FileField
 from django.db.models import QuerySet
 from django.db.models.fields.files import ImageFieldFile
+from telebot import apihelper
 from telebot.apihelper import ApiTelegramException
 from telebot.types import Chat as TelegramChat
 from telebot.types import Message as TelegramMessage
@@ -15,13 +20,27 @@ from telebot.types import User as TelegramUser
 from telebot.types import InputMediaDocument
 from telebot.types import InputMediaPhoto
 
+from .budget import media_budget
+from .buffers import MediaBuffers
+from .buffers import MediaStream
+from .buffers import StreamingSession
+from .cache import media_cache
 from .enums import MessengerEnum
+from .enums import PostTypeEnum
+from .enums import TranscodeProfileEnum
+from .exceptions import MediaNotReady
+from .exceptions import PartialDelivery
 from .exceptions import SenderNotFound
 from .exceptions import UnknownPostType
+from .media import find_transcoded
+from .media import get_derivative_name
+from .media import get_photo_for_messenger
 from .models import Bot
 from .models import GalleryDocument
 from .models import GalleryPhoto
 from .models import Post
+from .planner import get_payload_limits
+from .planner import plan_batches
 from .utils import escape_discord_message
 from .utils import escape_telegram_message
 
@@ -40,16 +59,65 @@ SenderChannel = TelegramChat | DiscordChannel
 SenderMessage = TelegramMessage | DiscordMessage
 SenderUser = TelegramUser | DiscordUser
 
+streaming_session = StreamingSession()
+apihelper.CUSTOM_REQUEST_SENDER = streaming_session.request
+
 
 class AbstractSender(ABC):
-    def __init__(self) -> None:
-        self.root = getenv('PROJECT_LOCATION', '')
-        if not self.root:
-            raise Exception('PROJECT_LOCATION not set in system environment')
+    messenger: str
+
+    def __init__(self, buffers: MediaBuffers | None = None) -> None:
+        self.buffers = buffers
+        self.bytes_sent = 0
 
     def _get_path(self, filename: str) -> str:
-        filename = str(filename)[1:] if str(filename).startswith('/') else path.join('media', str(filename))
-        return path.join(self.root, filename)
+        return media_cache.get_path(str(filename))
+
+    def _get_photo_path(self, photo: ImageFieldFile) -> str:
+        return get_photo_for_messenger(self._get_path(photo), self.messenger)
+
+    def _get_transcoded_path(self, file: FileField, profile: str) -> str:
+        transcoded = find_transcoded(self._get_path(file), profile)
+        if not transcoded:
+            raise MediaNotReady(f'File {file} is not transcoded to {profile} yet')
+        return transcoded
+
+    def _open(self, filename: str) -> MediaStream | BinaryIO:
+        if self.buffers:
+            return self.buffers.open(filename)
+        return open(filename, mode='rb')
+
+    def _get_size(self, filename: str) -> int:
+        try:
+            return path.getsize(filename)
+        except OSError:
+            return 0
+
+    @contextmanager
+    def _reserve(self, *filenames: str) -> Iterator[int]:
+        size = sum(self._get_size(filename) for filename in filenames)
+        with media_budget.reserve(size):
+            yield size
+        self.bytes_sent += size
+
+    def _plan(self, items: list, filenames: list, post_type: str | None = None) -> list:
+        sizes = [self._get_size(filename) for filename in filenames]
+        return plan_batches(items, sizes, get_payload_limits(self.messenger, post_type))
+
+    def _check_payload(self, *filenames: str) -> None:
+        self._plan(list(filenames), list(filenames))
+
+    def _send_batches(self, send: Callable, channel_id: int, batches: list, *args, **kwargs) -> list:
+        messages: list = []
+        for batch in batches:
+            try:
+                response = send(channel_id, batch, *args, **kwargs)
+            except Exception as e:
+                if not messages:
+                    raise
+                raise PartialDelivery(messages) from e
+            messages.extend(response if isinstance(response, list) else [response])
+        return messages
 
     @abstractmethod
     def delete_message(self, channel_id: int, message_id: int, **kwargs) -> dict:
@@ -71,80 +139,117 @@ class AbstractSender(ABC):
 
 
 class DiscordSender(AbstractSender):
-    def __init__(self, bot: Bot) -> None:
-        super().__init__()
-        self.bot = DiscordBot(bot.token)
+    messenger = MessengerEnum.DISCORD
+
+    def __init__(self, bot: Bot, buffers: MediaBuffers | None = None) -> None:
+        super().__init__(buffers)
+        self.bot = DiscordBot(bot.token, session=streaming_session)
 
     def _send_audio(self, channel_id: int, audio: FileField, *args, **kwargs) -> DiscordMessage:
-        return self.bot.send_audio(channel_id, audio, *args, **kwargs)
+        filename = self._get_path(audio)
+        self._check_payload(filename)
+        with self._reserve(filename), self._open(filename) as file:
+            audio = File(file, name=audio.name)
+            return self.bot.send_audio(channel_id, audio, *args, **kwargs)
 
     def _send_document(self, channel_id: int, document: FileField, *args, **kwargs) -> DiscordMessage:
-        return self.bot.send_document(channel_id, document, *args, **kwargs)
+        filename = self._get_path(document)
+        self._check_payload(filename)
+        with self._reserve(filename), self._open(filename) as file:
+            document = File(file, name=document.name)
+            return self.bot.send_document(channel_id, document, *args, **kwargs)
 
     def _send_photo(self, channel_id: int, photo: ImageFieldFile, *args, **kwargs) -> DiscordMessage:
-        return self.bot.send_photo(channel_id, photo, *args, **kwargs)
+        filename = self._get_photo_path(photo)
+        with self._reserve(filename), self._open(filename) as file:
+            photo = File(file, name=get_derivative_name(photo.name, filename))
+            return self.bot.send_photo(channel_id, photo, *args, **kwargs)
 
     def _send_video(self, channel_id: int, video: FileField, *args, **kwargs) -> DiscordMessage:
-        return self.bot.send_video(channel_id, video, *args, **kwargs)
+        filename = self._get_path(video)
+        self._check_payload(filename)
+        with self._reserve(filename), self._open(filename) as file:
+            video = File(file, name=video.name)
+            return self.bot.send_video(channel_id, video, *args, **kwargs)
 
     def _send_voice(self, channel_id: int, voice: FileField, *args, **kwargs) -> DiscordMessage:
-        return self.bot.send_voice(channel_id, voice, *args, **kwargs)
-
-    def _send_gallery_documents(self, channel_id: int, documents: QuerySet[GalleryDocument], *args, **kwargs) -> DiscordMessage:  # NOQA: E501
+        filename = self._get_transcoded_path(voice, TranscodeProfileEnum.VOICE)
+        self._check_payload(filename)
+        with self._reserve(filename), self._open(filename) as file:
+            voice = File(file, name=get_derivative_name(voice.name, filename))
+            return self.bot.send_voice(channel_id, voice, *args, **kwargs)
+
+    def _send_gallery_documents(self, channel_id: int, documents: QuerySet[GalleryDocument], *args, **kwargs) -> List[DiscordMessage]:  # NOQA: E501
+        documents = [
+            (index, document, self._get_path(document.file))
+            for index, document in enumerate(documents, 1)
+        ]
+        batches = self._plan(documents, [filename for *_, filename in documents], PostTypeEnum.GALLERY_DOCUMENTS)
+        return self._send_batches(self._send_gallery_documents_batch, channel_id, batches, **kwargs)
+
+    def _send_gallery_documents_batch(self, channel_id: int, documents: list, **kwargs) -> DiscordMessage:
         content = []
         files = []
-        for index, document in enumerate(documents, 1):
-            with open(self._get_path(document.file), mode='rb') as file:
+
+        with self._reserve(*[filename for *_, filename in documents]), ExitStack() as stack:
+            for index, document, filename in documents:
                 if document.caption:
                     content.append(f'{index}. {escape_discord_message(document.caption)}')
-                files.append((document.file.name, BytesIO(file.read())))
-
-        headers = {
-            'Content-Disposition': 'form-data; name="payload_json"',
-            'Content-Type': 'multipart/form-data',
-        }
-
-        return self._send_media_group(
-            channel_id,
-            files,
-            embeds=None,
-            attachments=None,
-            message='\n'.join(content),
-            headers=headers,
-            **kwargs,
-        )
-
-    def _send_gallery_photos(self, channel_id: int, photos: QuerySet[GalleryPhoto], *args, **kwargs) -> DiscordMessage:  # NOQA: E501
+                files.append((document.file.name, stack.enter_context(self._open(filename))))
+
+            headers = {
+                'Content-Disposition': 'form-data; name="payload_json"',
+                'Content-Type': 'multipart/form-data',
+            }
+
+            return self._send_media_group(
+                channel_id,
+                files,
+                embeds=None,
+                attachments=None,
+                message='\n'.join(content),
+                headers=headers,
+                **kwargs,
+            )
+
+    def _send_gallery_photos(self, channel_id: int, photos: QuerySet[GalleryPhoto], *args, **kwargs) -> List[DiscordMessage]:  # NOQA: E501
+        photos = [(photo, self._get_photo_path(photo.file)) for photo in photos]
+        batches = self._plan(photos, [filename for _, filename in photos], PostTypeEnum.GALLERY_PHOTOS)
+        return self._send_batches(self._send_gallery_photos_batch, channel_id, batches, **kwargs)
+
+    def _send_gallery_photos_batch(self, channel_id: int, photos: list, **kwargs) -> DiscordMessage:
         embeds = []
         attachments = []
         files = []
-        for index, photo in enumerate(photos):
-            with open(self._get_path(photo.file), mode='rb') as file:
+
+        with self._reserve(*[filename for _, filename in photos]), ExitStack() as stack:
+            for index, (photo, filename) in enumerate(photos):
+                name = get_derivative_name(photo.file.name, filename)
                 attachments.append({
                     'id': index,
-                    'filename': photo.file.name,
+                    'filename': name,
                 })
                 embeds.append({
                     'description': escape_discord_message(photo.caption) if photo.caption else '',
                     'image': {
-                        'url': f'attachment://{photo.file.name}',
+                        'url': f'attachment://{name}',
                     },
                 })
-                files.append((photo.file.name, BytesIO(file.read())))
-
-        headers = {
-            'Content-Disposition': 'form-data; name="payload_json"',
-            'Content-Type': 'multipart/form-data',
-        }
-
-        return self._send_media_group(
-            channel_id,
-            files,
-            embeds=embeds,
-            attachments=attachments,
-            headers=headers,
-            **kwargs,
-        )
+                files.append((name, stack.enter_context(self._open(filename))))
+
+            headers = {
+                'Content-Disposition': 'form-data; name="payload_json"',
+                'Content-Type': 'multipart/form-data',
+            }
+
+            return self._send_media_group(
+                channel_id,
+                files,
+                embeds=embeds,
+                attachments=attachments,
+                headers=headers,
+                **kwargs,
+            )
 
     def _send_media_group(self, channel_id, files: List[tuple], **kwargs) -> DiscordMessage:
         return self.bot.send_media_group(channel_id, files, **kwargs)
@@ -202,60 +307,94 @@ class DiscordSender(AbstractSender):
 
 
 class TelegramSender(AbstractSender):
-    def __init__(self, bot: Bot) -> None:
-        super().__init__()
+    messenger = MessengerEnum.TELEGRAM
+
+    def __init__(self, bot: Bot, buffers: MediaBuffers | None = None) -> None:
+        super().__init__(buffers)
         self.bot = TelegramBot(bot.token)
 
     def _send_audio(self, channel_id: int, audio: str, *args, **kwargs) -> TelegramMessage:
-        with open(self._get_path(audio), mode='rb') as file:
+        filename = self._get_path(audio)
+        self._check_payload(filename)
+        with self._reserve(filename), self._open(filename) as file:
             return self.bot.send_audio(channel_id, file, *args, **kwargs)
 
     def _send_document(self, channel_id: int, document: str, *args, **kwargs) -> TelegramMessage:
-        with open(self._get_path(document), mode='rb') as file:
-            return self.bot.send_document(channel_id, file, *args, **kwargs)
-
-    def _send_media_group(self, channel_id, files: List[GalleryDocument | GalleryPhoto], *args, **kwargs) -> List[TelegramMessage]:  # NOQA: E501
+        filename = self._get_path(document)
+        self._check_payload(filename)
+        with self._reserve(filename), self._open(filename) as file:
+            return self.bot.send_document(
+                channel_id,
+                file,
+                *args,
+                visible_file_name=path.basename(str(document)),
+                **kwargs,
+            )
+
+    def _send_media_group(self, channel_id, files: List[InputMediaDocument | InputMediaPhoto], *args, **kwargs) -> List[TelegramMessage] | TelegramMessage:  # NOQA: E501
+        if len(files) == 1:
+            media = files[0]
+            send = self.bot.send_photo if isinstance(media, InputMediaPhoto) else self.bot.send_document
+            kwargs.update({'caption': media.caption, 'parse_mode': media.parse_mode})
+            return send(channel_id, media.media, *args, **kwargs)
         return self.bot.send_media_group(channel_id, files, *args, **kwargs)
 
     def _send_gallery_documents(self, channel_id: int, documents: QuerySet[GalleryDocument], *args, **kwargs) -> List[TelegramMessage]:  # NOQA: E501
+        documents = [(document, self._get_path(document.file)) for document in documents]
+        batches = self._plan(documents, [filename for _, filename in documents], PostTypeEnum.GALLERY_DOCUMENTS)
+        return self._send_batches(self._send_gallery_documents_batch, channel_id, batches, *args, **kwargs)
+
+    def _send_gallery_documents_batch(self, channel_id: int, documents: list, *args, **kwargs) -> List[TelegramMessage]:  # NOQA: E501
         files = []
-        for document in documents:
-            with open(self._get_path(document.file), mode='rb') as file:
+
+        with self._reserve(*[filename for _, filename in documents]), ExitStack() as stack:
+            for document, filename in documents:
                 files.append(
                     InputMediaDocument(
-                        BytesIO(file.read()),
+                        (path.basename(document.file.name), stack.enter_context(self._open(filename))),
                         caption=escape_telegram_message(document.caption),
                         parse_mode='MarkdownV2',
                     )
                 )
-        return self._send_media_group(channel_id, files, *args, **kwargs)
+            return self._send_media_group(channel_id, files, *args, **kwargs)
 
     def _send_gallery_photos(self, channel_id: int, photos: QuerySet[GalleryPhoto], *args, **kwargs) -> List[TelegramMessage]:  # NOQA: E501
+        photos = [(photo, self._get_photo_path(photo.file)) for photo in photos]
+        batches = self._plan(photos, [filename for _, filename in photos], PostTypeEnum.GALLERY_PHOTOS)
+        return self._send_batches(self._send_gallery_photos_batch, channel_id, batches, *args, **kwargs)
+
+    def _send_gallery_photos_batch(self, channel_id: int, photos: list, *args, **kwargs) -> List[TelegramMessage]:  # NOQA: E501
         files = []
-        for photo in photos:
-            with open(self._get_path(photo.file), mode='rb') as file:
+
+        with self._reserve(*[filename for _, filename in photos]), ExitStack() as stack:
+            for photo, filename in photos:
                 files.append(
                     InputMediaPhoto(
-                        BytesIO(file.read()),
+                        stack.enter_context(self._open(filename)),
                         caption=escape_telegram_message(photo.caption),
                         parse_mode='MarkdownV2',
                     )
                 )
-        return self._send_media_group(channel_id, files, *args, **kwargs)
+            return self._send_media_group(channel_id, files, *args, **kwargs)
 
     def _send_message(self, channel_id: int, message: str, *args, **kwargs) -> TelegramMessage:
         return self.bot.send_message(channel_id, message, *args, **kwargs)
 
     def _send_photo(self, channel_id: int, photo: str, *args, **kwargs) -> TelegramMessage:
-        with open(self._get_path(photo), mode='rb') as file:
+        filename = self._get_photo_path(photo)
+        with self._reserve(filename), self._open(filename) as file:
             return self.bot.send_photo(channel_id, file, *args, **kwargs)
 
     def _send_video(self, channel_id: int, video: str, *args, **kwargs) -> TelegramMessage:
-        with open(self._get_path(video), mode='rb') as file:
+        filename = self._get_transcoded_path(video, TranscodeProfileEnum.VIDEO_NOTE)
+        self._check_payload(filename)
+        with self._reserve(filename), self._open(filename) as file:
             return self.bot.send_video_note(channel_id, data=file)
 
     def _send_voice(self, channel_id: int, voice: str, *args, **kwargs) -> TelegramMessage:
-        with open(self._get_path(voice), mode='rb') as file:
+        filename = self._get_transcoded_path(voice, TranscodeProfileEnum.VOICE)
+        self._check_payload(filename)
+        with self._reserve(filename), self._open(filename) as file:
             return self.bot.send_voice(channel_id, file, *args, **kwargs)
 
     def delete_message(self, channel_id: int, message_id: int) -> dict:
@@ -319,18 +458,22 @@ class Sender(AbstractSender):
         MessengerEnum.TELEGRAM: TelegramSender,
     }
 
-    def __init__(self, bot: Bot) -> None:
+    def __init__(self, bot: Bot, buffers: MediaBuffers | None = None) -> None:
         sender = self.senders.get(bot.bot_type)
 
         if not sender:
             raise SenderNotFound(f'Not found sender for channel with type {bot.bot_type}')
 
-        self.sender = sender(bot)
+        self.sender = sender(bot, buffers)
 
     @property
     def is_telegram_sender(self):
         return isinstance(self.sender, TelegramSender)
 
+    @property
+    def bytes_sent(self) -> int:
+        return self.sender.bytes_sent
+
     def delete_message(self, channel_id: int, message_id: int, **kwargs) -> dict:
         return self.sender.delete_message(channel_id, message_id, **kwargs)
 
@@ -0,0 +1,144 @@
+(function() {
+    const MAX_RETRY_DELAY = 30000;
+    let activeUploads = 0;
+
+    const getCsrfToken = () => {
+        const input = document.querySelector('input[name=csrfmiddlewaretoken]');
+        return input ? input.value : '';
+    };
+
+    const getStorageKey = (input, file) => `chunked-upload:${input.name}:${file.name}:${file.size}:${file.lastModified}`;
+
+    const sleep = (delay) => new Promise((resolve) => setTimeout(resolve, delay));
+
+    const toggleSubmit = () => {
+        document.querySelectorAll('input[type=submit]').forEach((button) => {
+            button.disabled = activeUploads > 0;
+        });
+    };
+
+    const getStatus = (input) => {
+        let status = input.parentNode.querySelector('.chunked-upload-status');
+        if (!status) {
+            status = document.createElement('small');
+            status.className = 'chunked-upload-status form-text text-muted';
+            input.after(status);
+        }
+        return status;
+    };
+
+    const request = async (url, options = {}) => {
+        const response = await fetch(url, {
+            credentials: 'same-origin',
+            ...options,
+            headers: {'X-CSRFToken': getCsrfToken(), ...(options.headers || {})},
+        });
+        const data = await response.json().catch(() => ({}));
+        return {status: response.status, data};
+    };
+
+    const createUpload = async (input, file) => {
+        const body = new FormData();
+        body.append('name', file.name);
+        body.append('size', file.size);
+        body.append('field_name', input.name);
+
+        const response = await request(input.dataset.chunkedUploadUrl, {method: 'POST', body});
+        if (response.status !== 200) {
+            throw new Error(response.data.error);
+        }
+        return response.data;
+    };
+
+    const resumeUpload = async (input, file) => {
+        const token = localStorage.getItem(getStorageKey(input, file));
+        if (token) {
+            const response = await request(`${input.dataset.chunkedUploadUrl}${token}/`);
+            if (response.status === 200) {
+                return response.data;
+            }
+        }
+
+        const upload = await createUpload(input, file);
+        localStorage.setItem(getStorageKey(input, file), upload.token);
+        return upload;
+    };
+
+    const sendChunks = async (input, file, upload, status) => {
+        const url = `${input.dataset.chunkedUploadUrl}${upload.token}/`;
+        let offset = upload.offset;
+        let delay = 1000;
+
+        while (offset < file.size) {
+            status.textContent = `${Math.floor(offset * 100 / file.size)}%`;
+
+            try {
+                const response = await request(url, {
+                    method: 'PUT',
+                    headers: {'Upload-Offset': offset},
+                    body: file.slice(offset, offset + upload.chunk_size),
+                });
+
+                if (response.status === 200 || response.status === 409) {
+                    offset = response.data.offset;
+                    delay = 1000;
+                    continue;
+                }
+                if (response.status < 500) {
+                    throw new Error(response.data.error);
+                }
+            } catch (error) {
+                if (!(error instanceof TypeError)) {
+                    throw error;
+                }
+            }
+
+            status.textContent = `${Math.floor(offset * 100 / file.size)}% (connection lost, retrying)`;
+            await sleep(delay);
+            delay = Math.min(delay * 2, MAX_RETRY_DELAY);
+
+            const response = await request(url).catch(() => null);
+            if (response && response.status === 200) {
+                offset = response.data.offset;
+            }
+        }
+    };
+
+    const uploadFile = async (input, file) => {
+        const status = getStatus(input);
+        activeUploads += 1;
+        toggleSubmit();
+
+        try {
+            const upload = await resumeUpload(input, file);
+            await sendChunks(input, file, upload, status);
+
+            let token = input.form.querySelector(`input[name="${input.name}_upload_token"]`);
+            if (!token) {
+                token = document.createElement('input');
+                token.type = 'hidden';
+                token.name = `${input.name}_upload_token`;
+                input.after(token);
+            }
+            token.value = upload.token;
+
+            localStorage.removeItem(getStorageKey(input, file));
+            input.value = '';
+            input.required = false;
+            status.textContent = `${file.name} - 100%`;
+        } catch (error) {
+            status.textContent = error.message;
+        } finally {
+            activeUploads -= 1;
+            toggleSubmit();
+        }
+    };
+
+    document.addEventListener('change', (event) => {
+        const input = event.target;
+        if (!input.matches('input[type=file][data-chunked-upload-url]') || !input.files.length) {
+            return;
+        }
+        uploadFile(input, input.files[0]);
+    });
+})();
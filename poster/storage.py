@@ -0,0 +1,153 @@
+from contextlib import contextmanager
+from hashlib import sha256
+from os import chmod
+from os import getpid
+from os import link
+from os import lstat
+from os import makedirs
+from os import path
+from os import readlink
+from os import remove
+from os import symlink
+from stat import S_ISLNK
+from typing import Any
+from typing import Iterator
+
+from django.conf import settings
+from django.core.files import locks
+from django.core.files.storage import FileSystemStorage
+
+from .enums import StorageLinkEnum
+from .media import get_file_hash
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+BLOBS_DIRECTORY = 'blobs'
+BLOBS_LOCK = '.lock'
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def __init__(self, *args, link_mode: str | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.link_mode = link_mode or settings.MEDIA_LINK_MODE
+
+    def _get_blob_path(self, content_key: str) -> str:
+        return path.join(self.location, BLOBS_DIRECTORY, content_key[:2], content_key)
+
+    def _write_temporary(self, content: Any, directory: str) -> tuple[str, str]:
+        digest = sha256()
+        temporary = path.join(directory, f'.{getpid()}.{id(content)}.tmp')
+
+        with open(temporary, mode='wb') as file:
+            for chunk in content.chunks():
+                digest.update(chunk)
+                file.write(chunk)
+
+        if self.file_permissions_mode is not None:
+            chmod(temporary, self.file_permissions_mode)
+
+        return digest.hexdigest(), temporary
+
+    @contextmanager
+    def _lock_blob(self, blob: str) -> Iterator[None]:
+        makedirs(path.dirname(blob), exist_ok=True)
+        with open(path.join(path.dirname(blob), BLOBS_LOCK), mode='a') as file:
+            locks.lock(file, locks.LOCK_EX)
+            yield
+
+    def _update_references(self, blob: str, delta: int, source: str | None = None) -> int:
+        with open(f'{blob}.refs', mode='a+') as file:
+            locks.lock(file, locks.LOCK_EX)
+            file.seek(0)
+            references = max(0, int(file.read() or 0) + delta)
+
+            if source and not path.exists(blob):
+                link(source, blob)
+            elif not references and path.exists(blob):
+                remove(blob)
+
+            file.seek(0)
+            file.truncate()
+            file.write(str(references))
+
+        return references
+
+    def _link(self, blob: str, full_path: str) -> None:
+        if self.link_mode == StorageLinkEnum.SYMLINK:
+            symlink(path.relpath(blob, path.dirname(full_path)), full_path)
+        else:
+            link(blob, full_path)
+
+    def _save(self, name: str, content: Any) -> str:
+        full_path = self.path(name)
+        blobs_root = path.join(self.location, BLOBS_DIRECTORY)
+        makedirs(path.dirname(full_path), mode=self.directory_permissions_mode or 0o777, exist_ok=True)
+        makedirs(blobs_root, exist_ok=True)
+
+        content_key, temporary = self._write_temporary(content, blobs_root)
+        blob = self._get_blob_path(content_key)
+        makedirs(path.dirname(blob), exist_ok=True)
+
+        try:
+            with self._lock_blob(blob):
+                if self.link_mode == StorageLinkEnum.SYMLINK:
+                    self._update_references(blob, 1, source=temporary)
+                elif not path.exists(blob):
+                    link(temporary, blob)
+
+                while True:
+                    try:
+                        self._link(blob, full_path)
+                    except FileExistsError:
+                        name = self.get_available_name(name)
+                        full_path = self.path(name)
+                        continue
+
+                    break
+        finally:
+            remove(temporary)
+
+        return str(name).replace('\\', '/')
+
+    def get_content_key(self, name: str) -> str:
+        full_path = self.path(name)
+        if path.islink(full_path):
+            return path.basename(readlink(full_path))
+        return get_file_hash(full_path)
+
+    def get_references(self, name: str) -> int:
+        full_path = self.path(name)
+        if path.islink(full_path):
+            with open(f'{self._get_blob_path(self.get_content_key(name))}.refs') as file:
+                return int(file.read() or 0)
+        return max(1, lstat(full_path).st_nlink - 1)
+
+    def delete(self, name: str) -> None:
+        if not name:
+            raise ValueError('The name must be given to delete().')
+
+        full_path = self.path(name)
+
+        try:
+            info = lstat(full_path)
+        except FileNotFoundError:
+            return
+
+        if S_ISLNK(info.st_mode):
+            blob = self._get_blob_path(self.get_content_key(name))
+            with self._lock_blob(blob):
+                remove(full_path)
+                try:
+                    self._update_references(blob, -1)
+                except FileNotFoundError as e:
+                    logger.warning(e)
+        elif info.st_nlink > 1:
+            blob = self._get_blob_path(self.get_content_key(name))
+            with self._lock_blob(blob):
+                remove(full_path)
+                if path.exists(blob) and lstat(blob).st_nlink == 1:
+                    remove(blob)
+        else:
+            super().delete(name)
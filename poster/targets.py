@@ -0,0 +1,65 @@
+from typing import Iterable
+
+from django.db.models import Exists
+from django.db.models import ExpressionWrapper
+from django.db.models import F
+from django.db.models import Func
+from django.db.models import OuterRef
+from django.db.models import Q
+from django.db.models import QuerySet
+
+from .enums import DeliveryStatusEnum
+from .models import Channel
+from .models import ChannelGroup
+from .models import Delivery
+from .models import Post
+
+
+def get_rule_groups(groups: QuerySet) -> QuerySet[ChannelGroup]:
+    has_rules = ~Q(messenger__isnull=True) & ~Q(messenger='') | Q(bot__isnull=False) | ~Q(tag='')
+
+    return ChannelGroup.objects.annotate(
+        channel_tags=ExpressionWrapper(OuterRef('tags'), output_field=Channel._meta.get_field('tags')),
+    ).filter(
+        has_rules,
+        Q(messenger__isnull=True) | Q(messenger='') | Q(messenger=OuterRef('channel_type')),
+        Q(bot__isnull=True) | Q(bot_id=OuterRef('bot_id')),
+        Q(tag='') | Q(channel_tags__contains=Func(F('tag'), template='ARRAY[%(expressions)s]')),
+        pk__in=groups,
+    )
+
+
+def get_target_filter(post: Post) -> Q:
+    groups = Post.channel_groups.through.objects.filter(post_id=post.pk).values('channelgroup_id')
+
+    return (
+        Q(pk__in=Post.channels.through.objects.filter(post_id=post.pk).values('channel_id'))
+        | Q(pk__in=ChannelGroup.channels.through.objects.filter(channelgroup_id__in=groups).values('channel_id'))
+        | Q(Exists(get_rule_groups(groups)))
+    )
+
+
+def get_posts_for_channels(channels: Iterable[Channel]) -> QuerySet[Post]:
+    channels = list(channels)
+    groups = [
+        group.pk for group in ChannelGroup.objects.only('messenger', 'bot_id', 'tag')
+        if any(group.matches_rules(channel) for channel in channels)
+    ]
+
+    return Post.objects.filter(
+        Q(channels__in=channels) | Q(channel_groups__channels__in=channels) | Q(channel_groups__in=groups),
+    ).distinct()
+
+
+def resolve_channels(post: Post, pending: bool = True) -> QuerySet[Channel]:
+    channels = Channel.objects.filter(get_target_filter(post), is_completed=True, channel_id__isnull=False)
+
+    if pending:
+        delivered = Delivery.objects.filter(
+            post_id=post.pk,
+            channel_id=OuterRef('pk'),
+            status__in=[DeliveryStatusEnum.SENT, DeliveryStatusEnum.PARTIAL],
+        )
+        channels = channels.filter(~Exists(delivered))
+
+    return channels.order_by('pk')
@@ -1,30 +1,158 @@
+from math import ceil
+from time import monotonic
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+from django.utils.timezone import now
+
+from .audit import audit_log
+from .buffers import MediaBuffers
+from .cache import media_cache
+from .channels import apply_channel_info
+from .channels import get_channel_info
+from .channels import get_stale_channels
+from .channels import refresh_channels
+from .chunked import cleanup_chunked_uploads
+from .enums import DeliveryStatusEnum
+from .enums import TaskStatusEnum
 from .enums import TaskTypeEnum
+from .exceptions import ChannelNotResolved
+from .exceptions import MediaNotReady
+from .exceptions import PartialDelivery
+from .exceptions import TranscodeFailed
+from .imports import ImportFailure
+from .imports import PARSE_ERRORS
+from .imports import import_channels
+from .imports import parse_channels
+from .imports import save_report
+from .media import find_transcode_failure
+from .media import find_transcoded
+from .media import make_photo_derivatives
+from .media import make_thumbnail
+from .media import transcode
+from .models import Bot
+from .models import Channel
+from .models import Delivery
 from .models import Post
-from .models import PostMessage
 from .models import Task
+from .partitions import maintain_partitions
+from .results import make_result
 from .sender import Sender
+from .targets import resolve_channels
+from .utils import download_channel_photo
 from config.celery import app
 
 import logging
 logger = logging.getLogger(__name__)
 
 
-def delete_message(self, message: PostMessage) -> None:
-    task = Task(
-        task_type=TaskTypeEnum.DELETE,
-        channel_id=message.channel.pk,
-        task_id=self.request.id,
-    )
+DELIVERY_FIELDS = [
+    'messenger', 'chat_id', 'chat_title', 'message_ids', 'status', 'sent_at', 'permalink', 'updated_at',
+]
+
+
+def get_send_queue_key(post_pk: int) -> str:
+    return f'poster:send-queued:{post_pk}'
+
+
+def queue_send_post(post: Post) -> None:
+    def enqueue() -> None:
+        if cache.add(get_send_queue_key(post.pk), True, settings.POST_SEND_QUEUE_TIMEOUT):
+            send_post_task.delay(post.pk, disable_notification=post.is_silent)
+
+    transaction.on_commit(enqueue)
+
+
+def get_deliveries(post: Post) -> dict[int, Delivery]:
+    return {delivery.channel_id: delivery for delivery in Delivery.objects.filter(post_id=post.pk)}
+
+
+def make_delivery(
+    post: Post,
+    channel: Channel,
+    message_ids: list,
+    exception: BaseException | None,
+    delivery: Delivery | None = None,
+) -> Delivery:
+    delivery = delivery or Delivery(post=post, channel=channel, status=DeliveryStatusEnum.FAILED)
+
+    if delivery.status == DeliveryStatusEnum.DELETED:
+        delivery.message_ids = []
+
+    if message_ids:
+        delivery.message_ids = [*delivery.message_ids, *[int(message_id) for message_id in message_ids]]
+        delivery.status = DeliveryStatusEnum.PARTIAL if exception else DeliveryStatusEnum.SENT
+        delivery.sent_at = now()
+    elif not delivery.message_ids:
+        delivery.status = DeliveryStatusEnum.FAILED
+
+    delivery.messenger = channel.channel_type
+    delivery.chat_id = channel.channel_id
+    delivery.chat_title = channel.chat_title
+    delivery.permalink = channel.get_message_link(delivery.message_ids[0]) if delivery.message_ids else ''
+    return delivery
+
+
+def save_deliveries(deliveries: list[Delivery]) -> None:
+    if deliveries:
+        Delivery.objects.bulk_create(
+            deliveries,
+            update_conflicts=True,
+            unique_fields=['post', 'channel'],
+            update_fields=DELIVERY_FIELDS,
+        )
+
+
+def fail_post(self, post: Post, exception: BaseException) -> None:
+    logger.error(f'Post with id {post.pk} failed: {exception}')
+    existing = get_deliveries(post)
+    deliveries = []
+    for channel in resolve_channels(post):
+        task = Task(
+            task_type=TaskTypeEnum.CREATE,
+            channel_id=channel.pk,
+            task_id=self.request.id,
+            post_id=post.pk,
+        )
+        task.result = make_result(monotonic(), exception=exception)
+        deliveries.append(make_delivery(post, channel, [], exception, existing.get(channel.pk)))
+        audit_log.push(task)
+    save_deliveries(deliveries)
 
-    try:
-        sender = Sender(message.channel.bot)
-        task.response = sender.delete_message(message.channel.channel_id, message.message_id)
-    except Exception as e:
-        logger.exception(e)
-        task.exception = e
 
-    task.save()
-    message.delete()
+def delete_delivery(self, delivery: Delivery) -> None:
+    for message_id in delivery.message_ids:
+        task = Task(
+            task_type=TaskTypeEnum.DELETE,
+            channel_id=delivery.channel_id,
+            task_id=self.request.id,
+            post_id=delivery.post_id,
+        )
+
+        started = monotonic()
+        try:
+            sender = Sender(delivery.channel.bot)
+            response = sender.delete_message(delivery.chat_id, message_id)
+        except Exception as e:
+            logger.exception(e)
+            task.result = make_result(started, exception=e)
+        else:
+            status = TaskStatusEnum.SUCCESS if response['deleted'] else TaskStatusEnum.FAIL
+            task.result = make_result(started, status=status)
+
+        audit_log.push(task)
+
+    if not delivery.post_id:
+        delivery.delete()
+        return
+
+    delivery.message_ids = []
+    delivery.status = DeliveryStatusEnum.DELETED
+    delivery.permalink = ''
+    delivery.save(update_fields=['message_ids', 'status', 'permalink', 'updated_at'])
 
 
 @app.task(name='poster.tasks.delete_post_task', bind=True)
@@ -34,18 +162,18 @@ def delete_post_task(self, post_pk: int) -> None:
         logger.exception(f'Post with id {post_pk} not found')
         return
 
-    for message in post.messages.all():
-        delete_message(self, message)
+    for delivery in post.deliveries.select_related('channel__bot').exclude(status=DeliveryStatusEnum.DELETED):
+        delete_delivery(self, delivery)
 
 
-@app.task(name='poster.tasks.delete_message_task', bind=True)
-def delete_message_task(self, message_pk: int) -> None:
-    message = PostMessage.objects.filter(pk=message_pk).first()
-    if not message:
-        logger.exception(f'Message with id {message_pk} not found')
+@app.task(name='poster.tasks.delete_delivery_task', bind=True)
+def delete_delivery_task(self, delivery_pk: int) -> None:
+    delivery = Delivery.objects.select_related('channel__bot').filter(pk=delivery_pk).first()
+    if not delivery:
+        logger.exception(f'Delivery with id {delivery_pk} not found')
         return
 
-    delete_message(self, message)
+    delete_delivery(self, delivery)
 
 
 @app.task(name='poster.tasks.edit_post_task', bind=True)
@@ -55,59 +183,210 @@ def edit_post_task(self, post_pk: int) -> None:
         logger.exception(f'Post with id {post_pk} not found')
         return
 
-    for message in post.messages.all():
-        task = Task(
-            task_type=TaskTypeEnum.UPDATE,
-            channel_id=message.channel.pk,
-            task_id=self.request.id,
+    deliveries = post.deliveries.select_related('channel__bot').exclude(
+        status__in=[DeliveryStatusEnum.DELETED, DeliveryStatusEnum.FAILED],
+    )
+    for delivery in deliveries:
+        for message_id in delivery.message_ids:
+            task = Task(
+                task_type=TaskTypeEnum.UPDATE,
+                channel_id=delivery.channel_id,
+                task_id=self.request.id,
+                post_id=post.pk,
+            )
+
+            started = monotonic()
+            try:
+                sender = Sender(delivery.channel.bot)
+                response = sender.edit_message(
+                    delivery.chat_id,
+                    message_id,
+                    post,
+                    parse_mode='MarkdownV2'
+                )
+            except Exception as e:
+                logger.exception(e)
+                task.result = make_result(started, exception=e)
+            else:
+                task.result = make_result(started, response)
+
+            audit_log.push(task)
+
+        Delivery.objects.filter(pk=delivery.pk).update(revision=F('revision') + 1, updated_at=now())
+
+
+@app.task(name='poster.tasks.resolve_channel_task', bind=True, max_retries=5, default_retry_delay=30)
+def resolve_channel_task(self, channel_pk: int) -> None:
+    channel = Channel.objects.select_related('bot').filter(pk=channel_pk).first()
+    if not channel or channel.is_completed or not channel.bot or not channel.channel_id:
+        return
+
+    info = get_channel_info(channel.bot, channel.channel_id)
+    if not info:
+        if self.request.retries >= self.max_retries:
+            logger.warning(f'Channel {channel_pk} info could not be resolved')
+            return
+        raise self.retry(
+            exc=ChannelNotResolved(f'Channel {channel_pk} info could not be resolved'),
+            countdown=self.default_retry_delay * 2 ** self.request.retries,
         )
 
-        try:
-            sender = Sender(message.channel.bot)
-            task.response = sender.edit_message(
-                message.channel.channel_id,
-                message.message_id,
-                post,
-                parse_mode='MarkdownV2'
-            )
-        except Exception as e:
-            logger.exception(e)
-            task.exception = e
+    apply_channel_info(channel, info)
+    channel.save()
+
+    if info['photo_file_id']:
+        download_channel_photo_task.delay(channel.pk, info['photo_file_id'], info['photo_unique_id'])
+
+
+@app.task(name='poster.tasks.download_channel_photo_task', bind=True)
+def download_channel_photo_task(self, channel_pk: int, file_id: str, unique_id: str | None = None) -> None:
+    channel = Channel.objects.select_related('bot').filter(pk=channel_pk).first()
+    if not channel or (unique_id and channel.image_unique_id == unique_id):
+        return
+
+    download_channel_photo(channel, file_id)
+    channel.image_unique_id = unique_id
+    channel.save(update_fields=['image', 'image_unique_id', 'updated_at'])
+
+
+@app.task(name='poster.tasks.refresh_channels_task', bind=True)
+def refresh_channels_task(self) -> None:
+    size = settings.CHANNEL_REFRESH_BATCH_SIZE
+    delay = ceil(size / settings.CHANNEL_REFRESH_RATE)
+
+    for bot_pk in Bot.objects.values_list('pk', flat=True):
+        pks = list(get_stale_channels(bot_pk).values_list('pk', flat=True)[:settings.CHANNEL_REFRESH_LIMIT])
+        for index, start in enumerate(range(0, len(pks), size)):
+            refresh_channel_batch_task.apply_async((bot_pk, pks[start:start + size]), countdown=index * delay)
+
+
+@app.task(name='poster.tasks.refresh_channel_batch_task', bind=True)
+def refresh_channel_batch_task(self, bot_pk: int, channel_pks: list[int]) -> None:
+    bot = Bot.objects.filter(pk=bot_pk).first()
+    if not bot:
+        return
+
+    for channel_pk, file_id, unique_id in refresh_channels(bot, channel_pks):
+        download_channel_photo_task.delay(channel_pk, file_id, unique_id)
+
+
+@app.task(name='poster.tasks.import_channels_task', bind=True)
+def import_channels_task(self, name: str, report: str, bot_pk: int | None = None) -> None:
+    try:
+        with default_storage.open(name, mode='rb') as file:
+            rows = parse_channels(file.read().decode('utf-8-sig'), name)
+    except (OSError, *PARSE_ERRORS) as e:
+        logger.error(f'Channel import {name} could not be read: {e}')
+        save_report(report, [ImportFailure(0, '', f'Unable to read the file: {e}')])
+        return
+    else:
+        result = import_channels(rows, Bot.objects.filter(pk=bot_pk).first() if bot_pk else None)
+    finally:
+        default_storage.delete(name)
+
+    for channel_pk, file_id, unique_id in result.photos:
+        download_channel_photo_task.delay(channel_pk, file_id, unique_id)
+
+    save_report(report, result.failures)
+    logger.info(
+        f'Channel import {name}: {len(result.created)} created, '
+        f'{result.skipped} skipped, {len(result.failures)} failed'
+    )
+
 
-        task.save()
+@app.task(name='poster.tasks.make_photo_derivatives_task', bind=True)
+def make_photo_derivatives_task(self, name: str) -> None:
+    make_photo_derivatives(media_cache.get_path(name))
+    make_thumbnail(name)
 
 
-@app.task(name='poster.tasks.send_post_task', bind=True)
+@app.task(name='poster.tasks.transcode_media_task', bind=True)
+def transcode_media_task(self, name: str, profile: str) -> None:
+    try:
+        transcode(media_cache.get_path(name), profile)
+    except TranscodeFailed as e:
+        logger.error(e)
+
+
+@app.task(name='poster.tasks.cleanup_chunked_uploads_task', bind=True)
+def cleanup_chunked_uploads_task(self) -> None:
+    cleanup_chunked_uploads()
+
+
+@app.task(name='poster.tasks.maintain_task_partitions_task', bind=True)
+def maintain_task_partitions_task(self) -> None:
+    for name in maintain_partitions():
+        logger.info(f'Task partition {name} dropped')
+
+
+@app.task(name='poster.tasks.flush_task_audit_task', bind=True, ignore_result=True)
+def flush_task_audit_task(self) -> None:
+    written = audit_log.flush()
+    if written:
+        logger.info(f'Task audit flushed {written} records')
+
+
+@app.task(name='poster.tasks.send_post_task', bind=True, max_retries=40, default_retry_delay=15)
 def send_post_task(self, post_pk: int, *, disable_notification: bool) -> None:
     post = Post.objects.filter(pk=post_pk).first()
     if not post:
         logger.exception(f'Post with id {post_pk} not found')
         return
 
-    for channel in post.channels.all():
-        task = Task(
-            task_type=TaskTypeEnum.CREATE,
-            channel_id=channel.pk,
-            task_id=self.request.id,
-            post_id=post.pk,
-        )
+    pending = [
+        (name, profile) for name, profile in post.transcode_sources
+        if not find_transcoded(media_cache.get_path(name), profile)
+    ]
+    if pending:
+        for name, profile in pending:
+            error = find_transcode_failure(media_cache.get_path(name), profile)
+            if error:
+                fail_post(self, post, TranscodeFailed(error))
+                return
 
-        try:
-            sender = Sender(channel.bot)
-            response = sender.send_message(channel.channel_id, post, disable_notification=disable_notification)
-        except Exception as e:
-            logger.exception(e)
-            task.exception = e
-        else:
-            task.response = response
-            response = response if isinstance(response, list) else [response]
+        if not self.request.retries:
+            for name, profile in pending:
+                transcode_media_task.delay(name, profile)
 
-            for message in response:
-                message = PostMessage(
-                    channel_id=channel.pk,
-                    message_id=message.message_id,
-                )
-                message.save()
-                post.messages.add(message)
+        exception = MediaNotReady(f'Post with id {post_pk} has media that is not transcoded yet')
+        if self.request.retries >= self.max_retries:
+            fail_post(self, post, exception)
+            return
+        raise self.retry(exc=exception)
+
+    cache.delete(get_send_queue_key(post.pk))
+    existing = get_deliveries(post)
+    deliveries = []
+    with MediaBuffers() as buffers:
+        for channel in resolve_channels(post).select_related('bot'):
+            task = Task(
+                task_type=TaskTypeEnum.CREATE,
+                channel_id=channel.pk,
+                task_id=self.request.id,
+                post_id=post.pk,
+            )
+
+            started = monotonic()
+            sender = None
+            try:
+                sender = Sender(channel.bot, buffers)
+                response = sender.send_message(channel.channel_id, post, disable_notification=disable_notification)
+            except PartialDelivery as e:
+                logger.exception(e)
+                exception = e.__cause__
+                response = e.messages
+            except Exception as e:
+                logger.exception(e)
+                exception = e
+                response = []
+            else:
+                exception = None
+                response = response if isinstance(response, list) else [response]
+
+            task.result = make_result(started, response, exception, sender.bytes_sent if sender else 0)
+            deliveries.append(
+                make_delivery(post, channel, task.result['message_ids'], exception, existing.get(channel.pk)),
+            )
+            audit_log.push(task)
 
-        task.save()
+    save_deliveries(deliveries)
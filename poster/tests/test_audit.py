@@ -0,0 +1,113 @@
+from datetime import datetime
+from datetime import timezone
+from unittest.mock import MagicMock
+from unittest.mock import patch
+from uuid import uuid4
+
+from django.db import IntegrityError
+from django.test import SimpleTestCase
+from redis.exceptions import ConnectionError
+
+from ..audit import AUDIT_GROUP
+from ..audit import TaskAuditLog
+from ..audit import deserialize_task
+from ..audit import serialize_task
+from ..enums import TaskTypeEnum
+from ..models import Task
+
+
+class TaskAuditLogTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.audit_log = TaskAuditLog('redis://localhost:6379/2', 'poster:tasks', 10, 2, 60000)
+        self.audit_log._client = self.client = MagicMock()
+        self.client.xlen.return_value = 0
+        self.task = Task(
+            task_id=uuid4(),
+            task_type=TaskTypeEnum.CREATE,
+            channel_id=1,
+            post_id=2,
+            result={'status': 'success', 'message_ids': [3]},
+            created_at=datetime(2023, 9, 17, 15, 59, tzinfo=timezone.utc),
+        )
+
+    def test_serialize_round_trip(self):
+        task = deserialize_task(serialize_task(self.task))
+
+        self.assertEqual(str(task.task_id), str(self.task.task_id))
+        self.assertEqual(task.created_at, self.task.created_at)
+        self.assertEqual(task.result, self.task.result)
+        self.assertEqual((task.channel_id, task.post_id), (1, 2))
+
+    def test_push_appends_to_stream(self):
+        with patch.object(Task, 'save') as save:
+            self.audit_log.push(self.task)
+
+        self.client.xadd.assert_called_once_with('poster:tasks', {'task': serialize_task(self.task)})
+        save.assert_not_called()
+
+    def test_full_stream_saves_synchronously(self):
+        self.client.xlen.return_value = 10
+
+        with patch.object(Task, 'save') as save, self.assertLogs('poster.audit', 'WARNING'):
+            self.audit_log.push(self.task)
+
+        self.client.xadd.assert_not_called()
+        save.assert_called_once()
+
+    def test_unavailable_stream_saves_synchronously(self):
+        self.client.xadd.side_effect = ConnectionError()
+
+        with patch.object(Task, 'save') as save, self.assertLogs('poster.audit'):
+            self.audit_log.push(self.task)
+
+        save.assert_called_once()
+
+    def test_flush_writes_claimed_and_new_entries(self):
+        entry = {b'task': serialize_task(self.task).encode()}
+        self.client.xautoclaim.return_value = [b'0-0', [(b'1-0', entry)], []]
+        self.client.xreadgroup.side_effect = [
+            [[b'poster:tasks', [(b'2-0', entry), (b'3-0', entry)]]],
+            [[b'poster:tasks', [(b'4-0', entry)]]],
+        ]
+
+        with patch('poster.audit.transaction', MagicMock()), \
+                patch.object(Task.objects, 'bulk_create') as bulk_create:
+            self.assertEqual(self.audit_log.flush(), 4)
+
+        self.assertEqual(bulk_create.call_count, 3)
+        self.assertEqual(self.client.xreadgroup.call_count, 2)
+        self.client.xack.assert_any_call('poster:tasks', AUDIT_GROUP, b'2-0', b'3-0')
+        self.client.xdel.assert_any_call('poster:tasks', b'4-0')
+
+    @patch('poster.audit.Channel.objects')
+    @patch('poster.audit.Post.objects')
+    def test_flush_skips_past_missing_post(self, posts, channels):
+        orphan = Task(
+            task_id=uuid4(),
+            task_type=TaskTypeEnum.DELETE,
+            channel_id=1,
+            post_id=404,
+            created_at=self.task.created_at,
+        )
+        orphan_entry = {b'task': serialize_task(orphan).encode()}
+        entry = {b'task': serialize_task(self.task).encode()}
+        self.client.xautoclaim.return_value = [b'0-0', [], []]
+        self.client.xreadgroup.side_effect = [
+            [[b'poster:tasks', [(b'1-0', orphan_entry), (b'2-0', {b'task': b'{'})]]],
+            [[b'poster:tasks', [(b'3-0', entry)]]],
+        ]
+        posts.filter.return_value.values_list.return_value = [2]
+        channels.filter.return_value.values_list.return_value = [1]
+        saved = []
+
+        with patch('poster.audit.transaction', MagicMock()), \
+                patch.object(Task.objects, 'bulk_create', side_effect=[IntegrityError('post_id'), None]), \
+                patch.object(Task, 'save', autospec=True, side_effect=lambda task, **kwargs: saved.append(task)), \
+                self.assertLogs('poster.audit', 'WARNING'):
+            self.assertEqual(self.audit_log.flush(), 2)
+
+        self.assertEqual([(task.post_id, task.channel_id) for task in saved], [(None, 1)])
+        self.client.xack.assert_any_call('poster:tasks', AUDIT_GROUP, b'1-0', b'2-0')
+        self.client.xdel.assert_any_call('poster:tasks', b'1-0', b'2-0')
+        self.client.xack.assert_any_call('poster:tasks', AUDIT_GROUP, b'3-0')
@@ -0,0 +1,57 @@
+from threading import Event
+from threading import Thread
+
+from django.test import SimpleTestCase
+from django.test import override_settings
+
+from ..budget import MemoryBudget
+from ..budget import get_process_budget
+
+
+class MemoryBudgetTestCase(SimpleTestCase):
+
+    def test_reserve_and_release(self):
+        budget = MemoryBudget(100)
+
+        with budget.reserve(60) as size:
+            self.assertEqual(size, 60)
+            self.assertEqual(budget.used, 60)
+
+        self.assertEqual(budget.used, 0)
+
+    def test_oversized_reservation_takes_whole_budget(self):
+        budget = MemoryBudget(100)
+
+        with budget.reserve(500) as size:
+            self.assertEqual(size, 100)
+
+    def test_disabled_budget(self):
+        budget = MemoryBudget(0)
+
+        with budget.reserve(500) as size:
+            self.assertEqual(size, 500)
+            self.assertEqual(budget.used, 0)
+
+    def test_exceeding_reservation_waits(self):
+        budget = MemoryBudget(100)
+        acquired = Event()
+
+        def reserve():
+            with budget.reserve(50):
+                acquired.set()
+
+        with budget.reserve(80):
+            thread = Thread(target=reserve)
+            thread.start()
+            self.assertFalse(acquired.wait(0.1))
+
+        self.assertTrue(acquired.wait(1))
+        thread.join()
+        self.assertEqual(budget.used, 0)
+
+    def test_budget_is_split_between_worker_processes(self):
+        with override_settings(MEDIA_MEMORY_BUDGET=400, CELERY_WORKER_CONCURRENCY=4):
+            self.assertEqual(get_process_budget(), 100)
+
+        with override_settings(MEDIA_MEMORY_BUDGET=0, CELERY_WORKER_CONCURRENCY=4):
+            self.assertEqual(get_process_budget(), 0)
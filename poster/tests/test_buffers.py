@@ -0,0 +1,117 @@
+from os import path
+from os import urandom
+from tempfile import TemporaryDirectory
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from django.core.files import File
+from django.test import SimpleTestCase
+from requests.models import RequestEncodingMixin
+
+from ..buffers import MediaBuffers
+from ..buffers import MultipartBody
+from ..buffers import StreamingSession
+
+import tracemalloc
+
+
+class MediaBuffersTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.filename = path.join(self.directory.name, 'document.pdf')
+        with open(self.filename, mode='wb') as file:
+            file.write(b'%PDF-1.4 content')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_file_is_loaded_once(self):
+        with MediaBuffers() as buffers:
+            with buffers.open(self.filename) as first, buffers.open(self.filename) as second:
+                self.assertEqual(first.read(), b'%PDF-1.4 content')
+                self.assertEqual(second.read(4), b'%PDF')
+                self.assertEqual(first.name, 'document.pdf')
+                self.assertEqual(len(buffers.views), 1)
+
+    def test_stream_is_read_only(self):
+        with MediaBuffers() as buffers, buffers.open(self.filename) as stream:
+            self.assertTrue(stream.getbuffer().readonly)
+            self.assertEqual(stream.seek(-7, 2), 9)
+            self.assertEqual(stream.read(), b'content')
+
+    def test_empty_file(self):
+        empty = path.join(self.directory.name, 'empty.txt')
+        open(empty, mode='wb').close()
+
+        with MediaBuffers() as buffers, buffers.open(empty) as stream:
+            self.assertEqual(stream.read(), b'')
+
+
+class MultipartBodyTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.filename = path.join(self.directory.name, 'video.mp4')
+        with open(self.filename, mode='wb') as file:
+            file.write(urandom(4 * 1024 * 1024))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def encode(self, files, data=None):
+        with patch('urllib3.filepost.choose_boundary', return_value='boundary'):
+            return MultipartBody.encode(files, data)
+
+    def test_body_matches_requests_encoding(self):
+        with MediaBuffers() as buffers, buffers.open(self.filename) as stream:
+            with self.encode({'video': stream, 'cover': ('cover.jpg', b'jpeg')}, {'chat_id': '1'}) as body:
+                with open(self.filename, mode='rb') as file, patch(
+                    'urllib3.filepost.choose_boundary', return_value='boundary',
+                ):
+                    expected = RequestEncodingMixin._encode_files(
+                        {'video': file, 'cover': ('cover.jpg', b'jpeg')}, {'chat_id': '1'},
+                    )
+
+                self.assertEqual(len(body), len(expected[0]))
+                self.assertEqual(body.read(), expected[0])
+                self.assertEqual(body.content_type, expected[1])
+
+    def test_django_file_is_unwrapped(self):
+        with MediaBuffers() as buffers, buffers.open(self.filename) as stream:
+            with self.encode([('files[0]', ('clip.mp4', File(stream, name='clip.mp4')))]) as body:
+                self.assertIn(b'filename="clip.mp4"', body.read(1024))
+
+    def test_plain_files_are_not_streamed(self):
+        with open(self.filename, mode='rb') as file:
+            self.assertIsNone(self.encode({'video': file}))
+
+    def test_body_is_read_in_chunks(self):
+        with MediaBuffers() as buffers, buffers.open(self.filename) as stream:
+            tracemalloc.start()
+            try:
+                with self.encode({'video': stream}) as body:
+                    size = 0
+                    while chunk := body.read(16384):
+                        size += len(chunk)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+        self.assertGreater(size, 4 * 1024 * 1024)
+        self.assertLess(peak, 256 * 1024)
+
+    def test_session_sends_streamed_body(self):
+        sent = {}
+        session = StreamingSession()
+        session.send = MagicMock(side_effect=lambda request, **kwargs: sent.update(
+            body=request.body, length=len(request.body), headers=request.headers,
+        ))
+
+        with MediaBuffers() as buffers, buffers.open(self.filename) as stream:
+            session.request('POST', 'https://example.com', files={'video': stream})
+
+        self.assertIsInstance(sent['body'], MultipartBody)
+        self.assertTrue(sent['body'].closed)
+        self.assertTrue(sent['headers']['Content-Type'].startswith('multipart/form-data; boundary='))
+        self.assertEqual(int(sent['headers']['Content-Length']), sent['length'])
@@ -0,0 +1,92 @@
+from os import path
+from os import utime
+from tempfile import TemporaryDirectory
+from threading import Thread
+from time import time
+
+from django.core.files import locks
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.files.storage import InMemoryStorage
+from django.test import SimpleTestCase
+
+from ..cache import CACHE_LOCK
+from ..cache import MediaCache
+
+
+class MediaCacheTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.storage = InMemoryStorage()
+        self.cache = MediaCache(self.directory.name, 10, storage=self.storage)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_remote_file_is_downloaded_once(self):
+        name = self.storage.save('voice.mp3', ContentFile(b'voice'))
+
+        filename = self.cache.get_path(name)
+        self.storage.delete(name)
+
+        self.assertEqual(self.cache.get_path(name), filename)
+        with open(filename, mode='rb') as file:
+            self.assertEqual(file.read(), b'voice')
+
+    def test_least_recently_used_file_is_evicted(self):
+        first = self.cache.get_path(self.storage.save('first.txt', ContentFile(b'12345')))
+        second = self.cache.get_path(self.storage.save('second.txt', ContentFile(b'12345')))
+        utime(first, (0, 0))
+        utime(second, (1, 1))
+
+        self.cache.get_path('first.txt')
+        third = self.cache.get_path(self.storage.save('third.txt', ContentFile(b'12345')))
+
+        self.assertTrue(path.exists(first))
+        self.assertFalse(path.exists(second))
+        self.assertTrue(path.exists(third))
+
+    def test_recently_used_file_is_not_evicted(self):
+        first = self.cache.get_path(self.storage.save('first.txt', ContentFile(b'12345')))
+        second = self.cache.get_path(self.storage.save('second.txt', ContentFile(b'12345')))
+        utime(first, (time() - 5, time() - 5))
+        utime(second, (0, 0))
+
+        third = self.cache.get_path(self.storage.save('third.txt', ContentFile(b'12345')))
+
+        self.assertTrue(path.exists(first))
+        self.assertFalse(path.exists(second))
+        self.assertTrue(path.exists(third))
+
+    def test_eviction_waits_for_other_processes(self):
+        first = self.cache.get_path(self.storage.save('first.txt', ContentFile(b'12345')))
+        second = self.cache.get_path(self.storage.save('second.txt', ContentFile(b'123456')))
+        utime(first, (0, 0))
+
+        with open(path.join(self.directory.name, CACHE_LOCK), mode='a') as lock:
+            locks.lock(lock, locks.LOCK_EX)
+            thread = Thread(target=self.cache.evict)
+            thread.start()
+            thread.join(0.1)
+            self.assertTrue(path.exists(first))
+
+        thread.join(1)
+        self.assertFalse(path.exists(first))
+        self.assertTrue(path.exists(second))
+
+    def test_find_and_publish(self):
+        filename = path.join(self.directory.name, 'derivative.ogg')
+        with open(filename, mode='wb') as file:
+            file.write(b'ogg')
+
+        self.assertIsNone(self.cache.find('derivatives/ab/derivative.ogg'))
+        self.cache.publish(filename, 'derivatives/ab/derivative.ogg')
+        self.assertTrue(self.storage.exists('derivatives/ab/derivative.ogg'))
+        self.assertIsNotNone(self.cache.find('derivatives/ab/derivative.ogg'))
+
+    def test_local_storage_is_not_copied(self):
+        cache = MediaCache(self.directory.name, 10, storage=FileSystemStorage(location=self.directory.name))
+
+        self.assertEqual(cache.get_path('photo.jpg'), path.join(self.directory.name, 'photo.jpg'))
+        self.assertIsNone(cache.find('photo.jpg'))
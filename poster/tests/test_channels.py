@@ -0,0 +1,152 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.test import override_settings
+
+from discord_bot.types import Channel as DiscordChannel
+
+from ..channels import apply_channel_info
+from ..channels import get_channel_info
+from ..channels import refresh_channels
+from ..channels import sync_guild
+from ..enums import MessengerEnum
+from ..models import Bot
+from ..models import Channel
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    CHANNEL_INFO_TIMEOUT=60,
+)
+class ChannelInfoCacheTestCase(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.bot = Bot(pk=1, bot_type=MessengerEnum.TELEGRAM)
+        self.info = SimpleNamespace(
+            title='News',
+            description='Daily news',
+            username='news',
+            photo=SimpleNamespace(small_file_id='photo-id', small_file_unique_id='photo-unique-id'),
+        )
+
+    @patch('poster.channels.Sender')
+    def test_info_is_fetched_once(self, sender):
+        sender.return_value.get_channel_info.return_value = self.info
+
+        first = get_channel_info(self.bot, -100)
+        second = get_channel_info(self.bot, -100)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first['photo_file_id'], 'photo-id')
+        sender.return_value.get_channel_info.assert_called_once_with(-100)
+
+    @patch('poster.channels.Sender')
+    def test_failed_lookup_is_not_cached(self, sender):
+        sender.return_value.get_channel_info.side_effect = [Exception('Chat not found'), self.info]
+
+        self.assertIsNone(get_channel_info(self.bot, -100))
+        self.assertEqual(get_channel_info(self.bot, -100)['title'], 'News')
+
+    def test_apply_channel_info(self):
+        channel = Channel(channel_type=MessengerEnum.DISCORD)
+        apply_channel_info(channel, {
+            'title': 'general',
+            'description': None,
+            'username': None,
+            'server_id': 42,
+            'photo_file_id': None,
+        })
+
+        self.assertTrue(channel.is_completed)
+        self.assertEqual(channel.title, 'general')
+        self.assertEqual(channel.server_id, 42)
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    CHANNEL_INFO_TIMEOUT=60,
+    CHANNEL_REFRESH_RATE=1000,
+)
+class RefreshChannelsTestCase(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.bot = Bot(pk=1, bot_type=MessengerEnum.TELEGRAM)
+        self.channels = [
+            Channel(pk=1, channel_type=MessengerEnum.TELEGRAM, channel_id=-1, title='News', username='news',
+                    is_completed=True, image_unique_id='photo-1'),
+            Channel(pk=2, channel_type=MessengerEnum.TELEGRAM, channel_id=-2, title='Old', username='sport',
+                    is_completed=True, image_unique_id='photo-2'),
+        ]
+
+    def get_info(self, channel_id):
+        return {
+            -1: SimpleNamespace(title='News', description=None, username='news',
+                                photo=SimpleNamespace(small_file_id='file-1', small_file_unique_id='photo-1')),
+            -2: SimpleNamespace(title='Sport', description=None, username='sport',
+                                photo=SimpleNamespace(small_file_id='file-2', small_file_unique_id='photo-3')),
+        }[channel_id]
+
+    @patch('poster.channels.get_posts_for_channels')
+    @patch('poster.channels.Sender')
+    @patch('poster.channels.Channel.objects')
+    def test_only_changed_fields_and_photos_are_written(self, objects, sender, get_posts_for_channels):
+        objects.filter.return_value.only.return_value = self.channels
+        sender.return_value.get_channel_info.side_effect = self.get_info
+        get_posts_for_channels.return_value.values_list.return_value = [3]
+
+        with patch('poster.channels.transaction', MagicMock()), \
+                patch('poster.channels.invalidate_fragments') as invalidate_fragments:
+            photos = refresh_channels(self.bot, [1, 2])
+
+        self.assertEqual(photos, [(2, 'file-2', 'photo-3')])
+        objects.bulk_update.assert_called_once_with([self.channels[1]], ['title', 'updated_at'])
+        self.assertEqual(self.channels[1].title, 'Sport')
+        self.assertEqual(cache.get('poster:channel-info:1:-2')['title'], 'Sport')
+        get_posts_for_channels.assert_called_once_with([self.channels[1]])
+        invalidate_fragments.assert_called_once_with(3)
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    CHANNEL_INFO_TIMEOUT=60,
+)
+class SyncGuildTestCase(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.bot = Bot(pk=1, bot_type=MessengerEnum.DISCORD, token='token')
+        self.guild = [
+            DiscordChannel({'id': '10', 'type': 0, 'name': 'general', 'guild_id': '7'}),
+            DiscordChannel({'id': '11', 'type': 5, 'name': 'news', 'topic': 'Releases', 'guild_id': '7'}),
+            DiscordChannel({'id': '12', 'type': 2, 'name': 'voice', 'guild_id': '7'}),
+            DiscordChannel({'id': '13', 'type': 4, 'name': 'category', 'guild_id': '7'}),
+        ]
+        self.existing = Channel(pk=5, channel_type=MessengerEnum.DISCORD, channel_id=10, title='old')
+
+    @patch('poster.channels.get_posts_for_channels')
+    @patch('poster.channels.DiscordBot')
+    @patch('poster.channels.Channel.objects')
+    def test_postable_channels_are_created_or_updated(self, objects, discord_bot, get_posts_for_channels):
+        discord_bot.return_value.get_guild_channels.return_value = self.guild
+        objects.filter.return_value = [self.existing]
+        get_posts_for_channels.return_value.values_list.return_value = [3]
+
+        with patch('poster.channels.transaction', MagicMock()), \
+                patch('poster.channels.invalidate_fragments') as invalidate_fragments:
+            self.assertEqual(sync_guild(self.bot, 7), (1, 1))
+
+        discord_bot.return_value.get_guild_channels.assert_called_once_with(7)
+        created = objects.bulk_create.call_args.args[0]
+        self.assertEqual([(channel.channel_id, channel.title, channel.server_id) for channel in created],
+                         [(11, 'news', 7)])
+        self.assertTrue(created[0].is_completed)
+        self.assertEqual(objects.bulk_update.call_args.args[0], [self.existing])
+        self.assertEqual(self.existing.title, 'general')
+        self.assertEqual(cache.get('poster:channel-info:1:11')['description'], 'Releases')
+        get_posts_for_channels.assert_called_once_with([*created, self.existing])
+        invalidate_fragments.assert_called_once_with(3)
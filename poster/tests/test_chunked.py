@@ -0,0 +1,116 @@
+from copy import deepcopy
+from io import BytesIO
+from os import path
+from os import utime
+from tempfile import TemporaryDirectory
+
+from django.test import SimpleTestCase
+from django.test import override_settings
+
+from ..chunked import ChunkedUpload
+from ..chunked import cleanup_chunked_uploads
+from ..exceptions import UploadNotFound
+from ..exceptions import UploadOffsetMismatch
+from ..forms import ChunkedFileInput
+
+
+class ChunkedUploadTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.settings = override_settings(CHUNKED_UPLOAD_ROOT=self.directory.name, CHUNKED_UPLOAD_EXPIRY=60)
+        self.settings.enable()
+
+    def tearDown(self):
+        self.settings.disable()
+        self.directory.cleanup()
+
+    def test_upload_is_assembled_from_chunks(self):
+        upload = ChunkedUpload.create('video.mp4', 10, 'video', 1)
+
+        self.assertEqual(upload.append(0, BytesIO(b'01234'), 5), 5)
+        self.assertFalse(upload.is_complete)
+
+        resumed = ChunkedUpload(upload.token)
+        self.assertEqual(resumed.offset, 5)
+        resumed.append(5, BytesIO(b'56789'), 5)
+
+        file = resumed.as_uploaded_file()
+        self.addCleanup(file.close)
+
+        self.assertTrue(resumed.is_complete)
+        self.assertEqual(file.name, 'video.mp4')
+        self.assertEqual(file.size, 10)
+        self.assertEqual(file.content_type, 'video/mp4')
+        self.assertEqual(file.read(), b'0123456789')
+
+    def test_chunk_with_wrong_offset_is_rejected(self):
+        upload = ChunkedUpload.create('document.pdf', 10, 'document', 1)
+        upload.append(0, BytesIO(b'01234'), 5)
+
+        with self.assertRaises(UploadOffsetMismatch):
+            upload.append(0, BytesIO(b'01234'), 5)
+
+        with self.assertRaises(UploadOffsetMismatch):
+            upload.append(5, BytesIO(b'0123456789'), 10)
+
+        self.assertEqual(upload.offset, 5)
+
+    def test_unknown_token(self):
+        with self.assertRaises(UploadNotFound):
+            ChunkedUpload('not-a-token')
+
+        with self.assertRaises(UploadNotFound):
+            ChunkedUpload('0' * 32)
+
+    def test_expired_uploads_are_removed(self):
+        expired = ChunkedUpload.create('old.pdf', 10, 'document', 1)
+        active = ChunkedUpload.create('new.pdf', 10, 'document', 1)
+        utime(expired.filename, (0, 0))
+
+        cleanup_chunked_uploads()
+
+        self.assertFalse(path.exists(expired.directory))
+        self.assertTrue(path.exists(active.directory))
+
+    def test_widget_uses_completed_upload(self):
+        widget = ChunkedFileInput()
+        widget.user_id = 1
+        upload = ChunkedUpload.create('photo.jpg', 3, 'galleryphoto_set-0-file', 1)
+        data = {'galleryphoto_set-0-file_upload_token': upload.token}
+
+        self.assertIsNone(widget.value_from_datadict(data, {}, 'galleryphoto_set-0-file'))
+        self.assertTrue(widget.value_omitted_from_data(data, {}, 'galleryphoto_set-0-file'))
+
+        upload.append(0, BytesIO(b'jpg'), 3)
+        file = widget.value_from_datadict(data, {}, 'galleryphoto_set-0-file')
+        self.addCleanup(file.close)
+
+        self.assertEqual(file.read(), b'jpg')
+        self.assertFalse(widget.value_omitted_from_data(data, {}, 'galleryphoto_set-0-file'))
+        self.assertIsNone(widget.value_from_datadict(data, {}, 'galleryphoto_set-1-file'))
+
+    def test_widget_ignores_upload_of_another_user(self):
+        upload = ChunkedUpload.create('photo.jpg', 3, 'photo', 1)
+        upload.append(0, BytesIO(b'jpg'), 3)
+        data = {'photo_upload_token': upload.token}
+
+        self.assertIsNone(ChunkedFileInput().value_from_datadict(data, {}, 'photo'))
+
+        widget = ChunkedFileInput()
+        widget.user_id = 2
+        self.assertIsNone(widget.value_from_datadict(data, {}, 'photo'))
+        self.assertTrue(widget.value_omitted_from_data(data, {}, 'photo'))
+
+    def test_widget_reuses_and_closes_upload_file(self):
+        upload = ChunkedUpload.create('photo.jpg', 3, 'photo', 1)
+        upload.append(0, BytesIO(b'jpg'), 3)
+        data = {'photo_upload_token': upload.token}
+        widget = deepcopy(ChunkedFileInput())
+        widget.user_id = 1
+
+        file = widget.value_from_datadict(data, {}, 'photo')
+        self.assertIs(widget.value_from_datadict(data, {}, 'photo'), file)
+
+        widget.close_uploads()
+        self.assertTrue(file.closed)
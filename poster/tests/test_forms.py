@@ -1,11 +1,15 @@
 from django.forms import ValidationError
+from django.test import SimpleTestCase
 from django.test import TestCase
 
 from telebot.apihelper import ApiTelegramException
 
 from unittest.mock import patch
 
+from poster.enums import PostTypeEnum
 from poster.forms import BotAdminForm
+from poster.forms import PostAdminForm
+from poster.models import Post
 
 
 class BotAdminFormTestCase(TestCase):
@@ -59,3 +63,25 @@ class BotAdminFormTestCase(TestCase):
 
         self.assertFalse(form.is_valid())
         self.assertIn('token', form.errors)
+
+
+class PostAdminFormTestCase(SimpleTestCase):
+
+    def clean(self, data, **kwargs):
+        form = PostAdminForm(data=data, instance=Post(post_type=PostTypeEnum.TEXT, **kwargs))
+        form.cleaned_data = {'message': 'Hello', 'channels': [], 'channel_groups': []}
+        form.clean()
+
+    def test_draft_without_targets_is_saved(self):
+        self.clean({'_continue': 'Save'})
+
+    def test_publishing_requires_targets(self):
+        for action in ('_save_and_publish', '_save_and_publish_silently'):
+            with self.subTest(action=action), self.assertRaisesMessage(
+                ValidationError, 'Select channels or channel groups',
+            ):
+                self.clean({action: 'Publish'})
+
+    def test_published_post_requires_targets(self):
+        with self.assertRaisesMessage(ValidationError, 'Select channels or channel groups'):
+            self.clean({}, is_published=True)
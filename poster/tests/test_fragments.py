@@ -0,0 +1,48 @@
+from datetime import datetime
+from datetime import timezone
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.test import override_settings
+
+from ..fragments import get_fragment
+from ..fragments import get_fragment_key
+from ..fragments import prefetch_fragments
+from ..models import Post
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class FragmentCacheTestCase(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post(pk=1, updated_at=datetime(2023, 9, 1, tzinfo=timezone.utc))
+        self.renders = 0
+
+    def render(self):
+        self.renders += 1
+        return '<div class="post-content"></div>'
+
+    def test_fragment_is_rendered_once(self):
+        self.assertEqual(get_fragment(self.post, 'post_content', self.render), '<div class="post-content"></div>')
+        self.assertEqual(get_fragment(self.post, 'post_content', self.render), '<div class="post-content"></div>')
+        self.assertEqual(self.renders, 1)
+
+    def test_update_changes_key(self):
+        get_fragment(self.post, 'post_content', self.render)
+        self.post.updated_at = datetime(2023, 9, 2, tzinfo=timezone.utc)
+        get_fragment(self.post, 'post_content', self.render)
+
+        self.assertEqual(self.renders, 2)
+
+    def test_prefetched_fragments_skip_cache_lookup(self):
+        cache.set(get_fragment_key('post_channels', self.post.pk, self.post.updated_at), 'channel')
+        posts = [self.post, Post(pk=2, updated_at=self.post.updated_at)]
+
+        prefetch_fragments(posts)
+        cache.clear()
+
+        self.assertEqual(get_fragment(posts[0], 'post_channels', self.render), 'channel')
+        self.assertEqual(self.renders, 0)
+        get_fragment(posts[1], 'post_channels', self.render)
+        self.assertEqual(self.renders, 1)
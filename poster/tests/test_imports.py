@@ -0,0 +1,220 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.test import override_settings
+from telebot.apihelper import ApiTelegramException
+
+from discord_bot.exceptions import ApiDiscordException
+
+from ..enums import MessengerEnum
+from ..imports import ChannelRow
+from ..imports import ImportFailure
+from ..imports import RateLimiter
+from ..imports import get_retry_after
+from ..imports import import_channels
+from ..imports import parse_channels
+from ..imports import write_report
+from ..models import Bot
+from ..tasks import import_channels_task
+
+
+class ParseChannelsTestCase(SimpleTestCase):
+
+    def test_csv(self):
+        rows = parse_channels('channel_id,bot,tags\n-100, news_bot ,"a, b"\n-200,,\n', 'channels.csv')
+
+        self.assertEqual(rows, [
+            ChannelRow(row=1, channel_id='-100', bot='news_bot', tags=['a', 'b']),
+            ChannelRow(row=2, channel_id='-200', bot='', tags=[]),
+        ])
+
+    def test_json(self):
+        rows = parse_channels('[-100, {"channel_id": -200, "bot": 3, "tags": ["a"]}]', 'channels.JSON')
+
+        self.assertEqual(rows, [
+            ChannelRow(row=1, channel_id='-100', bot='', tags=[]),
+            ChannelRow(row=2, channel_id='-200', bot='3', tags=['a']),
+        ])
+
+
+class RateLimiterTestCase(SimpleTestCase):
+
+    @patch('poster.imports.sleep')
+    @patch('poster.imports.monotonic', return_value=10.0)
+    def test_calls_are_spaced(self, monotonic, sleep):
+        limiter = RateLimiter(4)
+        limiter.wait()
+        limiter.wait()
+        limiter.wait()
+
+        self.assertEqual([call.args[0] for call in sleep.call_args_list], [0.25, 0.5])
+
+    @patch('poster.imports.sleep')
+    @patch('poster.imports.monotonic', return_value=10.0)
+    def test_pause_delays_next_call(self, monotonic, sleep):
+        limiter = RateLimiter(4)
+        limiter.pause(3)
+        limiter.wait()
+
+        sleep.assert_called_once_with(3.0)
+
+
+class RetryAfterTestCase(SimpleTestCase):
+
+    def test_telegram(self):
+        exception = ApiTelegramException('getChat', None, {
+            'error_code': 429,
+            'description': 'Too Many Requests: retry after 5',
+            'parameters': {'retry_after': 5},
+        })
+
+        self.assertEqual(get_retry_after(exception), 5.0)
+
+    def test_discord(self):
+        exception = ApiDiscordException('{"message": "You are being rate limited.", "retry_after": 0.5}', 429)
+
+        self.assertEqual(get_retry_after(exception), 0.5)
+
+    def test_other_errors_are_not_retried(self):
+        self.assertIsNone(get_retry_after(ApiDiscordException('{"message": "Missing Access"}', 403)))
+        self.assertIsNone(get_retry_after(ValueError()))
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    CHANNEL_IMPORT_RATE=1000,
+    CHANNEL_IMPORT_WORKERS=4,
+    CHANNEL_INFO_TIMEOUT=60,
+)
+class ImportChannelsTestCase(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.bot = Bot(pk=1, bot_type=MessengerEnum.TELEGRAM, username='news_bot')
+        self.info = {
+            'title': 'News',
+            'description': None,
+            'username': 'news',
+            'server_id': None,
+            'photo_file_id': 'file-id',
+            'photo_unique_id': 'unique-id',
+        }
+
+    def get_info(self, bot, channel_id):
+        return self.info if channel_id == -100 else None
+
+    def set_channels(self, objects, existing, inserted):
+        objects.filter.side_effect = [
+            MagicMock(**{'values_list.return_value': existing}),
+            MagicMock(**{'values_list.return_value': inserted}),
+        ]
+
+    @patch('poster.imports.Bot.objects')
+    @patch('poster.imports.Channel.objects')
+    def test_import(self, objects, bots):
+        bots.filter.return_value = [self.bot]
+        self.set_channels(objects, [(MessengerEnum.TELEGRAM, -300)], [(MessengerEnum.TELEGRAM, -100, 9)])
+        rows = [
+            ChannelRow(row=1, channel_id='-100', bot='news_bot', tags=['news']),
+            ChannelRow(row=2, channel_id='-200', bot='', tags=[]),
+            ChannelRow(row=3, channel_id='-300', bot='', tags=[]),
+            ChannelRow(row=4, channel_id='id', bot='', tags=[]),
+            ChannelRow(row=5, channel_id='-100', bot='', tags=[]),
+            ChannelRow(row=6, channel_id='-400', bot='other_bot', tags=[]),
+        ]
+
+        with patch('poster.imports.request_channel_info', side_effect=self.get_info) as request_channel_info:
+            result = import_channels(rows, self.bot)
+
+        self.assertEqual(request_channel_info.call_count, 2)
+        self.assertEqual(len(result.created), 1)
+        self.assertTrue(result.created[0].is_completed)
+        self.assertEqual(result.created[0].tags, ['news'])
+        self.assertTrue(objects.bulk_create.call_args.kwargs['ignore_conflicts'])
+        self.assertEqual(result.skipped, 2)
+        self.assertEqual(result.failures, [
+            ImportFailure(2, '-200', 'Channel not found or bot has no access'),
+            ImportFailure(4, 'id', 'Invalid channel id'),
+            ImportFailure(6, '-400', 'Bot other_bot not found'),
+        ])
+        self.assertEqual(result.photos, [(9, 'file-id', 'unique-id')])
+
+    @patch('poster.imports.Bot.objects', MagicMock())
+    @patch('poster.imports.Channel.objects')
+    def test_conflicting_channel_is_reported(self, objects):
+        self.set_channels(objects, [], [])
+        rows = [ChannelRow(row=1, channel_id='-100', bot='', tags=[])]
+
+        with patch('poster.imports.request_channel_info', side_effect=self.get_info):
+            result = import_channels(rows, self.bot)
+
+        self.assertEqual(result.created, [])
+        self.assertEqual(result.photos, [])
+        self.assertEqual(result.failures, [ImportFailure(1, '-100', 'Channel was added while importing')])
+
+    @patch('poster.imports.Bot.objects', MagicMock())
+    @patch('poster.imports.Channel.objects')
+    def test_api_error_is_reported(self, objects):
+        objects.filter.return_value.values_list.return_value = []
+        rows = [ChannelRow(row=1, channel_id='-100', bot='', tags=[])]
+
+        with patch('poster.imports.request_channel_info', side_effect=ApiDiscordException('Missing Access', 403)):
+            result = import_channels(rows, self.bot)
+
+        self.assertEqual(result.failures, [ImportFailure(1, '-100', 'Missing Access')])
+
+    @patch('poster.imports.sleep')
+    @patch('poster.imports.Bot.objects', MagicMock())
+    @patch('poster.imports.Channel.objects')
+    def test_rate_limited_lookup_is_retried(self, objects, sleep):
+        self.set_channels(objects, [], [(MessengerEnum.TELEGRAM, -100, 9)])
+        rows = [ChannelRow(row=1, channel_id='-100', bot='', tags=[])]
+        rate_limited = ApiTelegramException('getChat', None, {
+            'error_code': 429,
+            'description': 'Too Many Requests: retry after 2',
+            'parameters': {'retry_after': 2},
+        })
+
+        with patch('poster.imports.request_channel_info', side_effect=[rate_limited, self.info]):
+            result = import_channels(rows, self.bot)
+
+        self.assertEqual(result.failures, [])
+        self.assertEqual(len(result.created), 1)
+        self.assertGreater(sleep.call_args.args[0], 1)
+
+    def test_report(self):
+        report = write_report([ImportFailure(2, '-200', 'Invalid channel id')])
+
+        self.assertEqual(report.splitlines(), ['row,channel_id,error', '2,-200,Invalid channel id'])
+
+
+class ImportChannelsTaskTestCase(SimpleTestCase):
+
+    @patch('poster.tasks.import_channels')
+    @patch('poster.tasks.save_report')
+    @patch('poster.tasks.default_storage')
+    def test_unreadable_file_is_reported_and_removed(self, storage, save_report, import_channels):
+        storage.open.return_value.__enter__.return_value = SimpleNamespace(read=lambda: b'[{"channel_id": ')
+
+        with self.assertLogs('poster.tasks', 'ERROR'):
+            import_channels_task('imports/channels/a.json', 'imports/channels/a-failures.csv')
+
+        import_channels.assert_not_called()
+        storage.delete.assert_called_once_with('imports/channels/a.json')
+        report, failures = save_report.call_args.args
+        self.assertEqual(report, 'imports/channels/a-failures.csv')
+        self.assertEqual(len(failures), 1)
+        self.assertTrue(failures[0].error.startswith('Unable to read the file'))
+
+    @patch('poster.tasks.import_channels', side_effect=RuntimeError('database is gone'))
+    @patch('poster.tasks.default_storage')
+    def test_upload_is_removed_when_import_fails(self, storage, import_channels):
+        storage.open.return_value.__enter__.return_value = SimpleNamespace(read=lambda: b'channel_id\n-100\n')
+
+        with self.assertRaises(RuntimeError):
+            import_channels_task('imports/channels/a.csv', 'imports/channels/a-failures.csv')
+
+        storage.delete.assert_called_once_with('imports/channels/a.csv')
@@ -0,0 +1,66 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import TestCase
+
+from ..enums import DeliveryStatusEnum
+from ..enums import MessengerEnum
+from ..enums import TaskTypeEnum
+from ..models import Bot
+from ..models import Channel
+from ..models import Delivery
+from ..models import GalleryDocument
+from ..models import GalleryPhoto
+from ..models import Task
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Query plans are checked on PostgreSQL only')
+class IndexPlanTestCase(TestCase):
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertIndexScan(self, queryset: QuerySet, name: str) -> None:
+        plan = queryset.explain()
+        self.assertNotIn('Seq Scan', plan)
+        self.assertIn(name, plan)
+
+    def test_bots_by_type(self):
+        self.assertIndexScan(Bot.objects.filter(bot_type=MessengerEnum.TELEGRAM), 'poster_bot_type_created_idx')
+
+    def test_completed_channels(self):
+        self.assertIndexScan(Channel.objects.filter(is_completed=True), 'poster_channel_completed_idx')
+
+    def test_gallery_documents_by_post(self):
+        self.assertIndexScan(GalleryDocument.objects.filter(post_id=1), 'poster_gallerydoc_post_idx')
+
+    def test_gallery_photos_by_post(self):
+        self.assertIndexScan(GalleryPhoto.objects.filter(post_id=1), 'poster_galleryphoto_post_idx')
+
+    def test_deliveries_by_post(self):
+        self.assertIndexScan(Delivery.objects.filter(post_id=1), 'poster_delivery_post_channel_uniq')
+
+    def test_deliveries_by_status(self):
+        queryset = Delivery.objects.filter(status=DeliveryStatusEnum.FAILED)
+        self.assertIndexScan(queryset, 'poster_deliv_status_sent_idx')
+
+    def test_delivery_by_message_id(self):
+        queryset = Delivery.objects.filter(message_ids__contains=[42])
+        self.assertIndexScan(queryset, 'poster_deliv_message_ids_idx')
+
+    def test_tasks_by_post_and_type(self):
+        # Partition indexes are named after the partition and the indexed columns.
+        queryset = Task.objects.filter(post_id=1, task_type=TaskTypeEnum.CREATE)
+        self.assertIndexScan(queryset, 'post_id_task_type_created_at_idx')
+
+    def test_tasks_by_channel(self):
+        self.assertIndexScan(Task.objects.filter(channel_id=1), 'channel_id_created_at_id_idx')
+
+    def test_channel_search(self):
+        queryset = Channel.objects.filter(title__icontains='news')
+        self.assertIndexScan(queryset, 'poster_channel_title_trgm_idx')
+
+    def test_bot_search(self):
+        self.assertIndexScan(Bot.objects.filter(username__icontains='poster'), 'poster_bot_username_trgm_idx')
@@ -0,0 +1,179 @@
+from io import BytesIO
+from os import path
+from tempfile import TemporaryDirectory
+from subprocess import CalledProcessError
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import SimpleTestCase
+from django.test import override_settings
+from PIL import Image
+
+from ..enums import MessengerEnum
+from ..enums import TranscodeProfileEnum
+from ..exceptions import TranscodeFailed
+from ..media import PHOTO_LIMITS
+from ..media import THUMBNAIL_SIZE
+from ..media import TRANSCODE_PROFILES
+from ..media import _get_thumbnail
+from ..media import find_transcode_failure
+from ..media import find_transcoded
+from ..media import get_photo_for_messenger
+from ..media import get_thumbnail_url
+from ..media import is_photo_compliant
+from ..media import transcode
+from ..utils import render_attachments
+
+
+class PhotoDerivativeTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.settings = override_settings(MEDIA_ROOT=self.directory.name)
+        self.settings.enable()
+
+    def tearDown(self):
+        self.settings.disable()
+        self.directory.cleanup()
+
+    def create_photo(self, name, size, mode='RGB'):
+        filename = path.join(self.directory.name, name)
+        Image.new(mode, size, 'red').save(filename)
+        return filename
+
+    def test_compliant_photo_is_sent_as_is(self):
+        filename = self.create_photo('small.png', (800, 600))
+
+        self.assertEqual(get_photo_for_messenger(filename, MessengerEnum.TELEGRAM), filename)
+        self.assertEqual(get_photo_for_messenger(filename, MessengerEnum.DISCORD), filename)
+
+    def test_oversized_photo_gets_telegram_derivative(self):
+        filename = self.create_photo('large.png', (8000, 3000))
+
+        derivative = get_photo_for_messenger(filename, MessengerEnum.TELEGRAM)
+
+        self.assertNotEqual(derivative, filename)
+        self.assertTrue(derivative.endswith('.telegram.jpg'))
+        self.assertTrue(is_photo_compliant(derivative, PHOTO_LIMITS[MessengerEnum.TELEGRAM]))
+        self.assertEqual(get_photo_for_messenger(filename, MessengerEnum.TELEGRAM), derivative)
+
+    def test_transparent_photo_keeps_png(self):
+        filename = self.create_photo('alpha.png', (6000, 6000), mode='RGBA')
+
+        derivative = get_photo_for_messenger(filename, MessengerEnum.TELEGRAM)
+
+        self.assertTrue(derivative.endswith('.telegram.png'))
+        with Image.open(derivative) as image:
+            self.assertLessEqual(sum(image.size), 10000)
+            self.assertEqual(image.mode, 'RGBA')
+
+
+@override_settings(FFMPEG_BINARY='ffmpeg', FFMPEG_TIMEOUT=60)
+class TranscodeTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.settings = override_settings(MEDIA_ROOT=self.directory.name)
+        self.settings.enable()
+        self.filename = path.join(self.directory.name, 'voice.mp3')
+        with open(self.filename, mode='wb') as file:
+            file.write(b'ID3 voice')
+
+    def tearDown(self):
+        self.settings.disable()
+        self.directory.cleanup()
+
+    @patch('poster.media.run')
+    def test_transcode_once(self, mocked):
+        def run(command, **kwargs):
+            with open(command[-1], mode='wb') as file:
+                file.write(b'OggS')
+
+        mocked.side_effect = run
+
+        self.assertIsNone(find_transcoded(self.filename, TranscodeProfileEnum.VOICE))
+
+        transcoded = transcode(self.filename, TranscodeProfileEnum.VOICE)
+
+        self.assertTrue(transcoded.endswith('.voice.ogg'))
+        self.assertEqual(find_transcoded(self.filename, TranscodeProfileEnum.VOICE), transcoded)
+        self.assertIn('libopus', mocked.call_args.args[0])
+
+        transcode(self.filename, TranscodeProfileEnum.VOICE)
+        self.assertEqual(mocked.call_count, 1)
+
+    @patch('poster.media.run', side_effect=OSError('ffmpeg not found'))
+    def test_failed_transcode_leaves_no_file(self, mocked):
+        with self.assertRaises(OSError):
+            transcode(self.filename, TranscodeProfileEnum.VIDEO_NOTE)
+
+        self.assertIsNone(find_transcoded(self.filename, TranscodeProfileEnum.VIDEO_NOTE))
+        self.assertIsNone(find_transcode_failure(self.filename, TranscodeProfileEnum.VIDEO_NOTE))
+
+    @patch('poster.media.run', side_effect=CalledProcessError(1, 'ffmpeg', stderr=b'Invalid data found'))
+    def test_rejected_source_is_marked_failed(self, mocked):
+        with self.assertRaises(TranscodeFailed):
+            transcode(self.filename, TranscodeProfileEnum.VIDEO_NOTE)
+
+        self.assertIn('Invalid data found', find_transcode_failure(self.filename, TranscodeProfileEnum.VIDEO_NOTE))
+        with self.assertRaises(TranscodeFailed):
+            transcode(self.filename, TranscodeProfileEnum.VIDEO_NOTE)
+        self.assertEqual(mocked.call_count, 1)
+
+    def test_video_note_dimensions_are_even(self):
+        _, args = TRANSCODE_PROFILES[TranscodeProfileEnum.VIDEO_NOTE]
+        self.assertIn("crop='2*trunc(min(iw,ih)/2)'", args[args.index('-vf') + 1])
+
+
+class ThumbnailTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.settings = override_settings(MEDIA_ROOT=self.directory.name)
+        self.settings.enable()
+        _get_thumbnail.cache_clear()
+
+    def tearDown(self):
+        self.settings.disable()
+        self.directory.cleanup()
+
+    def save_photo(self, name, size):
+        buffer = BytesIO()
+        Image.new('RGB', size, 'red').save(buffer, format='PNG')
+        return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+    def test_thumbnail_is_generated_once(self):
+        name = self.save_photo('large.png', (4000, 3000))
+
+        url = get_thumbnail_url(name)
+        self.assertIn('/thumbnails/', url)
+
+        thumbnail = default_storage.path(url.replace(default_storage.base_url, '', 1))
+        with Image.open(thumbnail) as image:
+            self.assertEqual(image.size, (THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+            self.assertEqual(image.format, 'JPEG')
+
+        _get_thumbnail.cache_clear()
+        self.assertEqual(get_thumbnail_url(name), url)
+        self.assertEqual(len(default_storage.listdir(path.dirname(thumbnail))[1]), 1)
+
+    def test_failed_thumbnail_is_retried(self):
+        name = self.save_photo('photo.png', (1000, 1000))
+
+        with patch('poster.media.make_thumbnail', side_effect=OSError('No space left on device')), \
+                self.assertLogs('poster.media', 'ERROR'):
+            self.assertIsNone(get_thumbnail_url(name))
+
+        self.assertIn('/thumbnails/', get_thumbnail_url(name))
+
+    def test_attachments_use_lazy_thumbnails(self):
+        name = self.save_photo('photo.jpg', (1000, 1000))
+        photo = SimpleNamespace(name=name, url=default_storage.url(name))
+
+        html = render_attachments([photo])
+
+        self.assertIn('loading="lazy"', html)
+        self.assertIn(get_thumbnail_url(name), html)
+        self.assertNotIn(photo.url, html)
@@ -0,0 +1,93 @@
+from importlib import import_module
+from types import SimpleNamespace
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import SimpleTestCase
+from django.test import TransactionTestCase
+
+delivery_migration = import_module('poster.migrations.0008_delivery')
+
+
+class DeliveryMigrationHelpersTestCase(SimpleTestCase):
+
+    def test_chat_title(self):
+        telegram = SimpleNamespace(channel_type='telegram', username='news', title='News')
+        discord = SimpleNamespace(channel_type='discord', username=None, title=None)
+
+        self.assertEqual(delivery_migration.get_chat_title(telegram), '@news')
+        self.assertEqual(delivery_migration.get_chat_title(discord), '')
+
+    def test_message_link(self):
+        telegram = SimpleNamespace(channel_type='telegram', username='news', channel_id=-100)
+        private = SimpleNamespace(channel_type='telegram', username=None, channel_id=-100)
+        discord = SimpleNamespace(channel_type='discord', server_id=7, channel_id=10)
+
+        self.assertEqual(delivery_migration.get_message_link(telegram, 5), 'https://t.me/news/5')
+        self.assertEqual(delivery_migration.get_message_link(private, 5), '')
+        self.assertEqual(delivery_migration.get_message_link(discord, 5), 'https://discord.com/channels/7/10/5')
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Migrations use PostgreSQL-only fields')
+class DeliveryMigrationTestCase(TransactionTestCase):
+    before = [('poster', '0007_alter_task_created_at')]
+    after = [('poster', '0008_delivery')]
+
+    def migrate(self, targets: list):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_messages_are_copied_to_deliveries(self):
+        apps = self.migrate(self.before)
+        Channel = apps.get_model('poster', 'Channel')
+        Post = apps.get_model('poster', 'Post')
+        PostMessage = apps.get_model('poster', 'PostMessage')
+
+        telegram = Channel.objects.create(channel_type='telegram', channel_id=-100, username='news')
+        discord = Channel.objects.create(channel_type='discord', channel_id=10, server_id=7, title='general')
+        post = Post.objects.create(post_type='text')
+        post.messages.add(
+            PostMessage.objects.create(channel=telegram, message_id=5),
+            PostMessage.objects.create(channel=telegram, message_id=6),
+            PostMessage.objects.create(channel=discord, message_id=50),
+            PostMessage.objects.create(channel=None, message_id=1),
+        )
+
+        apps = self.migrate(self.after)
+        Delivery = apps.get_model('poster', 'Delivery')
+        deliveries = {
+            delivery.channel_id: delivery
+            for delivery in Delivery.objects.filter(post_id=post.pk)
+        }
+
+        self.assertEqual(set(deliveries), {telegram.pk, discord.pk})
+        self.assertEqual(deliveries[telegram.pk].message_ids, [5, 6])
+        self.assertEqual(deliveries[telegram.pk].chat_title, '@news')
+        self.assertEqual(deliveries[telegram.pk].permalink, 'https://t.me/news/5')
+        self.assertEqual(deliveries[discord.pk].permalink, 'https://discord.com/channels/7/10/50')
+        self.assertEqual({delivery.status for delivery in deliveries.values()}, {'sent'})
+
+    def test_messages_are_restored_on_reverse(self):
+        apps = self.migrate(self.after)
+        Channel = apps.get_model('poster', 'Channel')
+        Delivery = apps.get_model('poster', 'Delivery')
+        Post = apps.get_model('poster', 'Post')
+
+        channel = Channel.objects.create(channel_type='telegram', channel_id=-100)
+        post = Post.objects.create(post_type='text')
+        Delivery.objects.create(post=post, channel=channel, messenger='telegram', chat_id=-100,
+                                message_ids=[5, 6], status='sent')
+
+        apps = self.migrate(self.before)
+        Post = apps.get_model('poster', 'Post')
+
+        messages = Post.objects.get(pk=post.pk).messages.order_by('message_id')
+        self.assertEqual([(message.channel_id, message.message_id) for message in messages],
+                         [(channel.pk, 5), (channel.pk, 6)])
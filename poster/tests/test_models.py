@@ -1,3 +1,4 @@
+from django.test import SimpleTestCase
 from django.test import TestCase
 from django.db.utils import IntegrityError
 from django.utils.translation import gettext_lazy as _
@@ -9,6 +10,7 @@ from .utils import BOT_INFO
 from .utils import CHANNEL_ID
 from .utils import CHANNEL_INFO
 
+from ..enums import MessengerEnum
 from ..enums import PostTypeEnum
 from ..exceptions import BotNotSetException
 from ..models import Bot
@@ -124,3 +126,23 @@ class PostModelTest(TestCase):
 
     def test_ordering(self):
         self.assertEqual(Post._meta.ordering, ['-updated_at'])
+
+
+class ChannelMessageLinkTest(SimpleTestCase):
+    def test_discord_link(self):
+        channel = Channel(channel_type=MessengerEnum.DISCORD, channel_id=2, server_id=1, title='news')
+
+        self.assertEqual(channel.get_message_link(3), 'https://discord.com/channels/1/2/3')
+        self.assertEqual(channel.chat_title, 'news')
+
+    def test_telegram_link(self):
+        channel = Channel(channel_type=MessengerEnum.TELEGRAM, channel_id=-100, username='news', title='News')
+
+        self.assertEqual(channel.get_message_link(3), 'https://t.me/news/3')
+        self.assertEqual(channel.chat_title, '@news')
+
+    def test_private_telegram_channel_has_no_link(self):
+        channel = Channel(channel_type=MessengerEnum.TELEGRAM, channel_id=-100, title='News')
+
+        self.assertEqual(channel.get_message_link(3), '')
+        self.assertEqual(channel.chat_title, 'News')
@@ -0,0 +1,20 @@
+from datetime import datetime
+from datetime import timezone
+
+from django.test import SimpleTestCase
+
+from ..pagination import decode_cursor
+from ..pagination import encode_cursor
+
+
+class CursorTestCase(SimpleTestCase):
+
+    def test_cursor_round_trip(self):
+        created_at = datetime(2023, 9, 17, 15, 59, 1, 123456, tzinfo=timezone.utc)
+
+        self.assertEqual(decode_cursor(encode_cursor(created_at, 42)), (created_at, 42))
+
+    def test_invalid_cursor_starts_from_first_page(self):
+        self.assertIsNone(decode_cursor(None))
+        self.assertIsNone(decode_cursor('not-a-cursor'))
+        self.assertIsNone(decode_cursor(encode_cursor(datetime(2023, 9, 17), 1)[:-4]))
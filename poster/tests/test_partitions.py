@@ -0,0 +1,87 @@
+from datetime import date
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test import TestCase
+from django.test import override_settings
+
+from ..partitions import add_months
+from ..partitions import create_partition
+from ..partitions import drop_expired_partitions
+from ..partitions import drop_partition
+from ..partitions import get_detached_partitions
+from ..partitions import get_partition_month
+from ..partitions import get_partition_name
+from ..partitions import get_partitions
+from ..partitions import maintain_partitions
+
+
+class PartitionNameTestCase(SimpleTestCase):
+
+    def test_add_months_crosses_year(self):
+        self.assertEqual(add_months(date(2023, 11, 1), 2), date(2024, 1, 1))
+        self.assertEqual(add_months(date(2024, 1, 1), -1), date(2023, 12, 1))
+        self.assertEqual(add_months(date(2023, 9, 1), -12), date(2022, 9, 1))
+
+    def test_partition_name_round_trip(self):
+        name = get_partition_name(date(2023, 9, 1))
+
+        self.assertEqual(name, 'poster_task_y2023m09')
+        self.assertEqual(get_partition_month(name), date(2023, 9, 1))
+
+    def test_default_partition_is_not_monthly(self):
+        self.assertIsNone(get_partition_month('poster_task_default'))
+
+
+class PartitionMaintenanceTestCase(SimpleTestCase):
+
+    def test_maintenance_is_skipped_without_postgres(self):
+        self.assertEqual(maintain_partitions(), [])
+
+    @override_settings(TASK_RETENTION_MONTHS=0)
+    def test_zero_retention_keeps_everything(self):
+        self.assertEqual(drop_expired_partitions(), [])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Task partitions exist on PostgreSQL only')
+class PartitionLifecycleTestCase(TestCase):
+
+    def table_exists(self, name: str) -> bool:
+        return name in connection.introspection.table_names()
+
+    def test_create_and_drop(self):
+        month = date(2000, 1, 1)
+        name = get_partition_name(month)
+
+        create_partition(month)
+        self.assertEqual(get_partitions()[month], name)
+
+        drop_partition(name)
+        self.assertNotIn(month, get_partitions())
+        self.assertFalse(self.table_exists(name))
+
+    @patch('poster.partitions.archive_partition', return_value='archive/tasks/poster_task_y2000m02.csv.gz')
+    def test_archive_runs_while_attached(self, archive_partition):
+        month = date(2000, 2, 1)
+        name = get_partition_name(month)
+        create_partition(month)
+        archive_partition.side_effect = lambda table: self.assertIn(month, get_partitions())
+
+        drop_partition(name, archive=True)
+
+        archive_partition.assert_called_once_with(name)
+        self.assertFalse(self.table_exists(name))
+
+    @override_settings(TASK_RETENTION_MONTHS=1)
+    def test_detached_leftover_is_dropped(self):
+        month = date(2000, 3, 1)
+        name = get_partition_name(month)
+        create_partition(month)
+        with connection.cursor() as cursor:
+            cursor.execute(f'ALTER TABLE poster_task DETACH PARTITION {name}')
+        self.assertEqual(get_detached_partitions(), {month: name})
+
+        self.assertEqual(drop_expired_partitions(archive=False), [name])
+        self.assertFalse(self.table_exists(name))
@@ -0,0 +1,38 @@
+from django.test import SimpleTestCase
+
+from ..enums import MessengerEnum
+from ..enums import PostTypeEnum
+from ..exceptions import PayloadTooLarge
+from ..media import MB
+from ..planner import PayloadLimits
+from ..planner import get_payload_limits
+from ..planner import plan_batches
+
+
+class PlanBatchesTestCase(SimpleTestCase):
+
+    def test_single_batch(self):
+        limits = get_payload_limits(MessengerEnum.TELEGRAM, PostTypeEnum.GALLERY_PHOTOS)
+        self.assertEqual(plan_batches([1, 2, 3], [MB] * 3, limits), [[1, 2, 3]])
+
+    def test_split_by_item_count(self):
+        limits = get_payload_limits(MessengerEnum.TELEGRAM, PostTypeEnum.GALLERY_PHOTOS)
+        items = list(range(21))
+
+        batches = plan_batches(items, [MB] * 21, limits)
+
+        self.assertEqual([len(batch) for batch in batches], [10, 9, 2])
+        self.assertEqual(sum(batches, []), items)
+
+    def test_split_by_batch_size(self):
+        limits = PayloadLimits(max_items=10, max_item_bytes=10 * MB, max_batch_bytes=10 * MB)
+
+        batches = plan_batches(['a', 'b', 'c', 'd'], [6 * MB, 3 * MB, 4 * MB, 1 * MB], limits)
+
+        self.assertEqual(batches, [['a', 'b'], ['c', 'd']])
+
+    def test_too_large_item_is_rejected(self):
+        limits = get_payload_limits(MessengerEnum.TELEGRAM, PostTypeEnum.GALLERY_DOCUMENTS)
+
+        with self.assertRaises(PayloadTooLarge):
+            plan_batches(['a', 'b'], [MB, 51 * MB], limits)
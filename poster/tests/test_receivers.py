@@ -0,0 +1,170 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed
+from django.db.models.signals import post_save
+from django.test import SimpleTestCase
+from django.test import override_settings
+
+from ..enums import TranscodeProfileEnum
+from ..models import Channel
+from ..models import ChannelGroup
+from ..models import GalleryPhoto
+from ..models import Post
+from ..receivers import invalidate_group_channels_fragments
+from ..receivers import post_model_pre_delete
+from ..receivers import related_models_changed
+
+
+@patch('poster.receivers.invalidate_fragments', MagicMock())
+@patch('poster.receivers.make_photo_derivatives_task')
+@patch('poster.receivers.transaction')
+class PhotoDerivativesTestCase(SimpleTestCase):
+
+    def save(self, instance, transaction):
+        transaction.on_commit.reset_mock()
+        post_save.send(type(instance), instance=instance, created=False)
+        for call in transaction.on_commit.call_args_list:
+            call.args[0]()
+
+    def test_derivatives_are_made_after_commit_for_new_photo(self, transaction, make_photo_derivatives_task):
+        post = Post(message='Hello')
+        post.photo = 'photos/a.jpg'
+
+        post_save.send(Post, instance=post, created=True)
+        make_photo_derivatives_task.delay.assert_not_called()
+
+        transaction.on_commit.call_args.args[0]()
+        make_photo_derivatives_task.delay.assert_called_once_with('photos/a.jpg')
+
+    def test_unchanged_photo_is_skipped(self, transaction, make_photo_derivatives_task):
+        post = Post(pk=1, photo='photos/a.jpg')
+
+        self.save(post, transaction)
+        post.photo = 'photos/b.jpg'
+        self.save(post, transaction)
+        self.save(post, transaction)
+
+        make_photo_derivatives_task.delay.assert_called_once_with('photos/b.jpg')
+
+    def test_gallery_photo(self, transaction, make_photo_derivatives_task):
+        photo = GalleryPhoto(pk=1, post_id=1, file='photos/a.jpg')
+
+        self.save(photo, transaction)
+        photo.file = 'photos/b.jpg'
+        self.save(photo, transaction)
+
+        make_photo_derivatives_task.delay.assert_called_once_with('photos/b.jpg')
+
+
+@patch('poster.receivers.invalidate_fragments', MagicMock())
+@patch('poster.receivers.transcode_media_task')
+@patch('poster.receivers.transaction')
+class TranscodeMediaTestCase(SimpleTestCase):
+
+    def test_only_replaced_media_is_transcoded_after_commit(self, transaction, transcode_media_task):
+        post = Post(pk=1, voice='voices/a.ogg', video='videos/a.mp4')
+        post.video = 'videos/b.mp4'
+
+        post_save.send(Post, instance=post, created=False)
+        transcode_media_task.delay.assert_not_called()
+
+        for call in transaction.on_commit.call_args_list:
+            call.args[0]()
+        transcode_media_task.delay.assert_called_once_with('videos/b.mp4', TranscodeProfileEnum.VIDEO_NOTE)
+
+
+class PostPreDeleteTestCase(SimpleTestCase):
+
+    @patch('poster.receivers.delete_delivery_task')
+    @patch('poster.receivers.transaction')
+    def test_deliveries_are_deleted_after_commit(self, transaction, delete_delivery_task):
+        instance = MagicMock(spec=Post)
+        instance.deliveries.exclude.return_value.values_list.return_value = [3, 4]
+
+        post_model_pre_delete(Post, instance)
+
+        instance.deliveries.filter.return_value.delete.assert_called_once()
+        delete_delivery_task.delay.assert_not_called()
+
+        for call in transaction.on_commit.call_args_list:
+            call.args[0]()
+        self.assertEqual([call.args for call in delete_delivery_task.delay.call_args_list], [(3,), (4,)])
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    POST_SEND_QUEUE_TIMEOUT=60,
+)
+@patch('poster.tasks.send_post_task')
+@patch('poster.tasks.transaction')
+class RelatedModelsChangedTestCase(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def commit(self, transaction) -> None:
+        for call in transaction.on_commit.call_args_list:
+            call.args[0]()
+
+    def test_adding_group_sends_post(self, transaction, send_post_task):
+        post = Post(pk=1, is_silent=True)
+
+        related_models_changed(Post.channel_groups.through, post, 'post_add', reverse=False, pk_set={2})
+        send_post_task.delay.assert_not_called()
+        self.commit(transaction)
+
+        send_post_task.delay.assert_called_once_with(1, disable_notification=True)
+
+    @patch('poster.receivers.invalidate_fragments')
+    def test_channels_and_groups_in_one_save_send_once(self, invalidate_fragments, transaction, send_post_task):
+        post = Post(pk=1, is_silent=False)
+
+        for through in (Post.channels.through, Post.channel_groups.through):
+            m2m_changed.send(through, instance=post, action='post_add', reverse=False, model=Channel,
+                             pk_set={2}, using='default')
+        self.commit(transaction)
+
+        send_post_task.delay.assert_called_once_with(1, disable_notification=False)
+
+    @patch('poster.receivers.Post.objects')
+    def test_adding_posts_to_group_sends_each_post(self, posts, transaction, send_post_task):
+        posts.filter.return_value = [Post(pk=1, is_silent=False), Post(pk=2, is_silent=True)]
+
+        related_models_changed(Post.channel_groups.through, ChannelGroup(pk=3), 'post_add', reverse=True,
+                               pk_set={1, 2})
+        self.commit(transaction)
+
+        posts.filter.assert_called_once_with(pk__in={1, 2})
+        self.assertEqual([call.args for call in send_post_task.delay.call_args_list], [(1,), (2,)])
+
+    def test_removing_group_does_not_send(self, transaction, send_post_task):
+        related_models_changed(Post.channel_groups.through, Post(pk=1), 'post_remove', reverse=False, pk_set={2})
+
+        transaction.on_commit.assert_not_called()
+
+
+class GroupChannelsFragmentsTestCase(SimpleTestCase):
+
+    @patch('poster.receivers.invalidate_fragments')
+    @patch('poster.receivers.Post.objects')
+    def test_group_members_change(self, posts, invalidate_fragments):
+        posts.filter.return_value.distinct.return_value.values_list.return_value = [1, 2]
+
+        invalidate_group_channels_fragments(ChannelGroup.channels.through, ChannelGroup(pk=3), 'post_add',
+                                            False, {4})
+
+        posts.filter.assert_called_once_with(channel_groups__in=[3])
+        invalidate_fragments.assert_called_once_with(1, 2)
+
+    @patch('poster.receivers.invalidate_fragments')
+    @patch('poster.receivers.Post.objects')
+    def test_channel_groups_change(self, posts, invalidate_fragments):
+        posts.filter.return_value.distinct.return_value.values_list.return_value = [1]
+
+        invalidate_group_channels_fragments(ChannelGroup.channels.through, Channel(pk=4), 'post_remove',
+                                            True, {3, 5})
+
+        posts.filter.assert_called_once_with(channel_groups__in=[3, 5])
+        invalidate_fragments.assert_called_once_with(1)
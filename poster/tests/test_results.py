@@ -0,0 +1,55 @@
+from time import monotonic
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from telebot.apihelper import ApiTelegramException
+
+from discord_bot.exceptions import ApiDiscordException
+
+from ..enums import TaskStatusEnum
+from ..results import ERROR_MESSAGE_LENGTH
+from ..results import make_result
+
+
+class ResultTestCase(SimpleTestCase):
+
+    def test_success_result_keeps_message_ids(self):
+        messages = [SimpleNamespace(message_id=1), SimpleNamespace(message_id=2)]
+
+        result = make_result(monotonic(), messages, bytes_sent=1024)
+
+        self.assertEqual(result['status'], TaskStatusEnum.SUCCESS)
+        self.assertEqual(result['message_ids'], [1, 2])
+        self.assertEqual(result['bytes_sent'], 1024)
+        self.assertIsNone(result['error_code'])
+        self.assertIsNone(result['error'])
+        self.assertGreaterEqual(result['latency_ms'], 0)
+
+    def test_single_message_and_plain_responses(self):
+        self.assertEqual(make_result(monotonic(), SimpleNamespace(message_id=7))['message_ids'], [7])
+        self.assertEqual(make_result(monotonic(), True)['message_ids'], [])
+        self.assertEqual(make_result(monotonic(), {'deleted': True})['message_ids'], [])
+
+    def test_telegram_error_code(self):
+        exception = ApiTelegramException('sendMessage', None, {'error_code': 403, 'description': 'Forbidden'})
+
+        result = make_result(monotonic(), exception=exception)
+
+        self.assertEqual(result['status'], TaskStatusEnum.FAIL)
+        self.assertEqual(result['error_code'], 403)
+        self.assertEqual(result['error'], 'Forbidden')
+
+    def test_discord_error_is_truncated(self):
+        exception = ApiDiscordException('x' * 1000, 429)
+
+        result = make_result(monotonic(), exception=exception)
+
+        self.assertEqual(result['error_code'], 429)
+        self.assertEqual(len(result['error']), ERROR_MESSAGE_LENGTH)
+
+    def test_explicit_status(self):
+        result = make_result(monotonic(), status=TaskStatusEnum.FAIL)
+
+        self.assertEqual(result['status'], TaskStatusEnum.FAIL)
+        self.assertIsNone(result['error'])
@@ -0,0 +1,57 @@
+from os import path
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from ..enums import MessengerEnum
+from ..models import Bot
+from ..models import GalleryDocument
+from ..sender import TelegramSender
+
+
+@patch('poster.sender.TelegramBot')
+class TelegramDocumentNameTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.cached = path.join(self.directory.name, '3fa9c1.pdf')
+        with open(self.cached, mode='wb') as file:
+            file.write(b'%PDF-1.4 content')
+
+        self.cache = patch('poster.sender.media_cache', SimpleNamespace(get_path=lambda name: self.cached))
+        self.cache.start()
+        self.bot = Bot(pk=1, bot_type=MessengerEnum.TELEGRAM, token='token')
+
+    def tearDown(self):
+        self.cache.stop()
+        self.directory.cleanup()
+
+    def test_document_keeps_original_name(self, telegram_bot):
+        TelegramSender(self.bot)._send_document(-100, 'documents/Отчёт 2023.pdf', caption='Report')
+
+        kwargs = telegram_bot.return_value.send_document.call_args.kwargs
+        self.assertEqual(kwargs['visible_file_name'], 'Отчёт 2023.pdf')
+
+    def test_gallery_documents_keep_original_names(self, telegram_bot):
+        documents = [
+            (GalleryDocument(file='documents/first.pdf', caption='First'), self.cached),
+            (GalleryDocument(file='documents/second.pdf', caption='Second'), self.cached),
+        ]
+
+        TelegramSender(self.bot)._send_gallery_documents_batch(-100, documents)
+
+        files = telegram_bot.return_value.send_media_group.call_args.args[1]
+        self.assertEqual([media.media[0] for media in files], ['first.pdf', 'second.pdf'])
+
+    def test_bytes_are_counted_after_successful_send(self, telegram_bot):
+        sender = TelegramSender(self.bot)
+        telegram_bot.return_value.send_document.side_effect = [Exception('Request timed out'), None]
+
+        with self.assertRaises(Exception):
+            sender._send_document(-100, 'documents/report.pdf')
+        self.assertEqual(sender.bytes_sent, 0)
+
+        sender._send_document(-100, 'documents/report.pdf')
+        self.assertEqual(sender.bytes_sent, len(b'%PDF-1.4 content'))
@@ -0,0 +1,82 @@
+from os import path
+from tempfile import TemporaryDirectory
+from threading import Thread
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+
+from ..enums import StorageLinkEnum
+from ..storage import ContentAddressedStorage
+
+
+class ContentAddressedStorageTestCase(SimpleTestCase):
+    link_mode = StorageLinkEnum.HARDLINK
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.storage = ContentAddressedStorage(location=self.directory.name, link_mode=self.link_mode)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def get_blob(self, name):
+        return self.storage._get_blob_path(self.storage.get_content_key(name))
+
+    def test_same_content_is_stored_once(self):
+        first = self.storage.save('logo.png', ContentFile(b'logo'))
+        second = self.storage.save('logo.png', ContentFile(b'logo'))
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.storage.get_content_key(first), self.storage.get_content_key(second))
+        self.assertEqual(self.storage.get_references(first), 2)
+        with self.storage.open(second) as file:
+            self.assertEqual(file.read(), b'logo')
+
+    def test_blob_is_removed_with_last_reference(self):
+        first = self.storage.save('report.pdf', ContentFile(b'report'))
+        second = self.storage.save('copy.pdf', ContentFile(b'report'))
+        blob = self.get_blob(first)
+
+        self.storage.delete(first)
+        self.assertTrue(path.exists(blob))
+        self.assertEqual(self.storage.get_references(second), 1)
+
+        self.storage.delete(second)
+        self.assertFalse(path.exists(blob))
+        self.assertFalse(self.storage.exists(second))
+
+    def test_different_content_gets_different_keys(self):
+        first = self.storage.save('a.txt', ContentFile(b'a'))
+        second = self.storage.save('b.txt', ContentFile(b'b'))
+
+        self.assertNotEqual(self.storage.get_content_key(first), self.storage.get_content_key(second))
+
+    def test_delete_waits_for_blob_lock(self):
+        name = self.storage.save('logo.png', ContentFile(b'logo'))
+        blob = self.get_blob(name)
+
+        with self.storage._lock_blob(blob):
+            thread = Thread(target=self.storage.delete, args=(name,))
+            thread.start()
+            thread.join(0.1)
+            self.assertTrue(self.storage.exists(name))
+
+        thread.join(1)
+        self.assertFalse(self.storage.exists(name))
+        self.assertFalse(path.exists(blob))
+
+    def test_concurrent_deletes_remove_blob(self):
+        names = [self.storage.save('logo.png', ContentFile(b'logo')) for _ in range(3)]
+        blob = self.get_blob(names[0])
+
+        threads = [Thread(target=self.storage.delete, args=(name,)) for name in names]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertFalse(path.exists(blob))
+
+
+class SymlinkContentAddressedStorageTestCase(ContentAddressedStorageTestCase):
+    link_mode = StorageLinkEnum.SYMLINK
@@ -0,0 +1,93 @@
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.db import connection
+from django.db.models import Q
+from django.test import SimpleTestCase
+from django.test import TestCase
+
+from ..enums import DeliveryStatusEnum
+from ..enums import MessengerEnum
+from ..enums import PostTypeEnum
+from ..models import Bot
+from ..models import Channel
+from ..models import ChannelGroup
+from ..models import Delivery
+from ..models import Post
+from ..targets import get_posts_for_channels
+from ..targets import get_target_filter
+from ..targets import resolve_channels
+
+
+class ChannelGroupFilterTestCase(SimpleTestCase):
+
+    def test_rules_are_combined(self):
+        group = ChannelGroup(name='news', messenger=MessengerEnum.TELEGRAM, bot_id=3, tag='news')
+
+        self.assertEqual(
+            group.get_channel_filter(),
+            Q(channel_type=MessengerEnum.TELEGRAM) & Q(bot_id=3) & Q(tags__contains=['news']),
+        )
+
+    def test_group_without_rules_has_no_filter(self):
+        self.assertIsNone(ChannelGroup(name='hand picked').get_channel_filter())
+
+    def test_rules_match_channel(self):
+        channel = Channel(channel_type=MessengerEnum.TELEGRAM, bot_id=3, tags=['news', 'sport'])
+
+        self.assertTrue(ChannelGroup(messenger=MessengerEnum.TELEGRAM, tag='news').matches_rules(channel))
+        self.assertFalse(ChannelGroup(messenger=MessengerEnum.TELEGRAM, bot_id=4).matches_rules(channel))
+        self.assertFalse(ChannelGroup(tag='weather').matches_rules(channel))
+        self.assertFalse(ChannelGroup(name='hand picked').matches_rules(channel))
+
+    @patch('poster.targets.Post.objects')
+    @patch('poster.targets.ChannelGroup.objects')
+    def test_posts_for_channels_include_groups_and_rules(self, groups, posts):
+        channels = [Channel(pk=1, channel_type=MessengerEnum.TELEGRAM, tags=['news'])]
+        groups.only.return_value = [ChannelGroup(pk=7, tag='news'), ChannelGroup(pk=8, tag='weather')]
+
+        get_posts_for_channels(channels)
+
+        posts.filter.assert_called_once_with(
+            Q(channels__in=channels) | Q(channel_groups__channels__in=channels) | Q(channel_groups__in=[7]),
+        )
+
+    def test_target_filter_unions_direct_channels_members_and_rules(self):
+        query = get_target_filter(Post(pk=1))
+
+        self.assertEqual(query.connector, Q.OR)
+        self.assertEqual(len(query.children), 3)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Channel tags are stored in a PostgreSQL array')
+class ResolveChannelsTestCase(TestCase):
+
+    def create_channel(self, channel_id: int, **kwargs) -> Channel:
+        return Channel.objects.create(channel_id=channel_id, is_completed=True, **kwargs)
+
+    def test_direct_member_and_rule_channels_minus_delivered(self):
+        with patch('poster.receivers.Sender'):
+            bot = Bot.objects.create(bot_type=MessengerEnum.TELEGRAM, username='news_bot')
+        direct = self.create_channel(-1, channel_type=MessengerEnum.TELEGRAM, bot=bot)
+        member = self.create_channel(-2, channel_type=MessengerEnum.TELEGRAM, bot=bot)
+        tagged = self.create_channel(-3, channel_type=MessengerEnum.TELEGRAM, bot=bot, tags=['news'])
+        delivered = self.create_channel(-4, channel_type=MessengerEnum.TELEGRAM, bot=bot, tags=['news'])
+        self.create_channel(-5, channel_type=MessengerEnum.DISCORD, tags=['news'])
+        self.create_channel(-6, channel_type=MessengerEnum.TELEGRAM, bot=bot, tags=['sport'])
+
+        picked = ChannelGroup.objects.create(name='picked')
+        picked.channels.add(member)
+        rules = ChannelGroup.objects.create(name='news', messenger=MessengerEnum.TELEGRAM, tag='news')
+
+        with patch('poster.tasks.send_post_task'):
+            post = Post.objects.create(post_type=PostTypeEnum.TEXT, message='News')
+            post.channels.add(direct)
+            post.channel_groups.add(picked, rules)
+        Delivery.objects.create(post=post, channel=delivered, messenger=MessengerEnum.TELEGRAM, chat_id=-4,
+                                message_ids=[1], status=DeliveryStatusEnum.SENT)
+
+        with self.assertNumQueries(1):
+            channels = list(resolve_channels(post))
+
+        self.assertEqual(channels, [direct, member, tagged])
+        self.assertEqual(list(resolve_channels(post, pending=False)), [direct, member, tagged, delivered])
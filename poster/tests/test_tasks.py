@@ -0,0 +1,174 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from ..enums import DeliveryStatusEnum
+from ..enums import MessengerEnum
+from ..enums import TaskStatusEnum
+from ..enums import TaskTypeEnum
+from ..exceptions import ChannelNotResolved
+from ..models import Bot
+from ..models import Channel
+from ..models import Delivery
+from ..models import Post
+from ..tasks import delete_delivery
+from ..tasks import make_delivery
+from ..tasks import resolve_channel_task
+from ..tasks import save_deliveries
+from ..tasks import send_post_task
+
+
+class RecordDeliveryTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.post = Post(pk=1)
+        self.channel = Channel(pk=2, channel_type=MessengerEnum.TELEGRAM, channel_id=-100, username='news')
+
+    def record(self, delivery: Delivery | None, message_ids: list, exception: BaseException | None = None):
+        return make_delivery(self.post, self.channel, message_ids, exception, delivery)
+
+    def test_new_delivery(self):
+        delivery = self.record(None, ['10', 11])
+
+        self.assertEqual((delivery.post, delivery.channel), (self.post, self.channel))
+        self.assertEqual(delivery.status, DeliveryStatusEnum.SENT)
+        self.assertEqual(delivery.message_ids, [10, 11])
+        self.assertEqual(delivery.chat_title, '@news')
+        self.assertEqual(delivery.permalink, 'https://t.me/news/10')
+        self.assertIsNotNone(delivery.sent_at)
+
+    def test_resend_appends_and_keeps_partial(self):
+        delivery = self.record(
+            Delivery(status=DeliveryStatusEnum.SENT, message_ids=[10]),
+            [12],
+            Exception('Flood control'),
+        )
+
+        self.assertEqual(delivery.status, DeliveryStatusEnum.PARTIAL)
+        self.assertEqual(delivery.message_ids, [10, 12])
+
+    def test_failure_keeps_sent_messages(self):
+        delivery = self.record(Delivery(status=DeliveryStatusEnum.SENT, message_ids=[10]), [], Exception())
+
+        self.assertEqual(delivery.status, DeliveryStatusEnum.SENT)
+        self.assertEqual(delivery.permalink, 'https://t.me/news/10')
+
+    def test_resend_after_delete_starts_over(self):
+        delivery = self.record(Delivery(status=DeliveryStatusEnum.DELETED, message_ids=[10]), [20])
+
+        self.assertEqual(delivery.message_ids, [20])
+        self.assertEqual(delivery.status, DeliveryStatusEnum.SENT)
+
+    @patch('poster.tasks.Delivery.objects')
+    def test_deliveries_are_saved_in_one_upsert(self, objects):
+        deliveries = [self.record(None, [10]), self.record(Delivery(pk=3, status=DeliveryStatusEnum.FAILED), [])]
+
+        save_deliveries(deliveries)
+        save_deliveries([])
+
+        objects.bulk_create.assert_called_once()
+        self.assertEqual(objects.bulk_create.call_args.args[0], deliveries)
+        self.assertEqual(objects.bulk_create.call_args.kwargs['unique_fields'], ['post', 'channel'])
+        self.assertTrue(objects.bulk_create.call_args.kwargs['update_conflicts'])
+
+
+class DeleteDeliveryTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.task = SimpleNamespace(request=SimpleNamespace(id='task-id'))
+        self.channel = Channel(pk=2, channel_type=MessengerEnum.TELEGRAM, channel_id=-100)
+
+    @patch('poster.tasks.audit_log')
+    @patch('poster.tasks.Sender')
+    def test_delivery_of_deleted_post_is_removed(self, sender, audit_log):
+        sender.return_value.delete_message.return_value = {'deleted': True}
+        delivery = Delivery(pk=3, post=None, channel=self.channel, chat_id=-100, message_ids=[10, 11])
+
+        with patch.object(Delivery, 'delete') as delete, patch.object(Delivery, 'save') as save:
+            delete_delivery(self.task, delivery)
+
+        delete.assert_called_once()
+        save.assert_not_called()
+        self.assertEqual([task.post_id for task in (call.args[0] for call in audit_log.push.call_args_list)],
+                         [None, None])
+
+    @patch('poster.tasks.audit_log', MagicMock())
+    @patch('poster.tasks.Sender')
+    def test_unpublished_delivery_is_marked_deleted(self, sender):
+        sender.return_value.delete_message.return_value = {'deleted': True}
+        delivery = Delivery(pk=3, post_id=1, channel=self.channel, chat_id=-100, message_ids=[10])
+
+        with patch.object(Delivery, 'save') as save:
+            delete_delivery(self.task, delivery)
+
+        save.assert_called_once()
+        self.assertEqual((delivery.status, delivery.message_ids), (DeliveryStatusEnum.DELETED, []))
+
+
+class SendPostTaskTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.post = Post(pk=1)
+        self.channel = Channel(pk=2, channel_id=-100)
+
+    @patch('poster.tasks.audit_log')
+    @patch('poster.tasks.save_deliveries')
+    @patch('poster.tasks.get_deliveries', return_value={})
+    @patch('poster.tasks.resolve_channels')
+    @patch('poster.tasks.find_transcode_failure', return_value='Transcode failed: Invalid data found')
+    @patch('poster.tasks.find_transcoded', return_value=None)
+    @patch('poster.tasks.Post.objects')
+    def test_failed_transcode_fails_send(self, posts, find_transcoded, find_failure, resolve, get_deliveries,
+                                         save_deliveries, audit_log):
+        posts.filter.return_value.first.return_value = self.post
+        resolve.return_value = [self.channel]
+
+        with patch.object(Post, 'transcode_sources', [('video.mp4', 'video_note')]), \
+                patch('poster.tasks.media_cache', SimpleNamespace(get_path=lambda name: name)), \
+                patch('poster.tasks.transcode_media_task') as transcode_task:
+            send_post_task(self.post.pk, disable_notification=False)
+
+        transcode_task.delay.assert_not_called()
+        [delivery] = save_deliveries.call_args.args[0]
+        self.assertEqual((delivery.post, delivery.channel), (self.post, self.channel))
+        self.assertEqual((delivery.status, delivery.message_ids), (DeliveryStatusEnum.FAILED, []))
+
+        task = audit_log.push.call_args.args[0]
+        self.assertEqual(task.task_type, TaskTypeEnum.CREATE)
+        self.assertEqual(task.result['status'], TaskStatusEnum.FAIL)
+        self.assertEqual(task.result['error'], 'Transcode failed: Invalid data found')
+
+
+@patch('poster.tasks.get_channel_info', return_value=None)
+@patch('poster.tasks.Channel.objects')
+class ResolveChannelTaskTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.channel = Channel(pk=2, channel_type=MessengerEnum.TELEGRAM, channel_id=-100,
+                               bot=Bot(pk=1, bot_type=MessengerEnum.TELEGRAM))
+
+    def run_task(self, retries: int) -> None:
+        resolve_channel_task.push_request(retries=retries)
+        try:
+            resolve_channel_task.run(self.channel.pk)
+        finally:
+            resolve_channel_task.pop_request()
+
+    def test_unresolved_channel_is_retried_with_backoff(self, objects, get_channel_info):
+        objects.select_related.return_value.filter.return_value.first.return_value = self.channel
+
+        with patch.object(resolve_channel_task, 'retry', return_value=ChannelNotResolved()) as retry:
+            with self.assertRaises(ChannelNotResolved):
+                self.run_task(2)
+
+        self.assertEqual(retry.call_args.kwargs['countdown'], 120)
+
+    def test_warning_after_retries_are_exhausted(self, objects, get_channel_info):
+        objects.select_related.return_value.filter.return_value.first.return_value = self.channel
+
+        with patch.object(resolve_channel_task, 'retry') as retry, self.assertLogs('poster.tasks', 'WARNING'):
+            self.run_task(resolve_channel_task.max_retries)
+
+        retry.assert_not_called()
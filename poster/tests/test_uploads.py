@@ -0,0 +1,66 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.forms import ValidationError
+from django.test import SimpleTestCase
+
+from ..forms import validate_upload
+from ..media import MB
+from ..uploads import MIME_HEADER_SIZE
+from ..uploads import MediaUploadHandler
+from ..uploads import get_upload_limits
+from ..uploads import read_header
+
+WAV_HEADER = b'RIFF\x24\x00\x00\x00WAVEfmt \x10\x00\x00\x00\x01\x00\x01\x00\x44\xac\x00\x00\x88\x58\x01\x00\x02\x00\x10\x00data\x00\x00\x00\x00'  # NOQA: E501
+MP4_HEADER = b'\x00\x00\x00\x18ftypmp42\x00\x00\x00\x00mp42isom'
+
+
+class UploadValidationTestCase(SimpleTestCase):
+
+    def create_temporary_file(self, content, size=None):
+        file = TemporaryUploadedFile('upload.bin', 'application/octet-stream', size or len(content), None)
+        file.write(content)
+        file.seek(0)
+        self.addCleanup(file.close)
+        return file
+
+    def test_only_header_is_read(self):
+        file = self.create_temporary_file(WAV_HEADER + b'\x00' * (MIME_HEADER_SIZE * 4))
+
+        self.assertEqual(len(read_header(file)), MIME_HEADER_SIZE)
+        self.assertEqual(file.tell(), 0)
+
+    def test_valid_temporary_upload(self):
+        validate_upload('voice', self.create_temporary_file(WAV_HEADER))
+        validate_upload('video', self.create_temporary_file(MP4_HEADER))
+
+    def test_wrong_mime_type(self):
+        with self.assertRaises(ValidationError):
+            validate_upload('audio', SimpleUploadedFile('audio.mp3', MP4_HEADER), 'Select audio file')
+
+    def test_size_limit_uses_reported_size(self):
+        file = self.create_temporary_file(WAV_HEADER, size=51 * MB)
+
+        with self.assertRaises(ValidationError):
+            validate_upload('audio', file, 'Select audio file')
+
+    def test_gallery_field_limits(self):
+        self.assertEqual(get_upload_limits('galleryphoto_set-0-file'), get_upload_limits('photo'))
+        self.assertEqual(get_upload_limits('gallerydocument_set-3-file'), get_upload_limits('document'))
+        self.assertIsNone(get_upload_limits('caption'))
+
+
+class MediaUploadHandlerTestCase(SimpleTestCase):
+
+    def test_oversized_upload_is_discarded_while_streaming(self):
+        handler = MediaUploadHandler()
+        handler.new_file('audio', 'audio.mp3', 'audio/mpeg', None)
+        handler.limits = handler.limits._replace(max_bytes=10)
+
+        self.assertIsNone(handler.receive_data_chunk(b'x' * 8, 0))
+        self.assertIsNone(handler.receive_data_chunk(b'x' * 8, 8))
+
+        file = handler.file_complete(16)
+        self.addCleanup(file.close)
+
+        self.assertEqual(file.size, 16)
+        self.assertEqual(file.read(), b'x' * 8)
@@ -0,0 +1,46 @@
+from django.test import SimpleTestCase
+
+from ..utils import escape_discord_message
+
+
+DISCORD_GOLDEN_OUTPUTS = [
+    ('', ''),
+    (None, ''),
+    ('plain text 1.5 - x', 'plain text 1\\.5 \\- x'),
+    ('<p>Hello <strong>world</strong>!</p>', 'Hello **world**\\!\n'),
+    ('<p>a</p><p>b</p>', 'a\nb\n'),
+    ('<p>x</p>\n<p>y</p>', 'x\n\ny\n'),
+    ('<p>a  b\tc\nd</p>', 'a b c\nd\n'),
+    ('<p><br></p>', '  \n\n'),
+    ('x<br>y', 'x  \ny'),
+    ('<p><em>it</em> <u>un</u> <s>st</s></p>', '*it* __un__ ~~st~~\n'),
+    ('<p><b>b</b> <i>i</i> <del>d</del></p>', '**b** *i* ~~d~~\n'),
+    ('<p><strong><em>bi</em></strong></p>', '***bi***\n'),
+    ('<p><strong> sp </strong>x</p>', ' **sp** x\n'),
+    ('<p>a<strong></strong>b</p>', 'ab\n'),
+    ('<p>unclosed <strong>bold', 'unclosed **bold**\n'),
+    ('<p>&nbsp;x &amp; y &lt;z&gt;</p>', '\xa0x & y <z>\n'),
+    ('<p>it&#39;s #1 (ok) [x] {y} | = + !</p>', "it's \\#1 \\(ok\\) \\[x\\] \\{y\\} \\| \\= \\+ \\!\n"),
+    ('a_b*c`~', 'a\\_b\\*c\\`\\~'),
+    ('<ul><li>one</li><li>two</li></ul>', '- one\n- two\n'),
+    ('<ol><li>one</li><li>two</li></ol>', '1. one\n2. two\n'),
+    ('<ul><li>a<ul><li>b</li></ul></li></ul>', '- a\n\t- b\n'),
+    ('<ol><li>a<ol><li>b</li><li>c</li></ol></li><li>d</li></ol>', '1. a\n\t1. b\n\t2. c\n2. d\n'),
+    ('<ul><li> a </li><li>b\n<ul>\n<li>c</li>\n</ul>\n</li></ul>', '- a\n- b\n\t- c\n'),
+    ('<ul>\n<li>a</li>\n<li>b</li>\n</ul>\n<p>after</p>', '- a\n- b\n\n\nafter\n'),
+    ('<p>t</p><ul><li>a</li></ul><p>after</p>', 't\n- a\n\nafter\n'),
+    ('<p>a</p><ul><li>x</li></ul><ol><li>y</li></ol>tail', 'a\n- x\n1. y\n\ntail'),
+    ('<p><a href="https://example.com/a-b?x=1">link</a></p>', '[link](https://example.com/a-b?x=1)\n'),
+    ('<p>see <a href="https://x.com"> here </a>now</p>', 'see  [here](https://x.com) now\n'),
+    ('<p><a href="https://x.com">https://x.com</a></p>', '<https://x.com>\n'),
+    ('<p><a>no href</a></p>', 'no href\n'),
+    ('<p><span style="color: red;">span</span> text</p>', 'span text\n'),
+]
+
+
+class DiscordMarkdownConverterTestCase(SimpleTestCase):
+
+    def test_golden_outputs(self):
+        for html, expected in DISCORD_GOLDEN_OUTPUTS:
+            with self.subTest(html=html):
+                self.assertEqual(escape_discord_message(html), expected)
@@ -0,0 +1,115 @@
+from os import path
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+
+from django.http import Http404
+from django.test import RequestFactory
+from django.test import SimpleTestCase
+from django.test import override_settings
+
+from ..views import parse_range
+from ..views import serve_media
+
+
+class ServeMediaTestCase(SimpleTestCase):
+
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.settings = override_settings(MEDIA_ROOT=self.directory.name, MEDIA_ACCEL='')
+        self.settings.enable()
+
+        with open(path.join(self.directory.name, 'voice.ogg'), mode='wb') as file:
+            file.write(b'0123456789')
+
+        self.factory = RequestFactory()
+        self.staff = SimpleNamespace(is_active=True, is_staff=True)
+
+    def tearDown(self):
+        self.settings.disable()
+        self.directory.cleanup()
+
+    def get(self, name, user=None, **headers):
+        request = self.factory.get(f'/media/{name}', headers=headers)
+        request.user = user or self.staff
+        return serve_media(request, name)
+
+    def read(self, response):
+        content = b''.join(response.streaming_content)
+        response.close()
+        return content
+
+    def test_non_staff_user_is_redirected(self):
+        response = self.get('voice.ogg', SimpleNamespace(is_active=True, is_staff=False))
+
+        self.assertEqual(response.status_code, 302)
+
+    def test_full_file(self):
+        response = self.get('voice.ogg')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Type'], 'audio/ogg')
+        self.assertEqual(self.read(response), b'0123456789')
+
+    def test_open_ended_range(self):
+        response = self.get('voice.ogg', Range='bytes=4-')
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 4-9/10')
+        self.assertEqual(response['Content-Length'], '6')
+        self.assertEqual(self.read(response), b'456789')
+
+    def test_bounded_range(self):
+        response = self.get('voice.ogg', Range='bytes=2-4')
+
+        self.assertEqual(response['Content-Range'], 'bytes 2-4/10')
+        self.assertEqual(self.read(response), b'234')
+
+    def test_unsatisfiable_range(self):
+        response = self.get('voice.ogg', Range='bytes=20-')
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */10')
+
+    @override_settings(MEDIA_ACCEL='x-accel-redirect', MEDIA_ACCEL_PREFIX='/protected-media/')
+    def test_accel_redirect(self):
+        response = self.get('voice.ogg')
+
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/voice.ogg')
+        self.assertEqual(response.content, b'')
+
+    @override_settings(MEDIA_ACCEL='x-sendfile')
+    def test_sendfile(self):
+        response = self.get('voice.ogg')
+
+        self.assertEqual(response['X-Sendfile'], path.join(self.directory.name, 'voice.ogg'))
+
+    @override_settings(MEDIA_ACCEL='x-accel-redirect', MEDIA_ACCEL_PREFIX='/protected-media/')
+    def test_accel_redirect_quotes_non_ascii_name(self):
+        with open(path.join(self.directory.name, 'голос дня.ogg'), mode='wb') as file:
+            file.write(b'0123456789')
+
+        response = self.get('голос дня.ogg')
+
+        self.assertEqual(
+            response['X-Accel-Redirect'],
+            '/protected-media/%D0%B3%D0%BE%D0%BB%D0%BE%D1%81%20%D0%B4%D0%BD%D1%8F.ogg',
+        )
+
+    @override_settings(MEDIA_ACCEL='x-sendfile')
+    def test_sendfile_quotes_non_ascii_name(self):
+        with open(path.join(self.directory.name, 'голос.ogg'), mode='wb') as file:
+            file.write(b'0123456789')
+
+        response = self.get('голос.ogg')
+
+        self.assertTrue(response['X-Sendfile'].endswith('/%D0%B3%D0%BE%D0%BB%D0%BE%D1%81.ogg'))
+        self.assertTrue(response['X-Sendfile'].isascii())
+
+    def test_path_outside_media_root(self):
+        with self.assertRaises(Http404):
+            self.get('../etc/passwd')
+
+    def test_suffix_range(self):
+        self.assertEqual(parse_range('bytes=-3', 10), (7, 9))
+        self.assertEqual(parse_range('bytes=0-100', 10), (0, 9))
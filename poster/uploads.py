@@ -0,0 +1,66 @@
+from typing import NamedTuple
+
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from magic import Magic
+
+from .media import MB
+
+
+MIME_HEADER_SIZE = 8 * 1024
+
+
+class UploadLimits(NamedTuple):
+    max_bytes: int
+    mime_prefix: str | None = None
+
+
+UPLOAD_LIMITS = {
+    'audio': UploadLimits(max_bytes=50 * MB, mime_prefix='audio/'),
+    'document': UploadLimits(max_bytes=50 * MB),
+    'photo': UploadLimits(max_bytes=50 * MB),
+    'video': UploadLimits(max_bytes=1024 * MB, mime_prefix='video/'),
+    'voice': UploadLimits(max_bytes=200 * MB, mime_prefix='audio/'),
+}
+
+GALLERY_UPLOAD_FIELDS = {
+    'gallerydocument_set': 'document',
+    'galleryphoto_set': 'photo',
+}
+
+
+def get_upload_limits(field_name: str) -> UploadLimits | None:
+    prefix = field_name.split('-')[0]
+    return UPLOAD_LIMITS.get(GALLERY_UPLOAD_FIELDS.get(prefix, prefix))
+
+
+def read_header(file: UploadedFile) -> bytes:
+    file.seek(0)
+    header = file.read(MIME_HEADER_SIZE)
+    file.seek(0)
+    return header
+
+
+def get_mime_type(file: UploadedFile) -> str:
+    return Magic(mime=True).from_buffer(read_header(file))
+
+
+def is_too_large(file: UploadedFile, limits: UploadLimits) -> bool:
+    return bool(file.size and file.size > limits.max_bytes)
+
+
+def is_mime_allowed(file: UploadedFile, limits: UploadLimits) -> bool:
+    return not limits.mime_prefix or get_mime_type(file).startswith(limits.mime_prefix)
+
+
+class MediaUploadHandler(TemporaryFileUploadHandler):
+    def new_file(self, field_name: str, *args, **kwargs) -> None:
+        super().new_file(field_name, *args, **kwargs)
+        self.limits = get_upload_limits(field_name)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data: bytes, start: int) -> bytes | None:
+        self.received += len(raw_data)
+        if self.limits and self.received > self.limits.max_bytes:
+            return None
+        return super().receive_data_chunk(raw_data, start)
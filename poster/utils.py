@@ -1,10 +1,14 @@
+from html.parser import HTMLParser
 from os import path
+from re import compile as re_compile
 
 from django.conf import settings
 from django.utils.safestring import mark_safe
 from markdownify import abstract_inline_conversion
 from markdownify import MarkdownConverter
 
+from .media import get_thumbnail_url
+
 from telegram_bot import TelegramBot
 
 
@@ -35,15 +39,176 @@ class TelegramMarkdownConverter(BaseMarkdownConverter):
     convert_strong = abstract_inline_conversion(lambda self: '*')
 
 
-class DiscordMarkdownConverter(BaseMarkdownConverter):
-    pass
+class MarkdownFrame:
+    def __init__(self, tag: str, attrs: dict) -> None:
+        self.tag = tag
+        self.attrs = attrs
+        self.parts: list = []
+        self.items = 0
+        self.list_closed = False
+
+    @property
+    def text(self) -> str:
+        return ''.join(self.parts)
+
+
+class DiscordMarkdownConverter(HTMLParser):
+
+    inline_markup = {
+        'b': '**',
+        'strong': '**',
+        'em': '*',
+        'i': '*',
+        'u': '__',
+        's': '~~',
+        'del': '~~',
+        'strike': '~~',
+    }
+
+    list_tags = ('ol', 'ul')
+
+    void_tags = ('br', 'hr', 'img', 'input', 'meta', 'link', 'source', 'wbr')
+
+    whitespace = re_compile(r'[\t ]+')
+
+    def __init__(self, bullet: str = '-') -> None:
+        super().__init__(convert_charrefs=True)
+        self.bullet = bullet
+        self.stack = [MarkdownFrame('', {})]
+        self.pending: list = []
+
+    def convert(self, html: str | None) -> str:
+        if not html:
+            return ''
+
+        self.feed(html)
+        self.close()
+        return self.stack[0].text
+
+    def close(self) -> None:
+        super().close()
+        self._flush()
+        while len(self.stack) > 1:
+            self._pop()
+
+    def updatepos(self, i: int, j: int) -> int:
+        # Line and offset tracking is only used by getpos() and is not needed here
+        return j
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        self._flush()
+        frame = self.stack[-1]
+
+        if frame.list_closed:
+            frame.list_closed = False
+            if tag not in self.list_tags:
+                frame.parts.append('\n')
+
+        if tag == 'br':
+            frame.parts.append('  \n')
+        elif tag not in self.void_tags:
+            if tag in self.list_tags and frame.tag == 'li':
+                frame.parts = [frame.text.rstrip()]
+            self.stack.append(MarkdownFrame(tag, dict(attrs)))
+
+    def handle_startendtag(self, tag: str, attrs: list) -> None:
+        self.handle_starttag(tag, attrs)
+        if tag not in self.void_tags:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self.void_tags or not any(frame.tag == tag for frame in self.stack[1:]):
+            return
+
+        self._flush()
+        while self._pop().tag != tag:
+            pass
+
+    def handle_data(self, data: str) -> None:
+        self.pending.append(data)
+
+    def _flush(self) -> None:
+        if not self.pending:
+            return
+
+        text = ''.join(self.pending)
+        self.pending = []
+        frame = self.stack[-1]
+
+        if not text.strip() and (frame.tag in self.list_tags or (frame.tag == 'li' and not frame.parts)):
+            return
+
+        if frame.list_closed:
+            frame.list_closed = False
+            frame.parts.append('\n')
+
+        frame.parts.append(escape_chars(self.whitespace.sub(' ', text)))
+
+    def _pop(self) -> MarkdownFrame:
+        frame = self.stack.pop()
+        parent = self.stack[-1]
+        parent.list_closed = False
+        parent.parts.append(self._render(frame, parent))
+
+        if frame.tag in self.list_tags and parent.tag != 'li':
+            parent.list_closed = True
+
+        return frame
+
+    def _render(self, frame: MarkdownFrame, parent: MarkdownFrame) -> str:
+        text = frame.text
+
+        if frame.tag in self.inline_markup:
+            return self._wrap(text, self.inline_markup[frame.tag])
+        elif frame.tag == 'a':
+            return self._render_link(frame, text)
+        elif frame.tag == 'p':
+            return text.replace('\n\n', '\n') + '\n' if text else ''
+        elif frame.tag == 'li':
+            parent.items += 1
+            bullet = f'{parent.items}.' if parent.tag == 'ol' else self.bullet
+            return f'{bullet} {text.strip()}\n'
+        elif frame.tag in self.list_tags and parent.tag == 'li':
+            return '\n' + self._indent(text).rstrip()
+        return text
+
+    def _render_link(self, frame: MarkdownFrame, text: str) -> str:
+        href = frame.attrs.get('href')
+        prefix, text, suffix = self._chomp(text)
+
+        if not text:
+            return ''
+        elif not href:
+            return f'{prefix}{text}{suffix}'
+        elif text == escape_chars(href):
+            return f'{prefix}<{href}>{suffix}'
+        return f'{prefix}[{text}]({href}){suffix}'
+
+    def _wrap(self, text: str, markup: str) -> str:
+        prefix, text, suffix = self._chomp(text)
+        if not text:
+            return ''
+        return f'{prefix}{markup}{text}{markup}{suffix}'
+
+    @staticmethod
+    def _chomp(text: str) -> tuple:
+        prefix = ' ' if text[:1] == ' ' else ''
+        suffix = ' ' if text[-1:] == ' ' else ''
+        return prefix, text.strip(), suffix
+
+    @staticmethod
+    def _indent(text: str) -> str:
+        return '\n'.join(f'\t{line}' for line in text.split('\n'))
+
+
+ESCAPED_CHARS = str.maketrans({
+    char: f'\\{char}'
+    for char in ['_', '*', '[', ']', '(', ')', '~', '`', '#', '+', '-', '=', '|', '{', '}', '.', '!']
+})
 
 
 def escape_chars(message: str) -> str:
-    chars = ['_', '*', '[', ']', '(', ')', '~', '`', '#', '+', '-', '=', '|', '{', '}', '.', '!']
-    for char in chars:
-        message = message.replace(char, f'\\{char}')
-    return message
+    return message.translate(ESCAPED_CHARS)
 
 
 def escape_telegram_message(message: str) -> str:
@@ -51,7 +216,7 @@ def escape_telegram_message(message: str) -> str:
 
 
 def escape_discord_message(message: str) -> str:
-    return DiscordMarkdownConverter(bullets='-').convert(escape_chars(message))
+    return DiscordMarkdownConverter(bullet='-').convert(message)
 
 
 def get_default_channel_image(messenger):
@@ -65,13 +230,14 @@ def render_attachments(files: list | None) -> str:
         return html
 
     for file in files:
-        ext = file.name.split('.')[-1] if hasattr(file, 'name') else file.file.name.split('.')[-1]
-        url = file.url if hasattr(file, 'name') else file.file.url
+        file = file if hasattr(file, 'name') else file.file
+        ext = file.name.split('.')[-1].lower()
 
         if ext in ('png', 'jpg', 'jpeg'):
-            html += f'<img class="photo" src="{url}"></img>'
+            url = get_thumbnail_url(file.name) or file.url
+            html += f'<img class="photo" src="{url}" loading="lazy" width="76" height="76"></img>'
         else:
-            html += f'<a class="file" href="{url}"><img src="/media/default/download.png"></img></a>'
+            html += f'<a class="file" href="{file.url}"><img src="/media/default/download.png" loading="lazy"></img></a>'  # NOQA: E501
 
     return html
 
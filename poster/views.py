@@ -0,0 +1,118 @@
+from mimetypes import guess_type
+from os import stat
+from re import compile as re_compile
+from stat import S_ISREG
+from typing import BinaryIO
+from typing import Iterator
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse
+from django.http import Http404
+from django.http import HttpRequest
+from django.http import HttpResponse
+from django.http import HttpResponseRedirect
+from django.http import StreamingHttpResponse
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from .cache import media_cache
+from .enums import MediaAccelEnum
+
+
+RANGE_PATTERN = re_compile(r'^bytes=(\d*)-(\d*)$')
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or not any(match.groups()):
+        raise ValueError(f'Unsupported range {header}')
+
+    start, end = match.groups()
+    if not start:
+        start, end = max(0, size - int(end)), size - 1
+    else:
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+
+    if start > end or start >= size:
+        raise ValueError(f'Range {header} is not satisfiable')
+
+    return start, end
+
+
+def iter_range(file: BinaryIO, start: int, end: int) -> Iterator[bytes]:
+    with file:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = file.read(min(remaining, STREAM_CHUNK_SIZE))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def get_accel_response(name: str, filename: str, content_type: str) -> HttpResponse:
+    response = HttpResponse(content_type=content_type)
+    if settings.MEDIA_ACCEL == MediaAccelEnum.X_ACCEL_REDIRECT:
+        response['X-Accel-Redirect'] = f'{settings.MEDIA_ACCEL_PREFIX.rstrip("/")}/{quote(name)}'
+    else:
+        response['X-Sendfile'] = quote(filename)
+    return response
+
+
+def get_file_response(request: HttpRequest, filename: str, content_type: str, size: int) -> HttpResponse:
+    header = request.headers.get('Range')
+    if not header:
+        response = FileResponse(open(filename, mode='rb'), content_type=content_type)
+        response['Accept-Ranges'] = 'bytes'
+        return response
+
+    try:
+        start, end = parse_range(header, size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    file = open(filename, mode='rb')
+    if end == size - 1:
+        file.seek(start)
+        response = FileResponse(file, content_type=content_type, status=206)
+    else:
+        response = StreamingHttpResponse(iter_range(file, start, end), content_type=content_type, status=206)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = str(end - start + 1)
+    return response
+
+
+@require_safe
+@staff_member_required
+def serve_media(request: HttpRequest, name: str) -> HttpResponse:
+    if not media_cache.is_local:
+        return HttpResponseRedirect(default_storage.url(name))
+
+    try:
+        filename = default_storage.path(name)
+        info = stat(filename)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404(f'File {name} not found')
+
+    if not S_ISREG(info.st_mode):
+        raise Http404(f'File {name} not found')
+
+    content_type = guess_type(filename)[0] or 'application/octet-stream'
+
+    if settings.MEDIA_ACCEL:
+        response = get_accel_response(name, filename, content_type)
+    else:
+        response = get_file_response(request, filename, content_type, info.st_size)
+
+    response['Last-Modified'] = http_date(info.st_mtime)
+    return response